@@ -0,0 +1,115 @@
+# app/gui/background_loader.py
+# -*- coding: utf-8 -*-
+"""
+Carga en segundo plano para vistas Tk.
+
+BackgroundLoader corre una función de carga en un hilo de trabajo y entrega
+progreso, resultado o error en el hilo de Tk (sondeando una cola con after()),
+así la ventana no se congela mientras se lee y normaliza un archivo grande.
+
+Solo hay un trabajo vigente por loader: iniciar otro cancela el anterior y el
+resultado del trabajo cancelado se descarta. La función de carga recibe el
+LoadJob y puede llamar a job.progress(...) / job.check() entre etapas para
+cortar apenas se cancela.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Any, Callable
+
+
+class LoadCancelled(Exception):
+    """El trabajo fue reemplazado por otro o cancelado por la vista."""
+
+
+class LoadJob:
+    def __init__(self):
+        self._cancel = threading.Event()
+        self._events: queue.Queue = queue.Queue()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise LoadCancelled()
+
+    def progress(self, message: str, fraction: float | None = None):
+        """Informa avance (se muestra en el hilo de Tk) y corta si se canceló."""
+        self.check()
+        self._events.put(("progress", (message, fraction)))
+
+
+class BackgroundLoader:
+    POLL_MS = 50
+
+    def __init__(self, widget, poll_ms: int | None = None):
+        self.widget = widget
+        self.poll_ms = poll_ms or self.POLL_MS
+        self._job: LoadJob | None = None
+
+    @property
+    def busy(self) -> bool:
+        return self._job is not None
+
+    def start(
+        self,
+        work: Callable[[LoadJob], Any],
+        on_done: Callable[[Any], None],
+        on_error: Callable[[Exception], None] | None = None,
+        on_progress: Callable[[str, float | None], None] | None = None,
+    ) -> LoadJob:
+        self.cancel()
+        job = LoadJob()
+        self._job = job
+
+        def run():
+            try:
+                result = work(job)
+            except LoadCancelled:
+                return
+            except Exception as exc:
+                job._events.put(("error", exc))
+                return
+            job._events.put(("done", result))
+
+        threading.Thread(target=run, daemon=True).start()
+        self.widget.after(self.poll_ms, self._poll, job, on_done, on_error, on_progress)
+        return job
+
+    def cancel(self):
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
+
+    def _poll(self, job: LoadJob, on_done, on_error, on_progress):
+        while not job.cancelled:
+            try:
+                kind, payload = job._events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                if on_progress is not None:
+                    on_progress(*payload)
+                continue
+            if self._job is job:
+                self._job = None
+            if kind == "done":
+                on_done(payload)
+            elif on_error is not None:
+                on_error(payload)
+            return
+
+        if job.cancelled:
+            return
+        try:
+            self.widget.after(self.poll_ms, self._poll, job, on_done, on_error, on_progress)
+        except Exception:
+            # La ventana se cerró mientras cargaba
+            job.cancel()
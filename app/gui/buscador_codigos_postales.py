@@ -3,18 +3,20 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import threading
 import unicodedata
-import zipfile
-import xml.etree.ElementTree as ET
 import pandas as pd
 from pathlib import Path
-from typing import Dict, Iterable, Optional
+from typing import Dict, Optional
 from functools import partial
 
 from app.core.logger_eventos import capturar_log_bod1
 # utils expone load_config y guardar_ultimo_path
 from app.utils.utils import guardar_ultimo_path, load_config as load_config_from_file
+from app.utils.ods_reader import read_ods_rows
+from app.utils.search_index import SearchIndex
+from app.services.codigos_postales_cache import load_cache, save_cache
+from app.gui.background_loader import BackgroundLoader, LoadJob
+from app.gui.virtual_tree import VirtualTreeview
 
 
 class BuscadorCodigosPostales(tk.Toplevel):
@@ -23,9 +25,12 @@ class BuscadorCodigosPostales(tk.Toplevel):
 
     - Caso preferente: encabezados en FILA 2 (index=1) con columnas A:D.
       (Comuna/Localidad | Provincia | Region | Codigo Postal)
-    - Si falla, se prueban otros headers/estrategias (header=2, header=0..5, sin encabezado, inferencia).
+    - Cada hoja se lee una sola vez sin encabezado; la fila de encabezados se
+      busca en memoria (primeras filas, puntuadas contra COL_SYNONYMS). Si no
+      aparece: asignación posicional A:D y luego inferencia por contenido.
     - Normaliza a: REGIÓN, COMUNA, CÓDIGO POSTAL.
-    - Búsqueda sin acentos y sin mayúsculas (debounce).
+    - Búsqueda sin acentos y sin mayúsculas, con ranking (exacta, prefijo,
+      subcadena) y tolerancia a errores de tipeo (debounce corto).
     - Copia por doble clic, botón o Ctrl+C.
     """
 
@@ -53,8 +58,15 @@ class BuscadorCodigosPostales(tk.Toplevel):
         "cp": "CÓDIGO POSTAL",
     }
 
-    # Orden de headers preferidos
+    # Orden de headers preferidos (desempate entre filas candidatas)
     PREFERRED_HEADER_ROWS = [1, 2, 0, 3, 4, 5]
+    # Filas de cada hoja donde se busca el encabezado
+    HEADER_SCAN_ROWS = 10
+
+    # Prioridad de columnas en el ranking de resultados
+    SEARCH_COLUMNS = ("COMUNA", "CÓDIGO POSTAL", "REGIÓN")
+    # La búsqueda indexada tarda pocos ms: basta un debounce corto
+    SEARCH_DEBOUNCE_MS = 80
 
     @staticmethod
     def _excel_engine_for_path(path: Path) -> str:
@@ -74,8 +86,10 @@ class BuscadorCodigosPostales(tk.Toplevel):
 
         # Estado
         self.df: pd.DataFrame = pd.DataFrame()
+        self._indice: Optional[SearchIndex] = None
         self._ruta_excel: Optional[str] = None
         self._search_after_id: Optional[str] = None
+        self._loader = BackgroundLoader(self)
         self._creating = True
 
         # UI
@@ -138,18 +152,13 @@ class BuscadorCodigosPostales(tk.Toplevel):
         frame.pack(fill="both", expand=True, padx=12, pady=(0, 8))
 
         cols = self.COLS_TARGET
-        self.tree = ttk.Treeview(frame, columns=cols, show="headings", selectmode="browse")
+        self.table = VirtualTreeview(frame, cols, selectmode="browse")
+        self.tree = self.table.tree
         for c in cols:
             self.tree.heading(c, text=c)
             self.tree.column(c, anchor="center", width=180, stretch=True)
 
-        vsb = ttk.Scrollbar(frame, orient="vertical", command=self.tree.yview)
-        hsb = ttk.Scrollbar(frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscroll=vsb.set, xscroll=hsb.set)
-
-        self.tree.grid(row=0, column=0, sticky="nsew")
-        vsb.grid(row=0, column=1, sticky="ns")
-        hsb.grid(row=1, column=0, sticky="ew")
+        self.table.grid(row=0, column=0, sticky="nsew")
         frame.rowconfigure(0, weight=1)
         frame.columnconfigure(0, weight=1)
 
@@ -259,18 +268,13 @@ class BuscadorCodigosPostales(tk.Toplevel):
         frame.pack(fill="both", expand=True)
 
         cols = self.COLS_TARGET
-        self.tree = ttk.Treeview(frame, columns=cols, show="headings", selectmode="browse", style="CP.Treeview")
+        self.table = VirtualTreeview(frame, cols, selectmode="browse", style="CP.Treeview")
+        self.tree = self.table.tree
         for c in cols:
             self.tree.heading(c, text=c)
             self.tree.column(c, anchor="center", width=180, stretch=True)
 
-        vsb = ttk.Scrollbar(frame, orient="vertical", command=self.tree.yview)
-        hsb = ttk.Scrollbar(frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscroll=vsb.set, xscroll=hsb.set)
-
-        self.tree.grid(row=0, column=0, sticky="nsew")
-        vsb.grid(row=0, column=1, sticky="ns")
-        hsb.grid(row=1, column=0, sticky="ew")
+        self.table.grid(row=0, column=0, sticky="nsew")
         frame.rowconfigure(0, weight=1)
         frame.columnconfigure(0, weight=1)
 
@@ -346,48 +350,78 @@ class BuscadorCodigosPostales(tk.Toplevel):
         self._ruta_excel = ruta
         self.lbl_archivo.config(text=f"Archivo: {Path(ruta).name}", fg="#555")
         self._set_estado("Cargando datos…")
-        threading.Thread(target=self._cargar_en_background, args=(ruta,), daemon=True).start()
+        self._loader.start(
+            partial(self._cargar_en_background, ruta),
+            on_done=partial(self._aplicar_carga, ruta),
+            on_error=self._error_carga,
+            on_progress=lambda msg, _fraction: self._set_estado(msg),
+        )
 
-    def _cargar_en_background(self, ruta: str) -> None:
+    def _cargar_en_background(self, ruta: str, job: LoadJob):
+        """
+        Trabajo del loader (hilo de fondo): usa la caché compilada si el archivo
+        no cambió; si no, lee, limpia, indexa y guarda la caché. No toca widgets.
+        """
+        path = Path(ruta)
+        cached = load_cache(path, normalize=self._norm_text, columns=self.SEARCH_COLUMNS)
+        if cached is not None:
+            capturar_log_bod1(f"[CP] Caché de códigos postales vigente: {ruta}", "info")
+            return cached
+
+        df = self._leer_y_normalizar_excel(path)
+        job.progress("Limpiando datos…")
+        df = self._limpiar_dataset(df)
+        job.progress("Indexando búsqueda…")
+        indice = self._construir_indice(df)
         try:
-            df = self._leer_y_normalizar_excel(Path(ruta))
-            df = df.dropna(how="all")
-            for c in ("REGIÓN", "COMUNA", "CÓDIGO POSTAL"):
-                df[c] = df[c].astype(str).str.strip()
-                df[c] = df[c].replace({"nan": "", "None": "", "<NA>": ""})
-
-            # Forzar código postal numérico y limpiar filas incompletas.
-            df["CÓDIGO POSTAL"] = (
-                df["CÓDIGO POSTAL"]
-                .astype(str)
-                .str.replace(r"[^0-9]", "", regex=True)
-                .str.strip()
-            )
-            df = df[
-                (df["REGIÓN"] != "")
-                & (df["COMUNA"] != "")
-                & (df["CÓDIGO POSTAL"] != "")
-            ]
-            df = df.drop_duplicates(subset=["REGIÓN", "COMUNA", "CÓDIGO POSTAL"])
-
-            self.df = df.reset_index(drop=True)
-            # Reafirma la ruta usada (por si vino de Cambiar archivo…)
-            guardar_ultimo_path(ruta, clave=self.CONFIG_KEY_FILE)
+            save_cache(path, df, indice)
+        except Exception as e:
+            capturar_log_bod1(f"[CP] No se pudo guardar la caché: {e}", "warning")
+        return df, indice
 
-            capturar_log_bod1(f"[CP] Archivo de códigos postales cargado: {ruta}", "info")
+    def _limpiar_dataset(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Texto sin espacios sobrantes, CP solo dígitos, sin filas incompletas ni duplicadas."""
+        df = df.dropna(how="all")
+        for c in ("REGIÓN", "COMUNA", "CÓDIGO POSTAL"):
+            df[c] = df[c].astype(str).str.strip()
+            df[c] = df[c].replace({"nan": "", "None": "", "<NA>": ""})
+
+        # Forzar código postal numérico y limpiar filas incompletas.
+        df["CÓDIGO POSTAL"] = (
+            df["CÓDIGO POSTAL"]
+            .astype(str)
+            .str.replace(r"[^0-9]", "", regex=True)
+            .str.strip()
+        )
+        df = df[
+            (df["REGIÓN"] != "")
+            & (df["COMUNA"] != "")
+            & (df["CÓDIGO POSTAL"] != "")
+        ]
+        df = df.drop_duplicates(subset=["REGIÓN", "COMUNA", "CÓDIGO POSTAL"])
+
+        return df.reset_index(drop=True)
+
+    def _aplicar_carga(self, ruta: str, resultado) -> None:
+        self.df, self._indice = resultado
+        # Reafirma la ruta usada (por si vino de Cambiar archivo…)
+        guardar_ultimo_path(ruta, clave=self.CONFIG_KEY_FILE)
+        capturar_log_bod1(f"[CP] Archivo de códigos postales cargado: {ruta}", "info")
+        self._poblar_tree(self.df)
+        self._set_estado("Listo")
 
-            # Actualiza UI en el hilo principal
-            self.after(0, lambda: (self._poblar_tree(self.df), self._set_estado("Listo")))
-        except Exception as e:
-            capturar_log_bod1(f"Error al cargar archivo de códigos postales: {e}", "error")
-            self.after(0, partial(self._error, f"No se pudo cargar el archivo:\n{e}"))
+    def _error_carga(self, e: Exception) -> None:
+        capturar_log_bod1(f"Error al cargar archivo de códigos postales: {e}", "error")
+        self._error(f"No se pudo cargar el archivo:\n{e}")
 
     # ----------------------- Lectura y normalización Excel -------------------
 
     def _leer_y_normalizar_excel(self, path: Path) -> pd.DataFrame:
         """
-        Preferente: header=1 (fila 2 visible) + usecols A:D con renombrado seguro.
-        Respaldos: header en [2,0,3,4,5], sin encabezado + heurística, inferencia.
+        Lee cada hoja una vez como grilla cruda (header=None) y, en memoria:
+        1) busca la fila de encabezados (preferente: fila 2 visible),
+        2) respaldo posicional A:D = Comuna | Provincia | Región | CP,
+        3) inferencia por contenido.
         """
         engine = self._excel_engine_for_path(path)
 
@@ -400,96 +434,37 @@ class BuscadorCodigosPostales(tk.Toplevel):
             except Exception as e:
                 capturar_log_bod1(f"[CP] Fallback ODS XML falló: {e}", "warning")
 
-        # Prepara lista de hojas por defecto
-        sheet_names = [0]
+        hojas = self._leer_hojas_crudas(path, engine)
 
-        # 0) INTENTO PREFERENTE: header=1, A:D
-        try:
-            try:
-                xls = pd.ExcelFile(path, engine=engine)
-                sheet_names = xls.sheet_names or [0]
-            except Exception:
-                sheet_names = [0]
-
-            for sheet in sheet_names:
-                try:
-                    df = pd.read_excel(
-                        path,
-                        sheet_name=sheet,
-                        header=1,            # fila 2 visible
-                        usecols="A:D",       # A..D esperado
-                        dtype=str,
-                        engine=engine,
-                    )
-                    capturar_log_bod1(f"[CP] preferente header=1 A:D -> cols={list(df.columns)} shape={df.shape}", "info")
-
-                    df = self._rename_soft(df)
-                    if self._tiene_columnas_target(df):
-                        return df.loc[:, list(self.COLS_TARGET)]
-                    else:
-                        faltan = set(self.COLS_TARGET) - set(df.columns)
-                        capturar_log_bod1(f"[CP] preferente faltan: {faltan}", "warning")
-                except Exception as e:
-                    capturar_log_bod1(f"[CP] preferente fallo hoja '{sheet}': {e}", "warning")
-        except Exception as e:
-            capturar_log_bod1(f"[CP] preferente error general: {e}", "error")
-
-        # 1) RESPALDO: headers en orden preferido
-        try:
+        # 1) Encabezado detectado en las primeras filas
+        for sheet, raw in hojas:
             try:
-                xls = pd.ExcelFile(path, engine=engine)
-                sheet_names = xls.sheet_names or [0]
-            except Exception:
-                sheet_names = [0]
-
-            for sheet in sheet_names:
-                for header_row in self.PREFERRED_HEADER_ROWS:
-                    try:
-                        df_try = pd.read_excel(path, sheet_name=sheet, header=header_row, dtype=str, engine=engine)
-                        capturar_log_bod1(f"[CP] respaldo header={header_row} -> cols={list(df_try.columns)} shape={df_try.shape}", "info")
-                        df_norm = self._rename_soft(df_try)
-                        if self._tiene_columnas_target(df_norm):
-                            return df_norm.loc[:, list(self.COLS_TARGET)]
-                        # Caso frecuente: la primera fila trae los encabezados reales
-                        df_promoted = self._promover_fila_a_encabezado(df_try)
-                        if df_promoted is not None:
-                            df_promoted = self._rename_soft(df_promoted)
-                            if self._tiene_columnas_target(df_promoted):
-                                return df_promoted.loc[:, list(self.COLS_TARGET)]
-                    except Exception as e:
-                        capturar_log_bod1(f"[CP] respaldo header={header_row} fallo: {e}", "warning")
-        except Exception as e:
-            capturar_log_bod1(f"[CP] respaldo error general: {e}", "error")
+                df = self._encabezado_desde_grilla(raw)
+                if df is not None:
+                    capturar_log_bod1(f"[CP] encabezado detectado hoja '{sheet}' -> shape={df.shape}", "info")
+                    return df.loc[:, list(self.COLS_TARGET)]
+            except Exception as e:
+                capturar_log_bod1(f"[CP] detección de encabezado falló hoja '{sheet}': {e}", "warning")
 
-        # 2) RESPALDO: sin encabezado + heurística
-        for sheet in sheet_names:
+        # 2) RESPALDO: sin encabezado, columnas por posición
+        for sheet, raw in hojas:
             try:
-                df_no_header = pd.read_excel(path, sheet_name=sheet, header=None, dtype=str, engine=engine)
-                capturar_log_bod1(f"[CP] sin header -> shape={df_no_header.shape}", "info")
-
-                if not df_no_header.empty and self._fila_parece_encabezado(df_no_header.iloc[0]):
-                    df_try = pd.read_excel(path, sheet_name=sheet, header=0, dtype=str, engine=engine)
-                    df_norm = self._rename_soft(df_try)
-                    if self._tiene_columnas_target(df_norm):
-                        return df_norm.loc[:, list(self.COLS_TARGET)]
-
-                if df_no_header.shape[1] >= 4:
-                    df_pos = df_no_header.rename(columns={0: "COMUNA", 1: "PROVINCIA", 2: "REGIÓN", 3: "CÓDIGO POSTAL"})
+                if raw.shape[1] >= 4:
+                    df_pos = raw.rename(columns={0: "COMUNA", 1: "PROVINCIA", 2: "REGIÓN", 3: "CÓDIGO POSTAL"})
                     df_norm = self._normalizar_columnas(df_pos)
                     if self._tiene_columnas_target(df_norm):
                         return df_norm.loc[:, list(self.COLS_TARGET)]
             except Exception as e:
-                capturar_log_bod1(f"[CP] sin header fallo: {e}", "warning")
+                capturar_log_bod1(f"[CP] sin header fallo hoja '{sheet}': {e}", "warning")
 
         # 3) RESPALDO: inferencia por contenido
-        for sheet in sheet_names:
+        for sheet, raw in hojas:
             try:
-                df_any = pd.read_excel(path, sheet_name=sheet, header=None, dtype=str, engine=engine)
-                df_infer = self._inferir_por_contenido(df_any)
+                df_infer = self._inferir_por_contenido(raw)
                 if self._tiene_columnas_target(df_infer):
                     return df_infer.loc[:, list(self.COLS_TARGET)]
             except Exception as e:
-                capturar_log_bod1(f"[CP] inferencia fallo: {e}", "warning")
+                capturar_log_bod1(f"[CP] inferencia fallo hoja '{sheet}': {e}", "warning")
 
         if path.suffix.lower() == ".ods":
             raise ValueError("No se pudo leer el archivo .ods. Instala odfpy: pip install odfpy")
@@ -499,6 +474,52 @@ class BuscadorCodigosPostales(tk.Toplevel):
             "las columnas Región, Comuna (o Localidad) y Código Postal."
         )
 
+    def _leer_hojas_crudas(self, path: Path, engine: str) -> list:
+        """[(hoja, grilla)] con cada hoja leída una sola vez, sin encabezado y como texto."""
+        hojas = []
+        try:
+            with pd.ExcelFile(path, engine=engine) as xls:
+                for sheet in xls.sheet_names or [0]:
+                    try:
+                        raw = xls.parse(sheet, header=None, dtype=str)
+                        capturar_log_bod1(f"[CP] hoja '{sheet}' -> shape={raw.shape}", "info")
+                        hojas.append((sheet, raw))
+                    except Exception as e:
+                        capturar_log_bod1(f"[CP] lectura fallo hoja '{sheet}': {e}", "warning")
+        except Exception as e:
+            capturar_log_bod1(f"[CP] no se pudo abrir el libro: {e}", "error")
+        return hojas
+
+    def _encabezado_desde_grilla(self, raw: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        Busca en las primeras HEADER_SCAN_ROWS filas una que nombre las tres
+        columnas objetivo (desempate por PREFERRED_HEADER_ROWS) y devuelve las
+        filas siguientes con esos encabezados ya normalizados.
+        """
+        if raw is None or raw.empty:
+            return None
+        limite = min(len(raw), self.HEADER_SCAN_ROWS)
+        objetivo = set(self.COLS_TARGET)
+        candidatas = [
+            r for r in range(limite)
+            if objetivo <= {self._columna_target(v) for v in raw.iloc[r].tolist() if pd.notna(v)}
+        ]
+        if not candidatas:
+            return None
+        orden = {r: i for i, r in enumerate(self.PREFERRED_HEADER_ROWS)}
+        fila = min(candidatas, key=lambda r: (orden.get(r, len(orden)), r))
+
+        encabezados = [
+            str(v).strip() if pd.notna(v) and str(v).strip() else f"col_{i + 1}"
+            for i, v in enumerate(raw.iloc[fila].tolist())
+        ]
+        df = raw.iloc[fila + 1:].reset_index(drop=True)
+        df.columns = encabezados
+        df = self._rename_soft(df)
+        # Si más de una columna cae en el mismo objetivo, manda la primera (A:D)
+        df = df.loc[:, ~df.columns.duplicated()]
+        return df if self._tiene_columnas_target(df) else None
+
     def _rename_soft(self, df: pd.DataFrame) -> pd.DataFrame:
         """Renombrado fuerte + suave a REGIÓN/COMUNA/CÓDIGO POSTAL."""
         df = df.copy()
@@ -513,21 +534,10 @@ class BuscadorCodigosPostales(tk.Toplevel):
             "Código Postal": "CÓDIGO POSTAL",
         }, inplace=True)
 
-        def _norm(s: str) -> str:
-            s = str(s).strip().lower()
-            return unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
-
         for col in list(df.columns):
-            k = _norm(col)
-            if k in self.COL_SYNONYMS:
-                df.rename(columns={col: self.COL_SYNONYMS[k]}, inplace=True)
-            else:
-                if "comuna" in k or "localidad" in k:
-                    df.rename(columns={col: "COMUNA"}, inplace=True)
-                elif "region" in k:
-                    df.rename(columns={col: "REGIÓN"}, inplace=True)
-                elif ("codigo" in k and "postal" in k) or ("ubigeo" in k) or k == "cp":
-                    df.rename(columns={col: "CÓDIGO POSTAL"}, inplace=True)
+            target = self._columna_target(col)
+            if target is not None:
+                df.rename(columns={col: target}, inplace=True)
 
         for c in ("REGIÓN", "COMUNA", "CÓDIGO POSTAL"):
             if c in df.columns:
@@ -535,19 +545,19 @@ class BuscadorCodigosPostales(tk.Toplevel):
 
         return df
 
-    def _promover_fila_a_encabezado(self, df: pd.DataFrame) -> Optional[pd.DataFrame]:
-        """Promueve la primera fila como encabezado si el DataFrame no trae nombres útiles."""
-        if df is None or df.empty:
-            return None
-        try:
-            first_row = df.iloc[0].fillna("").astype(str).str.strip()
-            if first_row.eq("").all():
-                return None
-            promoted = df.iloc[1:].copy().reset_index(drop=True)
-            promoted.columns = first_row.tolist()
-            return promoted
-        except Exception:
-            return None
+    def _columna_target(self, nombre) -> Optional[str]:
+        """Columna objetivo que nombra `nombre` (sinónimo o palabra clave), o None."""
+        k = str(nombre).strip().lower()
+        k = unicodedata.normalize("NFKD", k).encode("ascii", "ignore").decode("ascii")
+        if k in self.COL_SYNONYMS:
+            return self.COL_SYNONYMS[k]
+        if "comuna" in k or "localidad" in k:
+            return "COMUNA"
+        if "region" in k:
+            return "REGIÓN"
+        if ("codigo" in k and "postal" in k) or ("ubigeo" in k) or k == "cp":
+            return "CÓDIGO POSTAL"
+        return None
 
     def _normalizar_columnas(self, df: pd.DataFrame) -> pd.DataFrame:
         return self._rename_soft(df)
@@ -555,11 +565,6 @@ class BuscadorCodigosPostales(tk.Toplevel):
     def _tiene_columnas_target(self, df: pd.DataFrame) -> bool:
         return all(c in df.columns for c in self.COLS_TARGET)
 
-    def _fila_parece_encabezado(self, fila0: pd.Series) -> bool:
-        keys = {"region", "región", "comuna", "comuna/localidad", "codigo postal", "código postal", "codigo ubigeo", "ubigeo", "cp"}
-        vals = set(self._norm_text(v) for v in fila0.values)
-        return any(k in vals for k in keys)
-
     def _inferir_por_contenido(self, df_any: pd.DataFrame) -> pd.DataFrame:
         sample = df_any.head(100).copy()
         ncols = sample.shape[1]
@@ -611,44 +616,7 @@ class BuscadorCodigosPostales(tk.Toplevel):
         return self._rename_soft(out)
 
     def _leer_ods_via_content_xml(self, path: Path) -> pd.DataFrame:
-        ns = {
-            "table": "urn:oasis:names:tc:opendocument:xmlns:table:1.0",
-            "text": "urn:oasis:names:tc:opendocument:xmlns:text:1.0",
-        }
-
-        def cell_text(cell) -> str:
-            vals = []
-            for p in cell.findall(".//text:p", ns):
-                t = "".join(p.itertext()).strip()
-                if t:
-                    vals.append(t)
-            return " ".join(vals)
-
-        with zipfile.ZipFile(path, "r") as zf:
-            root = ET.fromstring(zf.read("content.xml"))
-
-        rows = None
-        for t in root.findall(".//table:table", ns):
-            tmp_rows = []
-            for tr in t.findall("table:table-row", ns):
-                rep_rows = int(
-                    tr.get("{urn:oasis:names:tc:opendocument:xmlns:table:1.0}number-rows-repeated", "1")
-                )
-                row = []
-                for tc in tr.findall("table:table-cell", ns):
-                    rep_cols = int(
-                        tc.get("{urn:oasis:names:tc:opendocument:xmlns:table:1.0}number-columns-repeated", "1")
-                    )
-                    txt = cell_text(tc)
-                    row.extend([txt] * rep_cols)
-                while row and row[-1] == "":
-                    row.pop()
-                for _ in range(rep_rows):
-                    tmp_rows.append(list(row))
-            if any(any(str(c).strip() for c in r) for r in tmp_rows):
-                rows = tmp_rows
-                break
-
+        rows = read_ods_rows(path)
         if not rows:
             raise ValueError("ODS sin filas de datos")
 
@@ -664,7 +632,7 @@ class BuscadorCodigosPostales(tk.Toplevel):
             return
         if self._search_after_id:
             self.after_cancel(self._search_after_id)
-        self._search_after_id = self.after(250, self._buscar_now)
+        self._search_after_id = self.after(self.SEARCH_DEBOUNCE_MS, self._buscar_now)
 
     def _buscar_now(self) -> None:
         termino_raw = self.entry_busqueda.get().strip()
@@ -674,25 +642,24 @@ class BuscadorCodigosPostales(tk.Toplevel):
             return
 
         termino = self._norm_text(termino_raw)
-        df = self.df.copy()
+        df = self.df
         if df.empty:
             self._set_estado("No hay datos cargados.")
             return
 
-        def norm_series(s: Iterable) -> pd.Series:
-            return pd.Series([self._norm_text(str(x)) for x in s])
-
-        mask = (
-            norm_series(df["COMUNA"]).str.contains(termino, na=False)
-            | norm_series(df["REGIÓN"]).str.contains(termino, na=False)
-            | norm_series(df["CÓDIGO POSTAL"]).str.contains(termino, na=False)
-        )
+        indice = self._indice
+        if indice is None or len(indice) != len(df):
+            indice = self._indice = self._construir_indice(df)
 
-        filtrado = df.loc[mask]
+        filtrado = df.iloc[indice.search(termino)]
         self._poblar_tree(filtrado)
         capturar_log_bod1(f"Búsqueda: '{termino_raw}' → resultados: {len(filtrado)}", "info")
         self._set_estado(f"{len(filtrado)} resultado(s)")
 
+    def _construir_indice(self, df: pd.DataFrame) -> SearchIndex:
+        """Índice con ranking (prefijos, subcadena, difusa), construido una vez por carga."""
+        return SearchIndex(df, self.SEARCH_COLUMNS, normalize=self._norm_text)
+
     def _clear_search(self) -> None:
         self.entry_busqueda.delete(0, "end")
         self._poblar_tree(self.df)
@@ -701,20 +668,13 @@ class BuscadorCodigosPostales(tk.Toplevel):
     # ----------------------------- Poblado Tree ------------------------------
 
     def _poblar_tree(self, df: pd.DataFrame) -> None:
-        self.tree.delete(*self.tree.get_children())
+        # Solo se insertan las filas visibles: ya no hace falta recortar a 10.000.
+        self.table.set_frame(df, self.COLS_TARGET)
 
         if df is None or df.empty:
             self.btn_copiar["state"] = "disabled"
             return
 
-        max_rows = 10000
-        for _, row in df.head(max_rows).iterrows():
-            self.tree.insert("", "end", values=(
-                row.get("REGIÓN", ""),
-                row.get("COMUNA", ""),
-                row.get("CÓDIGO POSTAL", "")
-            ))
-
         self._autoajustar_columnas(sample_df=df.head(120))
         self.btn_copiar["state"] = "disabled"
         self._creating = False
@@ -730,16 +690,15 @@ class BuscadorCodigosPostales(tk.Toplevel):
     # ----------------------------- Interacciones -----------------------------
 
     def _on_tree_select(self, _evt=None) -> None:
-        self.btn_copiar["state"] = "normal" if self.tree.selection() else "disabled"
+        self.btn_copiar["state"] = "normal" if self.table.selected_positions() else "disabled"
 
     def _copiar_codigo_postal(self, _evt=None) -> None:
-        sel = self.tree.selection()
+        sel = self.table.selected_positions()
         if not sel:
             messagebox.showwarning("Copia", "Seleccione una fila primero.")
             return
-        item = self.tree.item(sel[0])
         try:
-            codigo_postal = item["values"][2]
+            codigo_postal = self.table.frame["CÓDIGO POSTAL"].iloc[sel[0]]
         except Exception:
             messagebox.showwarning("Copia", "No se pudo obtener el Código Postal de la fila seleccionada.")
             return
@@ -7,9 +7,8 @@ import time
 import tkinter as tk
 from pathlib import Path
 from tkinter import filedialog, messagebox, ttk
-import unicodedata
 
-import pandas as pd
+from app.services.clientes_index import ClientesIndex, cargar_indice_clientes
 from app.utils.app_dirs import CONFIG_DIR, ensure_file
 from app.printer.printer_etiquetas import generar_etiqueta_excel, imprimir_excel
 
@@ -36,57 +35,16 @@ def guardar_config(config):
         json.dump(config, f, indent=4)
 
 
-def cargar_clientes(path_excel):
-    try:
-        return pd.read_excel(path_excel, sheet_name="Clientes")
-    except Exception:
-        return pd.read_excel(path_excel)
-
-
-def _normalizar_rut(rut: str) -> str:
-    return str(rut).replace(".", "").replace("-", "").strip().upper()
-
-
-def _normalizar_columna(valor: str) -> str:
-    txt = unicodedata.normalize("NFKD", str(valor)).encode("ascii", "ignore").decode("ascii")
-    return txt.strip().lower().replace("_", " ")
-
-
-def _buscar_columna(columnas_lower, *opciones):
-    for opcion in opciones:
-        encontrada = columnas_lower.get(_normalizar_columna(opcion))
-        if encontrada:
-            return encontrada
-    return None
-
-
-def buscar_cliente_por_rut(df_clientes, rut):
-    if df_clientes is None or df_clientes.empty:
-        return None
-
-    columnas_lower = {_normalizar_columna(col): col for col in df_clientes.columns}
-    col_rut = _buscar_columna(columnas_lower, "rut")
-    if col_rut is None:
-        return None
-
-    rut_norm = _normalizar_rut(rut)
-    serie_rut = df_clientes[col_rut].astype(str).map(_normalizar_rut)
-    fila = df_clientes[serie_rut == rut_norm]
-    if fila.empty:
+def buscar_cliente_por_rut(df_clientes, rut, indice: ClientesIndex | None = None):
+    """
+    Datos de etiqueta del cliente con ese RUT. Con `indice` la búsqueda es
+    directa; sin él se indexa `df_clientes` en el momento.
+    """
+    if indice is None:
+        indice = ClientesIndex.from_frame(df_clientes)
+    if indice is None:
         return None
-
-    datos = fila.iloc[0]
-    col_razsoc = _buscar_columna(columnas_lower, "razsoc", "razon social", "cliente", "nombre cliente")
-    col_dir = _buscar_columna(columnas_lower, "dir", "direccion", "domicilio")
-    col_comuna = _buscar_columna(columnas_lower, "comuna")
-    col_ciudad = _buscar_columna(columnas_lower, "ciudad")
-
-    return {
-        "razsoc": datos.get(col_razsoc, "") if col_razsoc else "",
-        "dir": datos.get(col_dir, "") if col_dir else "",
-        "comuna": datos.get(col_comuna, "") if col_comuna else "",
-        "ciudad": datos.get(col_ciudad, "") if col_ciudad else "",
-    }
+    return indice.buscar_rut(rut)
 
 
 def obtener_impresoras_disponibles():
@@ -170,7 +128,7 @@ def crear_editor_etiqueta(df_clientes=None, parent=None):
     config = cargar_config()
     printer_name_default = config.get("label_printer_name") or config.get("printer_name", "")
     clientes_path_guardado = config.get(CLIENTES_PATH_KEY, "")
-    estado = {"df_clientes": df_clientes}
+    estado = {"indice": ClientesIndex.from_frame(df_clientes)}
 
     ventana = tk.Toplevel(parent)
     ventana.title("Editor de Etiquetas 10x10 cm")
@@ -236,7 +194,7 @@ def crear_editor_etiqueta(df_clientes=None, parent=None):
 
     def cargar_excel_clientes(path):
         try:
-            estado["df_clientes"] = cargar_clientes(path)
+            estado["indice"] = cargar_indice_clientes(path)
             lbl_excel.config(text=f"Archivo clientes: {_short_path(path)}")
             config[CLIENTES_PATH_KEY] = str(path)
             guardar_config(config)
@@ -291,7 +249,8 @@ def crear_editor_etiqueta(df_clientes=None, parent=None):
 
     def cargar_datos_cliente(event=None):
         rut = entradas["rut"].get()
-        cliente = buscar_cliente_por_rut(estado["df_clientes"], rut)
+        indice = estado["indice"]
+        cliente = indice.buscar_rut(rut) if indice is not None else None
         if cliente:
             for campo in ["razsoc", "dir", "comuna"]:
                 entradas[campo].delete(0, tk.END)
@@ -11,6 +11,7 @@ from tkinter import filedialog, messagebox, ttk
 import pandas as pd
 
 from app.core.logger_eventos import capturar_log_bod1
+from app.gui.virtual_tree import VirtualTreeview
 from app.services.informes_existencia_service import EXISTENCE_COLUMNS, load_product_movements
 from app.utils.utils import guardar_ultimo_path, load_config
 
@@ -136,14 +137,12 @@ class InformesExistenciaView(tk.Toplevel):
 
         tree_frame = ttk.Frame(table_card, style="Card.TFrame")
         tree_frame.pack(fill="both", expand=True)
-        self.tree = ttk.Treeview(tree_frame, columns=EXISTENCE_COLUMNS, show="headings", height=24)
+        self.table = VirtualTreeview(tree_frame, EXISTENCE_COLUMNS, height=24)
+        self.tree = self.table.tree
+        self.tree.tag_configure("even", background="#FFFFFF")
+        self.tree.tag_configure("odd", background="#F6F8FD")
         self._configure_tree()
-        yscroll = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
-        xscroll = ttk.Scrollbar(tree_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=yscroll.set, xscrollcommand=xscroll.set)
-        self.tree.grid(row=0, column=0, sticky="nsew")
-        yscroll.grid(row=0, column=1, sticky="ns")
-        xscroll.grid(row=1, column=0, sticky="ew")
+        self.table.grid(row=0, column=0, sticky="nsew")
         tree_frame.rowconfigure(0, weight=1)
         tree_frame.columnconfigure(0, weight=1)
 
@@ -275,16 +274,11 @@ class InformesExistenciaView(tk.Toplevel):
         self._actualizar_tree(self.df)
 
     def _actualizar_tree(self, df: pd.DataFrame):
-        self.tree.delete(*self.tree.get_children())
+        self.table.set_frame(df)
         if df is None or df.empty:
             self.summary_var.set("Movimientos: 0 | Entrada: 0 | Salida: 0 | Saldo: 0")
             return
 
-        for idx, row in enumerate(df[EXISTENCE_COLUMNS].itertuples(index=False)):
-            tag = "even" if idx % 2 == 0 else "odd"
-            self.tree.insert("", "end", values=row, tags=(tag,))
-        self.tree.tag_configure("even", background="#FFFFFF")
-        self.tree.tag_configure("odd", background="#F6F8FD")
         self._autoajustar_producto(df)
         entrada = int(pd.to_numeric(df["Entrada"], errors="coerce").fillna(0).sum())
         salida = int(pd.to_numeric(df["Salida"], errors="coerce").fillna(0).sum())
@@ -0,0 +1,87 @@
+# app/gui/inventario_diff_view.py
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import tkinter as tk
+from pathlib import Path
+from tkinter import filedialog, messagebox, ttk
+
+import pandas as pd
+
+from app.core.logger_eventos import capturar_log_bod1
+from app.gui.background_loader import BackgroundLoader
+from app.gui.virtual_tree import VirtualTreeview
+from app.services.inventario_service import DIFF_SECTIONS, export_inventory_diff
+
+
+class InventarioDiffView(tk.Toplevel):
+    """Resultado de comparar dos inventarios: una pestaña por sección del diff."""
+
+    def __init__(self, parent, diff: dict[str, pd.DataFrame], anterior: str, actual: str):
+        super().__init__(parent)
+        self.title("Inventario - Comparación")
+        self.geometry("1180x640")
+        self.minsize(900, 480)
+        self.configure(bg="#EEF2F8")
+        try:
+            self.transient(parent)
+        except Exception:
+            pass
+
+        self.diff = diff
+        self._anterior = anterior
+        self._loader = BackgroundLoader(self)
+        self.status_var = tk.StringVar(value=f"Anterior: {anterior} | Actual: {actual}")
+
+        shell = ttk.Frame(self, padding=12)
+        shell.pack(fill="both", expand=True)
+
+        header = ttk.Frame(shell)
+        header.pack(fill="x", pady=(0, 8))
+        resumen = " | ".join(f"{titulo}: {len(diff.get(key, ()))}" for key, titulo in DIFF_SECTIONS.items())
+        ttk.Label(header, text=resumen, font=("Segoe UI Semibold", 11)).pack(side="left")
+        ttk.Button(header, text="Exportar Excel", command=self._exportar).pack(side="right")
+
+        notebook = ttk.Notebook(shell)
+        notebook.pack(fill="both", expand=True)
+        for key, titulo in DIFF_SECTIONS.items():
+            frame = diff.get(key, pd.DataFrame())
+            tab = ttk.Frame(notebook, padding=6)
+            notebook.add(tab, text=f"{titulo} ({len(frame)})")
+            table = VirtualTreeview(tab, list(frame.columns), height=20)
+            for col in frame.columns:
+                table.tree.heading(col, text=col)
+                table.tree.column(col, width=260 if col == "Producto" else 120, minwidth=80, anchor="center")
+            table.tree.tag_configure("even", background="#FFFFFF")
+            table.tree.tag_configure("odd", background="#F6F8FD")
+            table.pack(fill="both", expand=True)
+            table.set_frame(frame)
+
+        ttk.Label(shell, textvariable=self.status_var).pack(fill="x", pady=(8, 0))
+
+    def _exportar(self):
+        ruta = filedialog.asksaveasfilename(
+            parent=self,
+            title="Exportar comparación",
+            defaultextension=".xlsx",
+            initialfile=f"diff_inventario_{Path(self._anterior).stem}.xlsx",
+            filetypes=[("Excel", "*.xlsx")],
+        )
+        if not ruta:
+            return
+        self.status_var.set("Exportando...")
+        self._loader.start(
+            lambda _job: export_inventory_diff(self.diff, Path(ruta)),
+            on_done=self._exportado,
+            on_error=self._error_export,
+        )
+
+    def _exportado(self, ruta: Path):
+        self.status_var.set(f"Exportado: {ruta}")
+        capturar_log_bod1(f"[Inventario] Diff exportado: {ruta}", "info")
+        messagebox.showinfo("Comparación", f"Archivo exportado:\n{ruta}", parent=self)
+
+    def _error_export(self, e: Exception):
+        self.status_var.set("No se pudo exportar.")
+        capturar_log_bod1(f"[Inventario] Error al exportar diff: {e}", "error")
+        messagebox.showerror("Comparación", f"No se pudo exportar:\n{e}", parent=self)
@@ -6,7 +6,6 @@ import tkinter as tk
 import tkinter.font as tkfont
 from tkinter import ttk, filedialog, messagebox
 import unicodedata
-from difflib import SequenceMatcher
 from pathlib import Path
 from typing import Dict
 
@@ -16,6 +15,21 @@ import numpy as np
 from app.utils.utils import guardar_ultimo_path, load_config
 from app.core.logger_eventos import capturar_log_bod1
 from app.printer import printer_inventario_codigo, printer_inventario_ubicacion
+from app.services.inventario_service import (
+    DIFF_SECTIONS,
+    InventorySearchModel,
+    InventorySortKeys,
+    LocationTree,
+    diff_inventories,
+    extract_letter_row,
+    extract_main_row,
+    extract_position,
+    norm_text,
+)
+from app.services.inventario_snapshot import load_snapshot, save_snapshot
+from app.gui.background_loader import BackgroundLoader, LoadJob
+from app.gui.inventario_diff_view import InventarioDiffView
+from app.gui.virtual_tree import VirtualTreeview
 
 
 # Columnas visibles y orden final en la grilla / impresion
@@ -107,6 +121,69 @@ def _clean_for_view(df: pd.DataFrame) -> pd.DataFrame:
     return df2
 
 
+def _leer_inventario_excel(path: Path) -> pd.DataFrame:
+    suffix = path.suffix.lower()
+    if suffix == ".xlsx":
+        return pd.read_excel(path, engine="openpyxl")
+    if suffix == ".xls":
+        try:
+            return pd.read_excel(path, engine="xlrd")
+        except ImportError:
+            raise RuntimeError(
+                "Missing optional dependency 'xlrd'. Instala xlrd >= 2.0.1 para abrir archivos .xls "
+                "o guarda el archivo como .xlsx e intentalo nuevamente."
+            )
+    raise ValueError("Extension de archivo no soportada. Usa .xlsx o .xls")
+
+
+def _cargar_inventario(path: Path, job: LoadJob) -> dict:
+    """Trabajo de carga (hilo de fondo): no toca widgets."""
+    job.progress("abriendo snapshot...", 0.0)
+    snapshot = load_snapshot(path)
+    if snapshot is not None:
+        df, model = snapshot
+    else:
+        job.progress("leyendo archivo...", 0.0)
+        df = _leer_inventario_excel(path)
+        job.progress("normalizando columnas...", 0.5)
+        df = _clean_for_view(_normalize_headers(df))
+        job.progress("preparando busqueda...", 0.75)
+        model = InventorySearchModel(df)
+        job.check()
+        try:
+            save_snapshot(path, df, model)
+        except Exception as e:
+            capturar_log_bod1(f"[Inventario] No se pudo guardar el snapshot: {e}", "warning")
+    ubicaciones = LocationTree(df["Ubicación"])
+    job.check()
+    return {
+        "df": df,
+        "model": model,
+        "ubicaciones": ubicaciones,
+        "bodegas": sorted(df["Bodega"].dropna().astype(str).str.strip().unique().tolist()),
+    }
+
+
+def _comparar_inventarios(path: Path, actual: pd.DataFrame, job: LoadJob) -> dict:
+    """Trabajo de comparación (hilo de fondo): `path` es el inventario anterior."""
+    snapshot = load_snapshot(path)
+    if snapshot is not None:
+        anterior = snapshot[0]
+    else:
+        job.progress("leyendo archivo...", 0.0)
+        anterior = _leer_inventario_excel(path)
+        job.progress("normalizando columnas...", 0.5)
+        anterior = _clean_for_view(_normalize_headers(anterior))
+        job.check()
+        # Snapshot también del anterior: volver a comparar con él no relee el Excel
+        try:
+            save_snapshot(path, anterior, InventorySearchModel(anterior))
+        except Exception as e:
+            capturar_log_bod1(f"[Inventario] No se pudo guardar el snapshot del anterior: {e}", "warning")
+    job.progress("comparando...", 0.75)
+    return diff_inventories(anterior, actual)
+
+
 class InventarioView(tk.Toplevel):
     PRODUCT_MIN_WIDTH = 280
     PRODUCT_MAX_WIDTH = 620
@@ -124,15 +201,21 @@ class InventarioView(tk.Toplevel):
 
         self.df = pd.DataFrame()
         self.df_filtrado = pd.DataFrame()
+        # Posiciones en self.df de las filas de df_filtrado (para ordenar con las claves cacheadas)
+        self._filtrado_pos: np.ndarray | None = None
+        self._search_model: InventorySearchModel | None = None
         self.tipo_busqueda = None
         self.sort_column = None
         self.sort_ascending = True
         self.ubicaciones_disponibles = []
+        self._ubicaciones_tree = LocationTree(pd.Series(dtype=object))
         self.ubicaciones_seleccionadas = set()
         self.ubicaciones_principales_seleccionadas = set()
         self.bodegas_disponibles = []
         self.selected_row_ids = set()
         self._ubic_popup = None
+        self._loader = BackgroundLoader(self)
+        self._diff_loader = BackgroundLoader(self)
         self._archivo_actual = ""
         self.status_var = tk.StringVar(value="Carga un archivo de inventario para comenzar.")
         self.summary_var = tk.StringVar(value="Registros: 0")
@@ -265,6 +348,7 @@ class InventarioView(tk.Toplevel):
         ttk.Button(actions_block, text="Limpiar", command=self._limpiar_busqueda).pack(side="left", padx=(0, 8))
         ttk.Button(actions_block, text="Seleccionar todo", command=self._toggle_select_all).pack(side="left", padx=(0, 8))
         ttk.Button(actions_block, text="Abrir Excel", command=self._recargar_archivo).pack(side="left", padx=(0, 8))
+        ttk.Button(actions_block, text="Comparar...", command=self._comparar_inventario).pack(side="left", padx=(0, 8))
         ttk.Button(actions_block, text="Imprimir Resultado", command=self._imprimir_resultado).pack(side="left")
 
         info_row = ttk.Frame(top_card, style="Card.TFrame")
@@ -284,20 +368,17 @@ class InventarioView(tk.Toplevel):
         tree_container = ttk.Frame(table_card, style="Card.TFrame")
         tree_container.pack(fill="both", expand=True)
 
-        self.tree = ttk.Treeview(tree_container, columns=TREE_COLUMNS, show="headings", height=25)
+        self.table = VirtualTreeview(tree_container, VISIBLE_COLUMNS, check_column="Sel", height=25)
+        self.table.checked = self.selected_row_ids
+        self.tree = self.table.tree
         self.tree["displaycolumns"] = TREE_COLUMNS
+        self.tree.tag_configure("even", background="#FFFFFF")
+        self.tree.tag_configure("odd", background="#F6F8FD")
         self._configure_tree_columns()
 
-        yscroll = ttk.Scrollbar(tree_container, orient="vertical", command=self.tree.yview)
-        xscroll = ttk.Scrollbar(tree_container, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=yscroll.set, xscrollcommand=xscroll.set)
-
-        self.tree.grid(row=0, column=0, sticky="nsew")
-        yscroll.grid(row=0, column=1, sticky="ns")
-        xscroll.grid(row=1, column=0, sticky="ew")
+        self.table.grid(row=0, column=0, sticky="nsew")
         tree_container.rowconfigure(0, weight=1)
         tree_container.columnconfigure(0, weight=1)
-        self.tree.bind("<Button-1>", self._on_tree_click)
 
         status_bar = ttk.Frame(shell, style="InvBg.TFrame")
         status_bar.pack(fill="x")
@@ -309,8 +390,12 @@ class InventarioView(tk.Toplevel):
             self.sugerencias_var.set("")
             return
         terminos = [self._norm_text(t) for t in term_raw.replace(",", " ").split() if t.strip()]
-        ubicaciones = self.df["Ubicación"].dropna().unique()
-        sugeridas = [u for u in ubicaciones if all(t in self._norm_text(u) for t in terminos)]
+        if self._search_model is not None:
+            mask = self._search_model.contains_all("ubicacion", terminos)
+            sugeridas = self.df["Ubicación"][mask].drop_duplicates().tolist()
+        else:
+            ubicaciones = self.df["Ubicación"].dropna().unique()
+            sugeridas = [u for u in ubicaciones if all(t in self._norm_text(u) for t in terminos)]
         if sugeridas:
             suf = " ..." if len(sugeridas) > 8 else ""
             self.sugerencias_var.set("Coincidencias: " + ", ".join(sugeridas[:8]) + suf)
@@ -342,33 +427,30 @@ class InventarioView(tk.Toplevel):
             self._leer_excel(Path(ruta_archivo))
 
     def _leer_excel(self, path: Path):
-        try:
-            suffix = path.suffix.lower()
-            if suffix == ".xlsx":
-                df = pd.read_excel(path, engine="openpyxl")
-            elif suffix == ".xls":
-                try:
-                    df = pd.read_excel(path, engine="xlrd")
-                except ImportError:
-                    raise RuntimeError(
-                        "Missing optional dependency 'xlrd'. Instala xlrd >= 2.0.1 para abrir archivos .xls "
-                        "o guarda el archivo como .xlsx e intentalo nuevamente."
-                    )
-            else:
-                raise ValueError("Extension de archivo no soportada. Usa .xlsx o .xls")
-
-            df = _normalize_headers(df)
-            df = _clean_for_view(df)
+        # Lectura y normalizacion en un hilo; si se elige otro archivo antes de
+        # terminar, el loader cancela y descarta esta carga.
+        self.status_var.set(f"Cargando {path.name}...")
+        self._loader.start(
+            lambda job: _cargar_inventario(path, job),
+            on_done=lambda data: self._aplicar_inventario(path, data),
+            on_error=self._error_carga,
+            on_progress=lambda msg, _fraction: self.status_var.set(f"{path.name}: {msg}"),
+        )
 
+    def _aplicar_inventario(self, path: Path, data: dict):
+        try:
+            df = data["df"]
             self.df = df
+            self._search_model = data["model"]
             self.df_filtrado = pd.DataFrame()
             self.tipo_busqueda = None
             self.sort_column = None
             self.sort_ascending = True
-            self.ubicaciones_disponibles = sorted(df["Ubicación"].dropna().astype(str).str.strip().unique().tolist())
+            self._ubicaciones_tree = data["ubicaciones"]
+            self.ubicaciones_disponibles = self._ubicaciones_tree.locations
             self.ubicaciones_seleccionadas = set()
             self.ubicaciones_principales_seleccionadas = set()
-            self.bodegas_disponibles = sorted(df["Bodega"].dropna().astype(str).str.strip().unique().tolist())
+            self.bodegas_disponibles = data["bodegas"]
             self.combo_bodega["values"] = ["Todas"] + self.bodegas_disponibles
             self.combo_bodega.current(0)
             self.selected_row_ids = set()
@@ -385,33 +467,69 @@ class InventarioView(tk.Toplevel):
             self.safe_messagebox("info", "Inventario", f"Archivo cargado correctamente: {path.name}")
 
         except Exception as e:
-            capturar_log_bod1(f"[Inventario] Error al cargar inventario: {e}", "error")
-            self.safe_messagebox("error", "Error", f"No se pudo cargar el archivo:\n{e}")
-            self.df = pd.DataFrame()
-            self.df_filtrado = pd.DataFrame()
-            self.tipo_busqueda = None
-            self.sort_column = None
-            self.sort_ascending = True
-            self.ubicaciones_disponibles = []
-            self.ubicaciones_seleccionadas = set()
-            self.ubicaciones_principales_seleccionadas = set()
-            self.bodegas_disponibles = []
-            self.combo_bodega["values"] = ["Todas"]
-            self.bodega_var.set("Todas")
-            self.selected_row_ids = set()
-            self._actualizar_label_ubicaciones_principales()
-            self._actualizar_label_ubicaciones()
-            self._actualizar_info_impresora(load_config() or {})
-            self._archivo_actual = ""
-            self.status_var.set("No se pudo cargar el archivo.")
-            self._actualizar_tree(self.df)
+            self._error_carga(e)
+
+    def _error_carga(self, e: Exception):
+        capturar_log_bod1(f"[Inventario] Error al cargar inventario: {e}", "error")
+        self.safe_messagebox("error", "Error", f"No se pudo cargar el archivo:\n{e}")
+        self.df = pd.DataFrame()
+        self._search_model = None
+        self.df_filtrado = pd.DataFrame()
+        self.tipo_busqueda = None
+        self.sort_column = None
+        self.sort_ascending = True
+        self._ubicaciones_tree = LocationTree(pd.Series(dtype=object))
+        self.ubicaciones_disponibles = []
+        self.ubicaciones_seleccionadas = set()
+        self.ubicaciones_principales_seleccionadas = set()
+        self.bodegas_disponibles = []
+        self.combo_bodega["values"] = ["Todas"]
+        self.bodega_var.set("Todas")
+        self.selected_row_ids = set()
+        self._actualizar_label_ubicaciones_principales()
+        self._actualizar_label_ubicaciones()
+        self._actualizar_info_impresora(load_config() or {})
+        self._archivo_actual = ""
+        self.status_var.set("No se pudo cargar el archivo.")
+        self._actualizar_tree(self.df)
+
+    def _comparar_inventario(self):
+        if self.df.empty:
+            self.safe_messagebox("warning", "Inventario", "Cargue primero un archivo de inventario.")
+            return
+        ruta = filedialog.askopenfilename(
+            parent=self,
+            title="Selecciona el inventario anterior para comparar",
+            filetypes=[("Archivos Excel", "*.xlsx *.xls")],
+        )
+        if not ruta:
+            return
+        path = Path(ruta)
+        actual = self.df
+        nombre_actual = self._archivo_actual
+        self.status_var.set(f"Comparando con {path.name}...")
+        self._diff_loader.start(
+            lambda job: _comparar_inventarios(path, actual, job),
+            on_done=lambda diff: self._mostrar_diff(diff, path.name, nombre_actual),
+            on_error=self._error_diff,
+            on_progress=lambda msg, _fraction: self.status_var.set(f"{path.name}: {msg}"),
+        )
+
+    def _mostrar_diff(self, diff: dict, anterior: str, actual: str):
+        resumen = ", ".join(f"{titulo}: {len(diff[key])}" for key, titulo in DIFF_SECTIONS.items())
+        self.status_var.set(f"Comparación lista. {resumen}")
+        capturar_log_bod1(f"[Inventario] Comparación {anterior} -> {actual}: {resumen}", "info")
+        InventarioDiffView(self, diff, anterior, actual)
+
+    def _error_diff(self, e: Exception):
+        capturar_log_bod1(f"[Inventario] Error al comparar inventarios: {e}", "error")
+        self.status_var.set("No se pudo comparar.")
+        self.safe_messagebox("error", "Error", f"No se pudo comparar los inventarios:\n{e}")
 
     # ----------------------------- Busqueda ------------------------------
 
     def _norm_text(self, s: str) -> str:
-        s = str(s or "").strip().lower()
-        s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
-        return " ".join(s.split())
+        return norm_text(s)
 
     def _filtrar(self):
         term_raw = self.entry_busqueda.get()
@@ -431,62 +549,47 @@ class InventarioView(tk.Toplevel):
             self.safe_messagebox("warning", "Inventario", "Cargue primero un archivo de inventario.")
             return
 
-        df = self.df.copy()
+        df = self.df
+        model = self._search_model
+        if model is None or len(model) != len(df):
+            model = self._search_model = InventorySearchModel(df)
         terminos = [self._norm_text(t) for t in term_raw.replace(",", " ").split() if t.strip()]
 
-        m_ubi = df["Ubicación"].astype(str).map(self._norm_text)
-        m_cod = df["Código"].astype(str).map(self._norm_text)
-        m_prod = df["Producto"].astype(str).map(self._norm_text)
-        m_bodega = df["Bodega"].astype(str).map(self._norm_text)
-        m_ubicacion_principal = df["Ubicación"].astype(str).map(self._extract_main_row)
-        m_fila_letra = df["Ubicación"].astype(str).map(self._extract_letter_row)
-        m_posicion = df["Ubicación"].astype(str).map(self._extract_position)
-
         if terminos:
-            mask_ubi = m_ubi.apply(lambda val: all(term in val for term in terminos))
-            mask_cod = m_cod.apply(lambda val: all(term in val for term in terminos))
-            mask_prod = m_prod.apply(lambda val: all(term in val for term in terminos))
+            mask_ubi = model.contains_all("ubicacion", terminos)
+            mask_cod = model.contains_all("codigo", terminos)
+            mask_prod = model.contains_all("producto", terminos)
             mask_texto = mask_ubi | mask_cod | mask_prod
         else:
-            mask_ubi = pd.Series([False] * len(df), index=df.index)
-            mask_cod = pd.Series([False] * len(df), index=df.index)
-            mask_prod = pd.Series([False] * len(df), index=df.index)
-            mask_texto = pd.Series([True] * len(df), index=df.index)
+            mask_ubi = np.zeros(len(df), dtype=bool)
+            mask_cod = np.zeros(len(df), dtype=bool)
+            mask_prod = np.zeros(len(df), dtype=bool)
+            mask_texto = model.all_rows()
 
-        mask_fila_letra = pd.Series([True] * len(df), index=df.index)
-        if fila_letra:
-            mask_fila_letra = m_fila_letra == fila_letra
+        mask_fila_letra = model.equals("letter_row", fila_letra) if fila_letra else model.all_rows()
+        mask_posicion = model.equals("position", posicion) if posicion else model.all_rows()
+        mask_codigo_directo = model.contains_all("codigo", [codigo_producto]) if codigo_producto else model.all_rows()
 
-        mask_posicion = pd.Series([True] * len(df), index=df.index)
-        if posicion:
-            mask_posicion = m_posicion == posicion
-
-        mask_codigo_directo = pd.Series([True] * len(df), index=df.index)
-        if codigo_producto:
-            mask_codigo_directo = m_cod.apply(lambda val: codigo_producto in val)
-
-        mask_ubicacion_principal = pd.Series([True] * len(df), index=df.index)
+        mask_ubicacion_principal = model.all_rows()
         if ubicaciones_principales:
-            mask_ubicacion_principal = m_ubicacion_principal.isin(ubicaciones_principales)
+            mask_ubicacion_principal = model.isin("main_row", ubicaciones_principales)
 
-        mask_bodega = pd.Series([True] * len(df), index=df.index)
+        mask_bodega = model.all_rows()
         if bodega and bodega != "todas":
-            mask_bodega = m_bodega == bodega
+            mask_bodega = model.equals("bodega", bodega)
 
-        mask_stock_cero = pd.Series([True] * len(df), index=df.index)
-        if solo_stock_cero:
-            stock_values = pd.to_numeric(df["Saldo Stock"], errors="coerce").fillna(0)
-            mask_stock_cero = stock_values <= 0
+        mask_stock_cero = model.stock_at_most(0) if solo_stock_cero else model.all_rows()
 
-        mask_sel_ubic = pd.Series([True] * len(df), index=df.index)
+        mask_sel_ubic = model.all_rows()
         if self.ubicaciones_seleccionadas:
             sel_norm = {self._norm_text(v) for v in self.ubicaciones_seleccionadas}
-            mask_sel_ubic = m_ubi.isin(sel_norm)
+            mask_sel_ubic = model.isin("ubicacion", sel_norm)
 
         mask_total = mask_texto & mask_codigo_directo & mask_ubicacion_principal & mask_bodega & mask_stock_cero & mask_fila_letra & mask_posicion & mask_sel_ubic
 
         if mask_total.any():
-            self.df_filtrado = df.loc[mask_total].reset_index(drop=True)
+            self._filtrado_pos = np.flatnonzero(mask_total)
+            self.df_filtrado = df.iloc[self._filtrado_pos].reset_index(drop=True)
             if codigo_producto:
                 self.tipo_busqueda = "codigo"
             elif self.ubicaciones_seleccionadas or ubicaciones_principales or bodega not in ("", "todas") or solo_stock_cero or fila_letra or posicion or mask_ubi.any():
@@ -545,60 +648,40 @@ class InventarioView(tk.Toplevel):
         if target_df.empty or column not in target_df.columns:
             return
 
-        sorted_df = self._sorted_dataframe(target_df, column, self.sort_ascending)
+        if self._search_model is None or len(self._search_model) != len(self.df):
+            self._search_model = InventorySearchModel(self.df)
+        keys = self._search_model.sort_keys
+
         if not self.df_filtrado.empty:
-            self.df_filtrado = sorted_df.reset_index(drop=True)
+            positions = self._filtrado_pos
+            if positions is None or len(positions) != len(self.df_filtrado):
+                # Vista sin posiciones conocidas en self.df: claves propias
+                order = InventorySortKeys(self.df_filtrado).order(column, self.sort_ascending)
+                self.df_filtrado = self.df_filtrado.iloc[order].reset_index(drop=True)
+            else:
+                order = keys.order(column, self.sort_ascending, positions)
+                self.df_filtrado = self.df.iloc[order].reset_index(drop=True)
+                self._filtrado_pos = order
             self._actualizar_tree(self.df_filtrado)
         else:
-            self.df = sorted_df.reset_index(drop=True)
+            order = keys.order(column, self.sort_ascending)
+            self._search_model = self._search_model.take(order)
+            self.df = self._search_model.df
             self._actualizar_tree(self.df)
 
-    def _sorted_dataframe(self, df: pd.DataFrame, column: str, ascending: bool) -> pd.DataFrame:
-        s = df[column]
-        numeric = pd.to_numeric(s, errors="coerce")
-        if numeric.notna().any():
-            return df.assign(__sort_key=numeric).sort_values(
-                by="__sort_key",
-                ascending=ascending,
-                na_position="last",
-                kind="mergesort",
-            ).drop(columns=["__sort_key"])
-
-        if column == "Fecha Vencimiento":
-            dt = pd.to_datetime(s, format="%d/%m/%Y", errors="coerce")
-            if dt.notna().any():
-                return df.assign(__sort_key=dt).sort_values(
-                    by="__sort_key",
-                    ascending=ascending,
-                    na_position="last",
-                    kind="mergesort",
-                ).drop(columns=["__sort_key"])
-
-        txt = s.astype(str).map(self._norm_text)
-        return df.assign(__sort_key=txt).sort_values(
-            by="__sort_key",
-            ascending=ascending,
-            na_position="last",
-            kind="mergesort",
-        ).drop(columns=["__sort_key"])
-
     # --------------------------- Actualizar UI ---------------------------
 
     def _actualizar_tree(self, df: pd.DataFrame):
         self._update_heading_texts()
-        self.tree.delete(*self.tree.get_children())
+        # La tabla solo inserta las filas visibles; las casillas marcadas
+        # (posiciones en df) viven en self.selected_row_ids.
+        self.table.checked = self.selected_row_ids
+        self.table.set_frame(df)
         if df is None or df.empty:
             self.summary_var.set("Registros: 0")
             self._autoajustar_columna_producto()
             return
 
-        for i, row in enumerate(df[VISIBLE_COLUMNS].itertuples(index=False)):
-            tag = "even" if i % 2 == 0 else "odd"
-            marker = "☑" if i in self.selected_row_ids else "☐"
-            self.tree.insert("", "end", iid=str(i), values=(marker, *row), tags=(tag,))
-
-        self.tree.tag_configure("even", background="#FFFFFF")
-        self.tree.tag_configure("odd", background="#F6F8FD")
         self._autoajustar_columna_producto(df)
         origen = self._archivo_actual or "sin archivo"
         self.summary_var.set(f"Registros: {len(df)} | Fuente: {origen}")
@@ -657,20 +740,8 @@ class InventarioView(tk.Toplevel):
         else:
             self.selected_row_ids = set(range(len(current)))
             self.status_var.set(f"Seleccionados {len(self.selected_row_ids)} registros visibles.")
-        self._actualizar_tree(current)
-
-    def _on_tree_click(self, event):
-        region = self.tree.identify("region", event.x, event.y)
-        column = self.tree.identify_column(event.x)
-        row_id = self.tree.identify_row(event.y)
-        if region == "cell" and column == "#1" and row_id:
-            idx = int(row_id)
-            if idx in self.selected_row_ids:
-                self.selected_row_ids.remove(idx)
-            else:
-                self.selected_row_ids.add(idx)
-            self._actualizar_tree(self._current_view_df())
-            return "break"
+        self.table.checked = self.selected_row_ids
+        self.table.refresh()
 
     def _update_heading_texts(self):
         self.tree.heading("Sel", text="Sel", anchor="center")
@@ -746,27 +817,13 @@ class InventarioView(tk.Toplevel):
         return set(tokens)
 
     def _extract_main_row(self, ubicacion: str) -> str:
-        value = str(ubicacion or "").strip()
-        if not value:
-            return ""
-        main = value.split("-", 1)[0].strip()
-        return self._norm_text(main)
+        return extract_main_row(ubicacion)
 
     def _extract_letter_row(self, ubicacion: str) -> str:
-        value = str(ubicacion or "").strip()
-        if "-" not in value:
-            return ""
-        suffix = value.split("-", 1)[1].strip()
-        letters = "".join(ch for ch in suffix if ch.isalpha())
-        return self._norm_text(letters)
+        return extract_letter_row(ubicacion)
 
     def _extract_position(self, ubicacion: str) -> str:
-        value = str(ubicacion or "").strip()
-        if "-" not in value:
-            return ""
-        suffix = value.split("-", 1)[1].strip()
-        digits = "".join(ch for ch in suffix if ch.isdigit())
-        return self._norm_text(digits)
+        return extract_position(ubicacion)
 
     def _seleccionar_por_ubicacion_principal(self):
         if self.df.empty:
@@ -781,13 +838,7 @@ class InventarioView(tk.Toplevel):
             self._filtrar()
             return
 
-        ubicaciones_match = sorted(
-            {
-                ubicacion
-                for ubicacion in self.ubicaciones_disponibles
-                if self._extract_main_row(ubicacion) in ubicaciones_principales
-            }
-        )
+        ubicaciones_match = self._ubicaciones_tree.locations_for_main(ubicaciones_principales)
 
         if not ubicaciones_match:
             self.safe_messagebox("info", "Seleccionar ubicación", "No se encontraron ubicaciones para la ubicación indicada.")
@@ -799,13 +850,7 @@ class InventarioView(tk.Toplevel):
         self._actualizar_label_ubicaciones_principales()
         self._actualizar_label_ubicaciones()
 
-        counts = (
-            self.df.assign(__ubicacion_principal=self.df["Ubicación"].map(self._extract_main_row))
-            .loc[lambda d: d["__ubicacion_principal"].isin(ubicaciones_principales)]
-            .groupby("__ubicacion_principal")
-            .size()
-            .to_dict()
-        )
+        counts = self._ubicaciones_tree.main_counts
         resumen = ", ".join(f"{ubicacion}: {counts.get(ubicacion, 0)}" for ubicacion in sorted(ubicaciones_principales))
         self.status_var.set(f"Ubicaciones aplicadas. {resumen}")
         self._filtrar()
@@ -846,47 +891,50 @@ class InventarioView(tk.Toplevel):
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
 
+        tree = self._ubicaciones_tree
         vars_map = {
             u: tk.BooleanVar(value=(u in self.ubicaciones_seleccionadas))
-            for u in self.ubicaciones_disponibles
+            for u in tree.locations
         }
 
-        def matches_location(location: str, term: str) -> bool:
-            if not term:
-                return True
-            loc_n = self._norm_text(location)
-            if term in loc_n:
-                return True
-            return SequenceMatcher(None, term, loc_n).ratio() >= 0.62
-
         def on_check_change():
             seleccion = {u for u, var in vars_map.items() if var.get()}
             self.ubicaciones_seleccionadas = seleccion
             self._actualizar_label_ubicaciones()
 
-        def rebuild_list():
-            for widget in inner.winfo_children():
-                widget.destroy()
-            term = self._norm_text(search_var.get())
-            visibles = [u for u in self.ubicaciones_disponibles if matches_location(u, term)]
-            if not visibles:
-                ttk.Label(inner, text="Sin coincidencias").pack(anchor="w", padx=4, pady=4)
-                return
-            for loc in visibles:
-                ttk.Checkbutton(
-                    inner,
-                    text=loc,
-                    variable=vars_map[loc],
-                    command=on_check_change,
-                ).pack(anchor="w", padx=4, pady=1)
+        # Un Checkbutton por ubicación, creado una vez; al buscar solo se
+        # muestran/ocultan los que cambian (grid recuerda su fila).
+        checks = {
+            loc: ttk.Checkbutton(
+                inner,
+                text=f"{loc} ({tree.counts[loc]})",
+                variable=vars_map[loc],
+                command=on_check_change,
+            )
+            for loc in tree.locations
+        }
+        sin_coincidencias = ttk.Label(inner, text="Sin coincidencias")
+        visibles: list[str] = []
+
+        def update_list():
+            nonlocal visibles
+            nuevos = tree.match(self._norm_text(search_var.get()))
+            nuevos_set, previos_set = set(nuevos), set(visibles)
+            for loc in previos_set - nuevos_set:
+                checks[loc].grid_remove()
+            for row, loc in enumerate(tree.locations, start=1):
+                if loc in nuevos_set and loc not in previos_set:
+                    checks[loc].grid(row=row, column=0, sticky="w", padx=4, pady=1)
+            if nuevos:
+                sin_coincidencias.grid_remove()
+            else:
+                sin_coincidencias.grid(row=0, column=0, sticky="w", padx=4, pady=4)
+            visibles = nuevos
 
         def seleccionar_visibles(valor: bool):
-            term = self._norm_text(search_var.get())
-            for loc in self.ubicaciones_disponibles:
-                if matches_location(loc, term):
-                    vars_map[loc].set(valor)
+            for loc in visibles:
+                vars_map[loc].set(valor)
             on_check_change()
-            rebuild_list()
 
         def aplicar_y_filtrar():
             on_check_change()
@@ -900,16 +948,16 @@ class InventarioView(tk.Toplevel):
         ttk.Button(action_row, text="Desmarcar visibles", command=lambda: seleccionar_visibles(False)).pack(side="left", padx=(6, 0))
         ttk.Button(action_row, text="Aplicar", command=aplicar_y_filtrar).pack(side="right")
 
-        search_var.trace_add("write", lambda *_: rebuild_list())
-        rebuild_list()
+        search_var.trace_add("write", lambda *_: update_list())
+        update_list()
 
     def _filtrar_desde_selector(self):
         tiene_texto = bool(self._norm_text(self.entry_busqueda.get()))
         tiene_codigo = bool(self._norm_text(self.entry_codigo.get()))
         tiene_bodega = self._norm_text(self.bodega_var.get()) not in ("", "todas")
         tiene_stock_cero = bool(self.stock_cero_var.get())
-        tiene_col = bool(self._norm_text(self.entry_columna.get()))
-        tiene_fila = bool(self._norm_text(self.entry_fila.get()))
+        tiene_col = bool(self._norm_text(self.entry_fila_letra.get()))
+        tiene_fila = bool(self._norm_text(self.entry_posicion.get()))
         if self.ubicaciones_seleccionadas or tiene_texto or tiene_codigo or tiene_bodega or tiene_stock_cero or tiene_col or tiene_fila:
             self._filtrar()
         else:
@@ -3,16 +3,228 @@
 """
 Preview CRUD: módulo único que provee
 - PreviewCRUDFrame: widget CRUD reutilizable sobre un pandas.DataFrame
+- UndoLog: historial deshacer/rehacer por deltas (celdas, filas agregadas,
+  filas eliminadas) con tope de memoria
 - open_preview_crud: función que crea la ventana Toplevel de Vista Previa
 """
 
 from __future__ import annotations
 
+import sys
 import tkinter as tk
+from collections import deque
+from dataclasses import dataclass, field
 from tkinter import ttk
 
+import numpy as np
 import pandas as pd
 
+from app.gui.virtual_tree import VirtualTreeview
+
+# Separador entre columnas en el texto de búsqueda: evita que el filtro
+# coincida con el final de una celda pegado al inicio de la siguiente.
+_SEARCH_SEP = "\x1f"
+
+
+def row_search_text(df: pd.DataFrame) -> pd.Series:
+    """Texto en minúsculas por fila con todas las celdas, para el filtro rápido."""
+    if df.empty or not len(df.columns):
+        return pd.Series("", index=df.index, dtype=object)
+    text = df.astype(str)
+    joined = text.iloc[:, 0]
+    for i in range(1, text.shape[1]):
+        joined = joined + _SEARCH_SEP + text.iloc[:, i]
+    return joined.str.lower()
+
+
+# ------------------------- Historial por deltas -------------------------
+#
+# Cada delta guarda solo lo que cambió y sabe aplicarse (apply) y revertirse
+# (revert) sobre el DataFrame actual. Las filas se identifican por posición,
+# no por etiqueta: el índice del listado puede traer etiquetas repetidas.
+
+UNDO_MAX_BYTES = 64 * 1024 * 1024
+
+
+def _frame_nbytes(df: pd.DataFrame) -> int:
+    try:
+        return int(df.memory_usage(index=True, deep=True).sum())
+    except Exception:
+        return 0
+
+
+def _restore_dtypes(df: pd.DataFrame, dtypes: dict[int, object]) -> pd.DataFrame:
+    for j, dtype in dtypes.items():
+        if j < df.shape[1] and df.dtypes.iloc[j] != dtype:
+            try:
+                df.isetitem(j, df.iloc[:, j].astype(dtype))
+            except (TypeError, ValueError):
+                pass
+    return df
+
+
+@dataclass
+class CellEdit:
+    """Celdas editadas de una fila: {posición de columna: valor}."""
+
+    position: int
+    before: dict[int, object]
+    after: dict[int, object]
+    dtypes: dict[int, object] = field(default_factory=dict)
+
+    @classmethod
+    def capture(cls, df: pd.DataFrame, position: int, values: dict[int, object]) -> "CellEdit":
+        before = {j: df.iat[position, j] for j in values}
+        dtypes = {j: df.dtypes.iloc[j] for j in values}
+        return cls(position, before, dict(values), dtypes)
+
+    @property
+    def nbytes(self) -> int:
+        values = list(self.before.values()) + list(self.after.values())
+        return 64 + sum(sys.getsizeof(v) for v in values)
+
+    def _set(self, df: pd.DataFrame, values: dict[int, object]) -> pd.DataFrame:
+        for j, value in values.items():
+            if df.dtypes.iloc[j] != object and isinstance(value, str):
+                # Texto en una columna numérica/fecha: se pasa a object solo esa columna
+                df.isetitem(j, df.iloc[:, j].astype(object))
+            df.iat[self.position, j] = value
+        return df
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self._set(df, self.after)
+
+    def revert(self, df: pd.DataFrame) -> pd.DataFrame:
+        return _restore_dtypes(self._set(df, self.before), self.dtypes)
+
+
+@dataclass
+class RowsInserted:
+    """Filas agregadas al final del DataFrame."""
+
+    rows: pd.DataFrame
+    dtypes: dict[int, object] = field(default_factory=dict)
+
+    @property
+    def nbytes(self) -> int:
+        return 64 + _frame_nbytes(self.rows)
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        self.dtypes = {j: dtype for j, dtype in enumerate(df.dtypes)}
+        return pd.concat([df, self.rows], ignore_index=False)
+
+    def revert(self, df: pd.DataFrame) -> pd.DataFrame:
+        return _restore_dtypes(df.iloc[: len(df) - len(self.rows)].copy(), self.dtypes)
+
+
+@dataclass
+class RowsDeleted:
+    """Filas eliminadas, con sus datos y posiciones originales (ordenadas)."""
+
+    positions: np.ndarray
+    rows: pd.DataFrame
+
+    @classmethod
+    def capture(cls, df: pd.DataFrame, positions) -> "RowsDeleted":
+        positions = np.unique(np.asarray(positions, dtype=np.int64))
+        return cls(positions, df.iloc[positions].copy())
+
+    @property
+    def nbytes(self) -> int:
+        return 64 + self.positions.nbytes + _frame_nbytes(self.rows)
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        keep = np.ones(len(df), dtype=bool)
+        keep[self.positions] = False
+        return df.iloc[keep].copy()
+
+    def revert(self, df: pd.DataFrame) -> pd.DataFrame:
+        total = len(df) + len(self.rows)
+        deleted = np.zeros(total, dtype=bool)
+        deleted[self.positions] = True
+        order = np.empty(total, dtype=np.int64)
+        order[~deleted] = np.arange(len(df))
+        order[deleted] = len(df) + np.arange(len(self.rows))
+        dtypes = {j: dtype for j, dtype in enumerate(df.dtypes)}
+        merged = pd.concat([df, self.rows], ignore_index=False).iloc[order].copy()
+        return _restore_dtypes(merged, dtypes)
+
+
+@dataclass
+class FrameReplaced:
+    """Reemplazo completo del DataFrame (set_dataframe)."""
+
+    before: pd.DataFrame
+    after: pd.DataFrame
+
+    @property
+    def nbytes(self) -> int:
+        return 64 + _frame_nbytes(self.before)
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self.after
+
+    def revert(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self.before
+
+
+class UndoLog:
+    """
+    Historial deshacer/rehacer de deltas. Deshacer/rehacer cuesta lo que cambió,
+    no una copia del DataFrame. Con `max_bytes` se descartan los deltas más
+    antiguos al pasar el tope (siempre queda al menos el último); con None el
+    historial no tiene límite.
+    """
+
+    def __init__(self, max_bytes: int | None = UNDO_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._undo: deque = deque()
+        self._redo: list = []
+        self.nbytes = 0
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def __len__(self) -> int:
+        return len(self._undo)
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self.nbytes = 0
+
+    def apply(self, df: pd.DataFrame, delta) -> pd.DataFrame:
+        """Aplica `delta` sobre `df`, lo registra y descarta lo que había para rehacer."""
+        result = delta.apply(df)
+        for old in self._redo:
+            self.nbytes -= old.nbytes
+        self._redo.clear()
+        self._undo.append(delta)
+        self.nbytes += delta.nbytes
+        self._trim()
+        return result
+
+    def undo(self, df: pd.DataFrame) -> pd.DataFrame:
+        delta = self._undo.pop()
+        self._redo.append(delta)
+        return delta.revert(df)
+
+    def redo(self, df: pd.DataFrame) -> pd.DataFrame:
+        delta = self._redo.pop()
+        self._undo.append(delta)
+        return delta.apply(df)
+
+    def _trim(self):
+        if self.max_bytes is None:
+            return
+        while self.nbytes > self.max_bytes and len(self._undo) > 1:
+            self.nbytes -= self._undo.popleft().nbytes
+
 
 class PreviewCRUDFrame(ttk.Frame):
     def __init__(
@@ -22,14 +234,19 @@ class PreviewCRUDFrame(ttk.Frame):
         total_cols: list[str] | None = None,
         on_change=None,
         title: str | None = None,
+        undo_max_bytes: int | None = UNDO_MAX_BYTES,
         **kwargs,
     ):
         super().__init__(master, **kwargs)
         self._df: pd.DataFrame = df.copy(deep=True) if df is not None else pd.DataFrame()
-        self._undo_stack: list[pd.DataFrame] = []
+        self._history = UndoLog(undo_max_bytes)
         self._total_cols = total_cols or []
         self._on_change = on_change
         self._filter_var = tk.StringVar(value="")
+        # Texto de búsqueda por fila; se recalcula solo cuando cambia _df
+        self._search_text: pd.Series | None = None
+        self._visible: pd.DataFrame = self._df
+        self._visible_pos = np.arange(len(self._df))
 
         self._configure_styles()
 
@@ -69,6 +286,7 @@ class PreviewCRUDFrame(ttk.Frame):
         ttk.Button(actions, text="Editar", style="PreviewAction.TButton", command=self._open_edit_dialog).pack(side=tk.LEFT, padx=3)
         ttk.Button(actions, text="Eliminar", style="PreviewAction.TButton", command=self._delete_selected_rows).pack(side=tk.LEFT, padx=3)
         ttk.Button(actions, text="Deshacer", style="PreviewGhost.TButton", command=self._undo_last).pack(side=tk.LEFT, padx=3)
+        ttk.Button(actions, text="Rehacer", style="PreviewGhost.TButton", command=self._redo_last).pack(side=tk.LEFT, padx=3)
         ttk.Button(actions, text="Guardar cambios", style="PreviewPrimary.TButton", command=self._emit_change).pack(side=tk.LEFT, padx=(8, 0))
 
         table_shell = tk.Frame(shell, bg="#FFFFFF", highlightthickness=1, highlightbackground="#D8E4EF")
@@ -77,14 +295,9 @@ class PreviewCRUDFrame(ttk.Frame):
         table_frame = ttk.Frame(table_shell, padding=(10, 10, 10, 6))
         table_frame.pack(fill=tk.BOTH, expand=True)
 
-        self._tv = ttk.Treeview(table_frame, show="headings", selectmode="extended", style="Preview.Treeview")
-        vsb = ttk.Scrollbar(table_frame, orient="vertical", command=self._tv.yview)
-        hsb = ttk.Scrollbar(table_frame, orient="horizontal", command=self._tv.xview)
-        self._tv.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
-
-        self._tv.grid(row=0, column=0, sticky="nsew")
-        vsb.grid(row=0, column=1, sticky="ns")
-        hsb.grid(row=1, column=0, sticky="ew")
+        self._table = VirtualTreeview(table_frame, [], selectmode="extended", style="Preview.Treeview")
+        self._tv = self._table.tree
+        self._table.grid(row=0, column=0, sticky="nsew")
         table_frame.grid_rowconfigure(0, weight=1)
         table_frame.grid_columnconfigure(0, weight=1)
 
@@ -119,12 +332,16 @@ class PreviewCRUDFrame(ttk.Frame):
         return self._df.copy(deep=True)
 
     def set_dataframe(self, df: pd.DataFrame):
-        self._push_undo()
-        self._df = df.copy(deep=True) if df is not None else pd.DataFrame()
-        self._setup_columns()
-        self.refresh()
+        nuevo = df.copy(deep=True) if df is not None else pd.DataFrame()
+        self._apply_delta(FrameReplaced(self._df, nuevo))
 
     def refresh(self):
+        # La vista filtrada se calcula una vez y la comparten tabla, anchos y totales
+        self._visible_pos = self._visible_positions()
+        if len(self._visible_pos) == len(self._df):
+            self._visible = self._df
+        else:
+            self._visible = self._df.iloc[self._visible_pos]
         self._fill_rows()
         self._auto_widths()
         self._update_totals_label()
@@ -133,18 +350,27 @@ class PreviewCRUDFrame(ttk.Frame):
         self._filter_var.set("")
         self.refresh()
 
-    def _visible_df(self) -> pd.DataFrame:
-        if self._df.empty:
-            return self._df
+    def _invalidate_search(self):
+        self._search_text = None
+
+    def _row_search_text(self) -> pd.Series:
+        if self._search_text is None or len(self._search_text) != len(self._df):
+            self._search_text = row_search_text(self._df)
+        return self._search_text
 
+    def _visible_positions(self) -> np.ndarray:
+        """Posiciones en _df de las filas que pasan el filtro rápido."""
         query = (self._filter_var.get() or "").strip().lower()
-        if not query:
-            return self._df
+        if self._df.empty or not query:
+            return np.arange(len(self._df))
+
+        mask = self._row_search_text().str.contains(query, regex=False).to_numpy(dtype=bool)
+        return np.flatnonzero(mask)
 
-        mask = self._df.astype(str).apply(
-            lambda col: col.str.lower().str.contains(query, na=False)
-        ).any(axis=1)
-        return self._df.loc[mask]
+    def _selected_df_positions(self) -> list[int]:
+        """Filas seleccionadas en la tabla, como posiciones en _df."""
+        visibles = self._visible_pos
+        return [int(visibles[p]) for p in self._table.selected_positions() if p < len(visibles)]
 
     def _setup_columns(self):
         cols = list(self._df.columns) if not self._df.empty else []
@@ -154,25 +380,18 @@ class PreviewCRUDFrame(ttk.Frame):
             self._tv.column(c, width=120, anchor=tk.CENTER)
 
     def _fill_rows(self):
-        for item in self._tv.get_children():
-            self._tv.delete(item)
-
         if self._df.empty:
+            self._table.set_frame(self._df, [])
             self._info_lbl.configure(text="Sin datos")
             return
 
-        visible_df = self._visible_df()
+        visible_df = self._visible
+        self._table.set_frame(visible_df, list(self._df.columns))
         if visible_df.empty:
             self._info_lbl.configure(text="Sin coincidencias")
-            return
-
-        for pos, (idx, row) in enumerate(visible_df.iterrows()):
-            values = [row.get(c, "") for c in self._df.columns]
-            tag = "even" if pos % 2 == 0 else "odd"
-            self._tv.insert("", "end", iid=str(idx), values=values, tags=(tag,))
 
     def _auto_widths(self):
-        visible_df = self._visible_df()
+        visible_df = self._visible
         if visible_df.empty:
             return
 
@@ -192,7 +411,7 @@ class PreviewCRUDFrame(ttk.Frame):
             self._info_lbl.configure(text="Sin datos")
             return
 
-        visible_df = self._visible_df()
+        visible_df = self._visible
         parts = [f"{len(visible_df):,} visibles"]
         if len(visible_df) != len(self._df):
             parts.append(f"{len(self._df):,} totales")
@@ -205,18 +424,24 @@ class PreviewCRUDFrame(ttk.Frame):
                     pass
         self._info_lbl.configure(text=" | ".join(parts))
 
-    def _push_undo(self):
-        try:
-            self._undo_stack.append(self._df.copy(deep=True))
-            if len(self._undo_stack) > 12:
-                self._undo_stack.pop(0)
-        except Exception:
-            pass
+    def _set_df(self, df: pd.DataFrame):
+        columnas_antes = list(self._df.columns)
+        self._df = df
+        self._invalidate_search()
+        if list(df.columns) != columnas_antes:
+            self._setup_columns()
+        self.refresh()
+
+    def _apply_delta(self, delta):
+        self._set_df(self._history.apply(self._df, delta))
 
     def _undo_last(self):
-        if self._undo_stack:
-            self._df = self._undo_stack.pop()
-            self.refresh()
+        if self._history.can_undo:
+            self._set_df(self._history.undo(self._df))
+
+    def _redo_last(self):
+        if self._history.can_redo:
+            self._set_df(self._history.redo(self._df))
 
     def _emit_change(self):
         if callable(self._on_change):
@@ -228,18 +453,16 @@ class PreviewCRUDFrame(ttk.Frame):
         self._toast("Cambios guardados en la vista previa.")
 
     def _open_edit_dialog(self):
-        sel = self._tv.selection()
-        if not sel:
+        if not self._table.selected_positions():
             self._toast("Selecciona una fila para editar.")
             return
-        iid = sel[0]
-        try:
-            idx = self._df.index[self._df.index.astype(str) == iid][0]
-        except Exception:
+        sel = self._selected_df_positions()
+        if not sel:
             self._toast("No se pudo mapear la fila seleccionada.")
             return
+        pos = sel[0]
 
-        row = self._df.loc[idx]
+        row = self._df.iloc[pos]
         cols = list(self._df.columns)
 
         win = tk.Toplevel(self)
@@ -248,46 +471,46 @@ class PreviewCRUDFrame(ttk.Frame):
         frm = ttk.Frame(win, padding=12)
         frm.pack(fill=tk.BOTH, expand=True)
 
-        entries = {}
+        entries = []
+        originales = []
         for i, c in enumerate(cols):
             ttk.Label(frm, text=c).grid(row=i, column=0, sticky="w", padx=6, pady=4)
             e = ttk.Entry(frm, width=52)
-            e.insert(0, "" if pd.isna(row.get(c)) else str(row.get(c)))
+            valor = row.iloc[i]
+            texto = "" if pd.isna(valor) else str(valor)
+            e.insert(0, texto)
             e.grid(row=i, column=1, sticky="ew", padx=6, pady=4)
-            entries[c] = e
+            entries.append(e)
+            originales.append(texto)
         frm.grid_columnconfigure(1, weight=1)
 
         def guardar():
-            self._push_undo()
-            for c in cols:
-                self._df.loc[idx, c] = entries[c].get()
+            # Solo las celdas que cambiaron: las demás conservan su tipo
+            cambios = {
+                j: e.get()
+                for j, (e, texto) in enumerate(zip(entries, originales))
+                if e.get() != texto
+            }
             win.destroy()
-            self.refresh()
+            if not cambios:
+                return
+            self._apply_delta(CellEdit.capture(self._df, pos, cambios))
             self._emit_change()
 
         ttk.Button(frm, text="Guardar", command=guardar).grid(row=len(cols), column=0, padx=6, pady=12)
         ttk.Button(frm, text="Cancelar", command=win.destroy).grid(row=len(cols), column=1, padx=6, pady=12, sticky="e")
 
     def _delete_selected_rows(self):
-        sel = self._tv.selection()
-        if not sel:
+        if not self._table.selected_positions():
             self._toast("Selecciona una o mas filas para eliminar.")
             return
 
-        idx_list = []
-        for iid in sel:
-            try:
-                idx = self._df.index[self._df.index.astype(str) == iid][0]
-                idx_list.append(idx)
-            except Exception:
-                pass
-        if not idx_list:
+        positions = self._selected_df_positions()
+        if not positions:
             self._toast("No se pudieron mapear las filas seleccionadas.")
             return
 
-        self._push_undo()
-        self._df = self._df.drop(index=idx_list, errors="ignore")
-        self.refresh()
+        self._apply_delta(RowsDeleted.capture(self._df, positions))
         self._emit_change()
 
     def _add_row_dialog(self):
@@ -314,12 +537,10 @@ class PreviewCRUDFrame(ttk.Frame):
             if not cols:
                 win.destroy()
                 return
-            self._push_undo()
             data = {c: entries[c].get() for c in cols}
             new_row = pd.DataFrame([data])
-            self._df = pd.concat([self._df, new_row], ignore_index=False)
             win.destroy()
-            self.refresh()
+            self._apply_delta(RowsInserted(new_row))
             self._emit_change()
 
         ttk.Button(frm, text="Agregar", command=agregar).grid(row=len(cols), column=0, padx=6, pady=12)
@@ -336,6 +557,7 @@ def open_preview_crud(
     mode: str,
     on_print,
     on_df_change=None,
+    on_export=None,
 ) -> tk.Toplevel:
     try:
         if getattr(parent_app, "_preview_win", None) is not None and parent_app._preview_win.winfo_exists():
@@ -386,6 +608,8 @@ def open_preview_crud(
         pady=8,
     ).pack(anchor="e", pady=(0, 8))
     ttk.Button(hero_right, text="Imprimir ahora", command=on_print).pack(anchor="e")
+    if callable(on_export):
+        ttk.Button(hero_right, text="Exportar Excel", command=on_export).pack(anchor="e", pady=(6, 0))
 
     total_cols = ["BULTOS"] if (mode or "").strip().lower() == "fedex" else []
 
@@ -3,27 +3,27 @@
 
 from __future__ import annotations
 
-import json
 import logging
 import tkinter as tk
 from tkinter import ttk, messagebox
 from pathlib import Path
 import unicodedata
 import re
-from difflib import get_close_matches
-import zipfile
-import xml.etree.ElementTree as ET
 
 import pandas as pd
 from app.utils.app_dirs import DATA_DIR, ensure_file
+from app.utils.ods_reader import read_ods_rows
+from app.utils.search_index import EXACT, SUBSTRING, ColumnSearchIndex
+from app.services.clientes_index import ClientesIndex, cargar_indice_clientes
+from app.services.sra_mary_store import SraMaryStore
 from app.gui.etiqueta_editor import (
     CLIENTES_PATH_KEY,
     buscar_cliente_por_rut,
-    cargar_clientes as cargar_clientes_excel,
     cargar_config as cargar_config_etiquetas,
 )
 
 
+# JSON de versiones anteriores: solo se lee una vez para migrarlo a SQLite
 DB_PATH = ensure_file(
     DATA_DIR / "sra_mary_db.json",
     legacy_candidates=(Path("data/sra_mary_db.json"),),
@@ -33,26 +33,6 @@ DB_PATH = ensure_file(
 logger = logging.getLogger("eventos_logger")
 
 
-def guardar_datos_json(data: list) -> None:
-    try:
-        with open(DB_PATH, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
-        logger.info("Base de datos Sra Mary actualizada.")
-    except Exception as e:
-        logger.error(f"No se pudo guardar Sra Mary DB: {e}")
-        raise
-
-
-def cargar_clientes() -> list:
-    try:
-        with open(DB_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return data if isinstance(data, list) else []
-    except Exception as e:
-        logger.warning(f"No se pudo cargar Sra Mary DB: {e}")
-        return []
-
-
 def _norm_text(s: str) -> str:
     s = str(s or "").strip().lower()
     s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
@@ -72,37 +52,97 @@ def _find_col(cols_norm: dict[str, str], *names: str) -> str | None:
     return None
 
 
-def _buscar_cliente_por_nombre(df_clientes: pd.DataFrame | None, nombre: str) -> dict | None:
-    if df_clientes is None or df_clientes.empty:
-        return None
-    term = _norm_text(nombre)
-    if not term:
-        return None
+class ClientNameIndex:
+    """
+    Índice de nombres del Excel de clientes, armado una vez al cargar la
+    fuente y compartido por las sugerencias y la búsqueda por nombre.
 
-    cols_norm = {_norm_col(c): c for c in df_clientes.columns}
-    col_nombre = _find_col(cols_norm, "razsoc", "razon social", "cliente", "nombre cliente", "nombre")
-    col_dir = _find_col(cols_norm, "dir", "direccion", "domicilio")
-    col_comuna = _find_col(cols_norm, "comuna")
-    col_ciudad = _find_col(cols_norm, "ciudad")
-    if not col_nombre:
-        return None
+    Usa el ranking de ColumnSearchIndex (exacta, prefijo, prefijo de palabra,
+    subcadena; difusa si nada coincide) sobre los nombres normalizados.
+    """
 
-    serie_nombre = df_clientes[col_nombre].astype(str).map(_norm_text)
-    exact = df_clientes[serie_nombre == term]
-    if not exact.empty:
-        row = exact.iloc[0]
-    else:
-        mask = serie_nombre.str.contains(re.escape(term), na=False)
-        if not mask.any():
+    def __init__(self, df_clientes: pd.DataFrame, col_nombre: str):
+        self.df = df_clientes
+        cols_norm = {_norm_col(c): c for c in df_clientes.columns}
+        self.col_nombre = col_nombre
+        self.col_dir = _find_col(cols_norm, "dir", "direccion", "domicilio")
+        self.col_comuna = _find_col(cols_norm, "comuna")
+        self.col_ciudad = _find_col(cols_norm, "ciudad")
+        self.index = ColumnSearchIndex(df_clientes[col_nombre], normalize=_norm_text)
+
+    @classmethod
+    def from_frame(cls, df_clientes: pd.DataFrame | None) -> "ClientNameIndex | None":
+        if df_clientes is None or df_clientes.empty:
+            return None
+        cols_norm = {_norm_col(c): c for c in df_clientes.columns}
+        col_nombre = _find_col(cols_norm, "razsoc", "razon social", "cliente", "nombre cliente", "nombre")
+        if not col_nombre:
             return None
-        row = df_clientes[mask].iloc[0]
+        return cls(df_clientes, col_nombre)
+
+    def _primera_fila(self, text_id: int) -> int:
+        return int(self.index.rows(text_id)[0])
+
+    def fila(self, nombre: str) -> int | None:
+        """Posición de la fila con ese nombre (exacto, o la primera que lo contiene)."""
+        term = _norm_text(nombre)
+        if not term:
+            return None
+        ranks = self.index.rank(term)
+        exactas = [t for t, level in ranks.items() if level == EXACT]
+        if exactas:
+            return min(self._primera_fila(t) for t in exactas)
+        if len(term) < 3:
+            # rank() busca subcadenas por trigramas (desde 3 letras); las de
+            # 1-2 letras se buscan aquí recorriendo los nombres, como el filtro anterior
+            ranks = {t: SUBSTRING for t, text in enumerate(self.index.texts) if term in text}
+        if not ranks:
+            return None
+        return min(self._primera_fila(t) for t in ranks)
+
+    def sugerencias(self, query: str, limit: int = 6) -> list[str]:
+        term = _norm_text(query)
+        if not term:
+            return []
+        ranks = self.index.rank(term)
+        if not ranks:
+            ranks = self.index.fuzzy(term)
+        texts = self.index.texts
+        out: list[str] = []
+        vistos: set[str] = set()
+        # Variantes del mismo nombre normalizado se sugieren una vez
+        for text_id in sorted(ranks, key=lambda t: (ranks[t], texts[t], t)):
+            if not texts[text_id] or texts[text_id] in vistos:
+                continue
+            vistos.add(texts[text_id])
+            out.append(str(self.df[self.col_nombre].iat[self._primera_fila(text_id)]).strip())
+            if len(out) >= limit:
+                break
+        return out
+
+    def cliente(self, nombre: str) -> dict | None:
+        pos = self.fila(nombre)
+        if pos is None:
+            return None
+        row = self.df.iloc[pos]
+        return {
+            "razsoc": row.get(self.col_nombre, ""),
+            "dir": row.get(self.col_dir, "") if self.col_dir else "",
+            "comuna": row.get(self.col_comuna, "") if self.col_comuna else "",
+            "ciudad": row.get(self.col_ciudad, "") if self.col_ciudad else "",
+        }
 
-    return {
-        "razsoc": row.get(col_nombre, "") if col_nombre else "",
-        "dir": row.get(col_dir, "") if col_dir else "",
-        "comuna": row.get(col_comuna, "") if col_comuna else "",
-        "ciudad": row.get(col_ciudad, "") if col_ciudad else "",
-    }
+
+def _buscar_cliente_por_nombre(
+    df_clientes: pd.DataFrame | None,
+    nombre: str,
+    indice: ClientNameIndex | None = None,
+) -> dict | None:
+    if indice is None:
+        indice = ClientNameIndex.from_frame(df_clientes)
+    if indice is None:
+        return None
+    return indice.cliente(nombre)
 
 
 def _decode_day_codes(value: str) -> list[str]:
@@ -129,42 +169,7 @@ def _decode_day_codes(value: str) -> list[str]:
 
 
 def _read_transito_ods(path: Path) -> dict[tuple[str, str], set[str]]:
-    ns = {
-        "table": "urn:oasis:names:tc:opendocument:xmlns:table:1.0",
-        "text": "urn:oasis:names:tc:opendocument:xmlns:text:1.0",
-    }
-
-    def cell_text(cell) -> str:
-        vals = []
-        for p in cell.findall(".//text:p", ns):
-            t = "".join(p.itertext()).strip()
-            if t:
-                vals.append(t)
-        return " ".join(vals)
-
-    with zipfile.ZipFile(path, "r") as zf:
-        root = ET.fromstring(zf.read("content.xml"))
-
-    rows = None
-    for t in root.findall(".//table:table", ns):
-        name = t.get("{urn:oasis:names:tc:opendocument:xmlns:table:1.0}name", "")
-        if _norm_text(name) not in ("ubigeo", ""):
-            continue
-        tmp_rows = []
-        for tr in t.findall("table:table-row", ns):
-            rep_rows = int(tr.get("{urn:oasis:names:tc:opendocument:xmlns:table:1.0}number-rows-repeated", "1"))
-            one_row = []
-            for tc in tr.findall("table:table-cell", ns):
-                rep_cols = int(tc.get("{urn:oasis:names:tc:opendocument:xmlns:table:1.0}number-columns-repeated", "1"))
-                txt = cell_text(tc)
-                one_row.extend([txt] * rep_cols)
-            while one_row and one_row[-1] == "":
-                one_row.pop()
-            for _ in range(rep_rows):
-                tmp_rows.append(list(one_row))
-        if any(any(str(c).strip() for c in r) for r in tmp_rows):
-            rows = tmp_rows
-            break
+    rows = read_ods_rows(path, accept_table=lambda name: _norm_text(name) in ("ubigeo", ""))
 
     if not rows or len(rows) < 3:
         return {}
@@ -193,45 +198,60 @@ def _read_transito_ods(path: Path) -> dict[tuple[str, str], set[str]]:
     return out
 
 
-def _read_fedex_frequencies_xlsx(path: Path) -> dict[tuple[str, str], set[str]]:
-    out: dict[tuple[str, str], set[str]] = {}
-    xls = pd.ExcelFile(path, engine="openpyxl")
-    target_sheets = [s for s in xls.sheet_names if "frecuencia" in _norm_text(s)]
+# Planilla de frecuencias FedEx: columnas (0-based) de región, comuna y marcas "X" L..V
+FEDEX_REGION_COL = 3
+FEDEX_COMUNA_COL = 5
+FEDEX_DAY_COLUMNS = {8: "Lunes", 9: "Martes", 10: "Miércoles", 11: "Jueves", 12: "Viernes"}
+
+
+def _fedex_sheet_days(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Días con marca "X" por (región, comuna) normalizadas de una hoja de
+    frecuencias: un bool por día, agrupado con OR.
+    """
+    # Formato observado: fila 0 header, fila 1 dias, fila >=2 datos.
+    data = df.iloc[2:]
+    region = data.iloc[:, FEDEX_REGION_COL].astype(str).str.strip()
+    comuna = data.iloc[:, FEDEX_COMUNA_COL].astype(str).str.strip()
+    dias = list(FEDEX_DAY_COLUMNS.values())
+    marcas = (
+        data.iloc[:, list(FEDEX_DAY_COLUMNS)]
+        .apply(lambda col: col.astype(str).str.strip().str.upper())
+        .eq("X")
+        .set_axis(dias, axis=1)
+    )
+
+    validas = (region != "") & (comuna != "") & marcas.any(axis=1)
+    if not validas.any():
+        return marcas.iloc[0:0]
+
+    # Normaliza solo los valores distintos
+    region, comuna = region[validas], comuna[validas]
+    marcas = marcas[validas].assign(
+        region=region.map({v: _norm_text(v) for v in region.unique()}),
+        comuna=comuna.map({v: _norm_text(v) for v in comuna.unique()}),
+    )
+    return marcas.groupby(["region", "comuna"], sort=False)[dias].any()
 
-    for sh in target_sheets:
-        try:
-            df = pd.read_excel(path, sheet_name=sh, dtype=str, engine="openpyxl").fillna("")
-        except Exception:
-            continue
 
-        # Formato observado: fila 0 header, fila 1 dias, fila >=2 datos.
-        if len(df.columns) < 13 or len(df) < 3:
-            continue
+def _read_fedex_frequencies_xlsx(path: Path) -> dict[tuple[str, str], set[str]]:
+    out: dict[tuple[str, str], set[str]] = {}
+    with pd.ExcelFile(path, engine="openpyxl") as xls:
+        target_sheets = [s for s in xls.sheet_names if "frecuencia" in _norm_text(s)]
 
-        for i in range(2, len(df)):
-            region = str(df.iloc[i, 3]).strip()
-            comuna = str(df.iloc[i, 5]).strip()
-            if not region or not comuna:
+        for sh in target_sheets:
+            try:
+                df = xls.parse(sh, dtype=str).fillna("")
+            except Exception:
                 continue
 
-            # Columnas 8..12 corresponden a L, M, X, J, V con marca "X".
-            day_cells = [str(df.iloc[i, j]).strip().upper() for j in range(8, 13)]
-            dias = []
-            if day_cells[0] == "X":
-                dias.append("Lunes")
-            if day_cells[1] == "X":
-                dias.append("Martes")
-            if day_cells[2] == "X":
-                dias.append("Miércoles")
-            if day_cells[3] == "X":
-                dias.append("Jueves")
-            if day_cells[4] == "X":
-                dias.append("Viernes")
-
-            if not dias:
+            if len(df.columns) < 13 or len(df) < 3:
                 continue
-            key = (_norm_text(region), _norm_text(comuna))
-            out.setdefault(key, set()).update(dias)
+
+            por_comuna = _fedex_sheet_days(df)
+            dias = por_comuna.columns.to_numpy()
+            for key, fila in zip(por_comuna.index, por_comuna.to_numpy()):
+                out.setdefault(key, set()).update(dias[fila])
 
     return out
 
@@ -247,10 +267,11 @@ class SraMaryView(tk.Toplevel):
         self.dias_semana = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
         self.vars_fedex = {dia: tk.BooleanVar() for dia in self.dias_semana}
         self.vars_urbano = {dia: tk.BooleanVar() for dia in self.dias_semana}
-        self.datos = cargar_clientes()
+        self.store = SraMaryStore(legacy_json=DB_PATH)
         self.df_clientes_ref: pd.DataFrame | None = None
-        self.clientes_nombre_cache: list[str] = []
-        self.index_edicion: int | None = None
+        self.clientes_rut_index: ClientesIndex | None = None
+        self.clientes_index: ClientNameIndex | None = None
+        self.id_edicion: int | None = None
         self.status_var = tk.StringVar(value="Listo")
         self.sugerencias_var = tk.StringVar(value="")
         self._sugg_popup: tk.Toplevel | None = None
@@ -261,6 +282,13 @@ class SraMaryView(tk.Toplevel):
         self._cargar_fuente_clientes()
         self._cargar_datos_en_tree()
 
+    def destroy(self):
+        try:
+            self.store.close()
+        except Exception:
+            pass
+        super().destroy()
+
     def _setup_style(self):
         style = ttk.Style(self)
         try:
@@ -437,46 +465,24 @@ class SraMaryView(tk.Toplevel):
             cfg = cargar_config_etiquetas() or {}
             path = cfg.get(CLIENTES_PATH_KEY, "")
             if path and Path(path).exists():
-                self.df_clientes_ref = cargar_clientes_excel(path)
-                self.clientes_nombre_cache = self._extraer_nombres_clientes(self.df_clientes_ref)
+                self.clientes_rut_index = cargar_indice_clientes(path)
+                self.df_clientes_ref = self.clientes_rut_index.df if self.clientes_rut_index else None
+                self.clientes_index = ClientNameIndex.from_frame(self.df_clientes_ref)
                 logger.info(f"Sra Mary: fuente de clientes cargada desde {path}")
             else:
                 self.df_clientes_ref = None
-                self.clientes_nombre_cache = []
+                self.clientes_rut_index = None
+                self.clientes_index = None
         except Exception as e:
             logger.warning(f"Sra Mary: no se pudo cargar fuente de clientes: {e}")
             self.df_clientes_ref = None
-            self.clientes_nombre_cache = []
-
-    def _extraer_nombres_clientes(self, df_clientes: pd.DataFrame | None) -> list[str]:
-        if df_clientes is None or df_clientes.empty:
-            return []
-        cols_norm = {_norm_col(c): c for c in df_clientes.columns}
-        col_nombre = _find_col(cols_norm, "razsoc", "razon social", "cliente", "nombre cliente", "nombre")
-        if not col_nombre:
-            return []
-        vals = [str(v).strip() for v in df_clientes[col_nombre].fillna("").tolist()]
-        vals = [v for v in vals if v]
-        seen = set()
-        ordered = []
-        for v in vals:
-            k = _norm_text(v)
-            if k and k not in seen:
-                seen.add(k)
-                ordered.append(v)
-        return ordered
+            self.clientes_rut_index = None
+            self.clientes_index = None
 
     def _sugerencias_por_nombre(self, query: str, limit: int = 6) -> list[str]:
-        q = _norm_text(query)
-        if not q or not self.clientes_nombre_cache:
+        if self.clientes_index is None:
             return []
-        contains = [n for n in self.clientes_nombre_cache if q in _norm_text(n)]
-        if contains:
-            return contains[:limit]
-
-        norm_to_original = {_norm_text(n): n for n in self.clientes_nombre_cache}
-        close = get_close_matches(q, list(norm_to_original.keys()), n=limit, cutoff=0.55)
-        return [norm_to_original[c] for c in close]
+        return self.clientes_index.sugerencias(query, limit)
 
     def _hide_suggestions_popup(self):
         try:
@@ -582,9 +588,11 @@ class SraMaryView(tk.Toplevel):
             messagebox.showwarning("Dato faltante", "Ingresa RUT o nombre del cliente.")
             return
 
-        cliente = buscar_cliente_por_rut(self.df_clientes_ref, query)
+        cliente = buscar_cliente_por_rut(self.df_clientes_ref, query, self.clientes_rut_index)
+        if not cliente and self.clientes_rut_index is not None:
+            cliente = self.clientes_rut_index.buscar_razsoc(query)
         if not cliente:
-            cliente = _buscar_cliente_por_nombre(self.df_clientes_ref, query)
+            cliente = _buscar_cliente_por_nombre(self.df_clientes_ref, query, self.clientes_index)
         if not cliente:
             sugeridas = self._sugerencias_por_nombre(query)
             if sugeridas:
@@ -629,18 +637,25 @@ class SraMaryView(tk.Toplevel):
             "fedex_dias": dias_fedex,
             "urbano_dias": dias_urbano,
         }
-        self.datos.append(nuevo)
-        guardar_datos_json(self.datos)
+        self._guardar_registro(nuevo)
+
+    def _guardar_registro(self, registro: dict, cliente_id: int | None = None):
+        try:
+            self.store.guardar(registro, cliente_id)
+            logger.info("Base de datos Sra Mary actualizada.")
+        except Exception as e:
+            logger.error(f"No se pudo guardar Sra Mary DB: {e}")
+            return messagebox.showerror("Error", f"No se pudo guardar:\n{e}")
         self._limpiar_formulario()
-        self._cargar_datos_en_tree()
+        self._filtrar_tree()
 
-    def _cargar_datos_en_tree(self):
+    def _mostrar_registros(self, registros: list[dict]):
         self.tree.delete(*self.tree.get_children())
-        for idx, item in enumerate(self.datos):
+        for item in registros:
             self.tree.insert(
                 "",
                 "end",
-                iid=str(idx),
+                iid=str(item["id"]),
                 values=(
                     item.get("cliente", ""),
                     item.get("direccion", ""),
@@ -650,45 +665,28 @@ class SraMaryView(tk.Toplevel):
                     ", ".join(item.get("urbano_dias", [])),
                 ),
             )
-        self.status_var.set(f"Registros: {len(self.datos)}")
+
+    def _cargar_datos_en_tree(self):
+        registros = self.store.buscar()
+        self._mostrar_registros(registros)
+        self.status_var.set(f"Registros: {len(registros)}")
 
     def _filtrar_tree(self):
-        termino = self.entry_busqueda.get().strip().lower()
-        self.tree.delete(*self.tree.get_children())
-        total = 0
-        for idx, item in enumerate(self.datos):
-            hay = (
-                termino in item.get("cliente", "").lower()
-                or termino in item.get("direccion", "").lower()
-                or termino in item.get("region", "").lower()
-                or termino in item.get("comuna", "").lower()
-            )
-            if not termino or hay:
-                total += 1
-                self.tree.insert(
-                    "",
-                    "end",
-                    iid=str(idx),
-                    values=(
-                        item.get("cliente", ""),
-                        item.get("direccion", ""),
-                        item.get("region", ""),
-                        item.get("comuna", ""),
-                        ", ".join(item.get("fedex_dias", [])),
-                        ", ".join(item.get("urbano_dias", [])),
-                    ),
-                )
-        self.status_var.set(f"Registros filtrados: {total} de {len(self.datos)}")
+        termino = self.entry_busqueda.get().strip()
+        if not termino:
+            return self._cargar_datos_en_tree()
+        registros = self.store.buscar(termino)
+        self._mostrar_registros(registros)
+        self.status_var.set(f"Registros filtrados: {len(registros)} de {self.store.contar()}")
 
     def _cargar_edicion(self, _event):
         iid = self.tree.focus()
         if not iid:
             return
-        index = int(iid)
-        if index < 0 or index >= len(self.datos):
+        cliente = self.store.obtener(int(iid))
+        if cliente is None:
             return
-        cliente = self.datos[index]
-        self.index_edicion = index
+        self.id_edicion = cliente["id"]
 
         self.entry_cliente.delete(0, tk.END)
         self.entry_cliente.insert(0, cliente.get("cliente", ""))
@@ -704,7 +702,7 @@ class SraMaryView(tk.Toplevel):
             self.vars_urbano[dia].set(dia in cliente.get("urbano_dias", []))
 
     def _actualizar(self):
-        if self.index_edicion is None:
+        if self.id_edicion is None:
             return messagebox.showwarning("Sin seleccion", "Debes seleccionar un cliente desde la lista.")
 
         cliente = self.entry_cliente.get().strip()
@@ -718,7 +716,7 @@ class SraMaryView(tk.Toplevel):
         dias_fedex = [d for d, v in self.vars_fedex.items() if v.get()]
         dias_urbano = [d for d, v in self.vars_urbano.items() if v.get()]
 
-        self.datos[self.index_edicion] = {
+        registro = {
             "cliente": cliente,
             "direccion": self.entry_direccion.get().strip(),
             "region": region,
@@ -726,24 +724,21 @@ class SraMaryView(tk.Toplevel):
             "fedex_dias": dias_fedex,
             "urbano_dias": dias_urbano,
         }
-
-        guardar_datos_json(self.datos)
-        self._limpiar_formulario()
-        self._cargar_datos_en_tree()
+        self._guardar_registro(registro, self.id_edicion)
 
     def _eliminar(self):
         iid = self.tree.focus()
         if not iid:
             return messagebox.showwarning("Sin seleccion", "Debes seleccionar un cliente para eliminar.")
-        index = int(iid)
-        if index < 0 or index >= len(self.datos):
+        registro = self.store.obtener(int(iid))
+        if registro is None:
             return
 
-        cliente = self.datos[index].get("cliente", "")
+        cliente = registro.get("cliente", "")
         if messagebox.askyesno("Confirmar", f"Eliminar '{cliente}'?"):
-            self.datos.pop(index)
-            guardar_datos_json(self.datos)
-            self._cargar_datos_en_tree()
+            self.store.eliminar(registro["id"])
+            logger.info("Base de datos Sra Mary actualizada.")
+            self._filtrar_tree()
             self._limpiar_formulario()
 
     def _limpiar_formulario(self):
@@ -758,7 +753,7 @@ class SraMaryView(tk.Toplevel):
             v.set(False)
         for v in self.vars_urbano.values():
             v.set(False)
-        self.index_edicion = None
+        self.id_edicion = None
 
     def _importar_frecuencias(self):
         try:
@@ -806,23 +801,8 @@ class SraMaryView(tk.Toplevel):
                     }
                 )
 
-            idx = {
-                (_norm_text(d.get("region", "")), _norm_text(d.get("comuna", ""))): i
-                for i, d in enumerate(self.datos)
-            }
-            for n in nuevos:
-                key = (_norm_text(n["region"]), _norm_text(n["comuna"]))
-                if key in idx:
-                    i = idx[key]
-                    self.datos[i]["cliente"] = n["cliente"]
-                    self.datos[i]["region"] = n["region"]
-                    self.datos[i]["comuna"] = n["comuna"]
-                    self.datos[i]["fedex_dias"] = n["fedex_dias"]
-                else:
-                    self.datos.append(n)
-
-            guardar_datos_json(self.datos)
-            self._cargar_datos_en_tree()
+            self.store.importar_por_comuna(nuevos)
+            self._filtrar_tree()
             messagebox.showinfo("Importacion OK", f"Se importaron/actualizaron {len(nuevos)} comunas.")
             logger.info(f"Sra Mary importo frecuencias. Procesadas: {len(nuevos)}")
 
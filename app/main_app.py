@@ -1254,7 +1254,6 @@ class ExcelPrinterApp(tk.Tk):
                 return
 
             self._fin_dia_df = df.copy(deep=True)
-            export_path = export_daily_listados()
             self._update_status(f"Fin de dia listo: {len(self._fin_dia_df)} filas consolidadas")
 
             def _on_fin_dia_change(df_actual):
@@ -1266,18 +1265,39 @@ class ExcelPrinterApp(tk.Tk):
                 "listados",
                 on_print=self._threaded_print_daily_close,
                 on_df_change=_on_fin_dia_change,
+                on_export=self._export_daily_listados_close,
             )
-
-            if export_path is not None:
-                self.safe_messagebox(
-                    "info",
-                    "Fin de dia",
-                    f"Planilla consolidada generada en:\n{export_path}",
-                )
         except Exception as e:
             logging.exception("Error abriendo fin de dia de listados")
             self.safe_messagebox("error", "Fin de dia", f"No se pudo consolidar el dia:\n{e}")
 
+    def _export_daily_listados_close(self):
+        # Exporta lo que se esta editando en la vista previa (igual que imprimir)
+        if self._fin_dia_df is None or self._fin_dia_df.empty:
+            self.safe_messagebox("info", "Fin de dia", "No hay listados impresos para exportar.")
+            return
+        df = self._fin_dia_df.copy()
+        self._update_status("Exportando fin de dia...")
+        future = self.executor.submit(export_daily_listados, df=df)
+        future.add_done_callback(self._export_daily_listados_callback)
+
+    def _export_daily_listados_callback(self, future):
+        try:
+            export_path = future.result()
+            if export_path is None:
+                self.safe_messagebox("info", "Fin de dia", "No hay listados impresos para exportar.")
+                return
+            if self._ui_alive():
+                self.after(0, lambda: self._update_status("Fin de dia exportado."))
+            self.safe_messagebox(
+                "info",
+                "Fin de dia",
+                f"Planilla consolidada generada en:\n{export_path}",
+            )
+        except Exception as e:
+            logging.exception("Error exportando fin de dia de listados")
+            self.safe_messagebox("error", "Fin de dia", f"No se pudo exportar el dia:\n{e}")
+
     # ---------------- ConfiguraciÃ³n ----------------
 
     def _open_config_menu(self):
@@ -0,0 +1,179 @@
+# app/services/clientes_index.py
+# -*- coding: utf-8 -*-
+"""
+Índice del Excel de clientes y proveedores (etiquetas, Sra. Mary).
+
+La hoja se compila una vez a texto (sin NaN, RUT numéricos sin ".0") y se
+indexa con diccionarios por RUT normalizado y por razón social normalizada:
+cada búsqueda es una consulta O(1) en vez de normalizar y recorrer la
+columna completa.
+
+El resultado se guarda en un .npz junto a la configuración, asociado a la
+ruta, mtime y tamaño del Excel (igual que el snapshot del inventario y la
+caché de códigos postales): mientras el archivo no cambie, reabrir el editor
+de etiquetas no vuelve a leer el Excel.
+"""
+
+from __future__ import annotations
+
+import logging
+import unicodedata
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.utils.app_dirs import CONFIG_DIR
+from app.utils.file_cache import load_npz, save_npz
+
+CACHE_PATH = CONFIG_DIR / "clientes_cache.npz"
+CACHE_VERSION = 1
+
+logger = logging.getLogger("eventos_logger")
+
+
+def normalizar_rut(rut) -> str:
+    return str(rut).replace(".", "").replace("-", "").strip().upper()
+
+
+def normalizar_columna(valor) -> str:
+    txt = unicodedata.normalize("NFKD", str(valor)).encode("ascii", "ignore").decode("ascii")
+    return txt.strip().lower().replace("_", " ")
+
+
+def normalizar_razsoc(valor) -> str:
+    txt = unicodedata.normalize("NFKD", str(valor or "")).encode("ascii", "ignore").decode("ascii")
+    return " ".join(txt.lower().split())
+
+
+def buscar_columna(columnas_lower: dict[str, str], *opciones: str) -> str | None:
+    for opcion in opciones:
+        encontrada = columnas_lower.get(normalizar_columna(opcion))
+        if encontrada:
+            return encontrada
+    return None
+
+
+def leer_clientes_excel(path_excel) -> pd.DataFrame:
+    try:
+        return pd.read_excel(path_excel, sheet_name="Clientes")
+    except Exception:
+        return pd.read_excel(path_excel)
+
+
+def _texto(valor) -> str:
+    if valor is None or (isinstance(valor, float) and np.isnan(valor)):
+        return ""
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor).strip()
+
+
+def _como_texto(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame(
+        {str(c): df[c].map(_texto).astype(object) for c in df.columns},
+        columns=[str(c) for c in df.columns],
+    ).reset_index(drop=True)
+
+
+def _primera_fila(claves) -> dict[str, int]:
+    # A igual clave gana la primera fila (como el filtro anterior)
+    indice = {}
+    for pos, clave in enumerate(claves):
+        if clave and clave not in indice:
+            indice[clave] = pos
+    return indice
+
+
+class ClientesIndex:
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        rut_keys: list[str] | None = None,
+        razsoc_keys: list[str] | None = None,
+    ):
+        """`df` ya en texto (ver from_frame); las claves se calculan si no vienen de la caché."""
+        self.df = df
+        columnas_lower = {normalizar_columna(c): c for c in df.columns}
+        self.col_rut = buscar_columna(columnas_lower, "rut")
+        self.col_razsoc = buscar_columna(columnas_lower, "razsoc", "razon social", "cliente", "nombre cliente")
+        self.col_dir = buscar_columna(columnas_lower, "dir", "direccion", "domicilio")
+        self.col_comuna = buscar_columna(columnas_lower, "comuna")
+        self.col_ciudad = buscar_columna(columnas_lower, "ciudad")
+
+        if rut_keys is None:
+            rut_keys = [normalizar_rut(v) for v in df[self.col_rut]] if self.col_rut else []
+        if razsoc_keys is None:
+            razsoc_keys = [normalizar_razsoc(v) for v in df[self.col_razsoc]] if self.col_razsoc else []
+        self.rut_keys = list(rut_keys)
+        self.razsoc_keys = list(razsoc_keys)
+        self.por_rut = _primera_fila(self.rut_keys)
+        self.por_razsoc = _primera_fila(self.razsoc_keys)
+
+    @classmethod
+    def from_frame(cls, df_clientes: pd.DataFrame | None) -> "ClientesIndex | None":
+        if df_clientes is None or df_clientes.empty:
+            return None
+        return cls(_como_texto(df_clientes))
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def _cliente(self, pos: int) -> dict:
+        datos = self.df.iloc[pos]
+        return {
+            "razsoc": datos.get(self.col_razsoc, "") if self.col_razsoc else "",
+            "dir": datos.get(self.col_dir, "") if self.col_dir else "",
+            "comuna": datos.get(self.col_comuna, "") if self.col_comuna else "",
+            "ciudad": datos.get(self.col_ciudad, "") if self.col_ciudad else "",
+        }
+
+    def buscar_rut(self, rut) -> dict | None:
+        pos = self.por_rut.get(normalizar_rut(rut))
+        return self._cliente(pos) if pos is not None else None
+
+    def buscar_razsoc(self, nombre) -> dict | None:
+        pos = self.por_razsoc.get(normalizar_razsoc(nombre))
+        return self._cliente(pos) if pos is not None else None
+
+
+def save_cache(source: Path, indice: ClientesIndex, cache_path: Path = CACHE_PATH) -> Path:
+    """Escribe la caché de `indice` para el Excel `source`."""
+    columns = list(indice.df.columns)
+    arrays = {f"col_{i}": np.asarray(indice.df[c].tolist(), dtype=str) for i, c in enumerate(columns)}
+    arrays["rut_keys"] = np.asarray(indice.rut_keys, dtype=str)
+    arrays["razsoc_keys"] = np.asarray(indice.razsoc_keys, dtype=str)
+    return save_npz(cache_path, source, CACHE_VERSION, arrays, {"rows": len(indice.df), "columns": columns})
+
+
+def load_cache(source: Path, cache_path: Path = CACHE_PATH) -> ClientesIndex | None:
+    """Índice de la caché si sigue vigente para `source`; None si no hay, cambió o está dañada."""
+    cached = load_npz(cache_path, source, CACHE_VERSION)
+    if cached is None:
+        return None
+    meta, data = cached
+    try:
+        df = pd.DataFrame(
+            {c: data[f"col_{i}"].astype(object) for i, c in enumerate(meta["columns"])},
+            columns=meta["columns"],
+        )
+        if len(df) != meta["rows"]:
+            return None
+        return ClientesIndex(df, rut_keys=data["rut_keys"].tolist(), razsoc_keys=data["razsoc_keys"].tolist())
+    except Exception:
+        return None
+
+
+def cargar_indice_clientes(path_excel, cache_path: Path = CACHE_PATH) -> ClientesIndex | None:
+    """Índice del Excel de clientes: desde la caché si está vigente, si no lee y la regenera."""
+    path = Path(path_excel)
+    indice = load_cache(path, cache_path)
+    if indice is not None:
+        return indice
+    indice = ClientesIndex.from_frame(leer_clientes_excel(path))
+    if indice is not None:
+        try:
+            save_cache(path, indice, cache_path)
+        except Exception as e:
+            logger.warning(f"No se pudo guardar la caché de clientes: {e}")
+    return indice
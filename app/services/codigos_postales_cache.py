@@ -0,0 +1,72 @@
+# app/services/codigos_postales_cache.py
+# -*- coding: utf-8 -*-
+"""
+Caché compilada del buscador de códigos postales.
+
+Guarda el dataset ya limpio (REGIÓN, COMUNA, CÓDIGO POSTAL) y su SearchIndex
+en un único .npz junto a la configuración. Queda asociada a la ruta, mtime y
+tamaño del archivo de origen (igual que el snapshot del inventario): mientras
+el archivo no cambie, abrir el buscador no vuelve a leer ni limpiar la hoja.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from app.utils.app_dirs import CONFIG_DIR
+from app.utils.file_cache import load_npz, save_npz
+from app.utils.search_index import SearchIndex
+
+CACHE_PATH = CONFIG_DIR / "codigos_postales_cache.npz"
+CACHE_VERSION = 1
+
+
+def save_cache(
+    source: Path,
+    df: pd.DataFrame,
+    index: SearchIndex,
+    cache_path: Path = CACHE_PATH,
+) -> Path:
+    """Escribe la caché de `df`/`index` para el archivo `source`."""
+    meta = {
+        "rows": len(df),
+        "columns": list(df.columns),
+        "index_columns": list(index.columns),
+    }
+    arrays = {f"col_{i}": np.asarray(df[c].astype(str), dtype=str) for i, c in enumerate(df.columns)}
+    arrays.update({f"idx_{k}": v for k, v in index.to_arrays().items()})
+    return save_npz(cache_path, source, CACHE_VERSION, arrays, meta)
+
+
+def load_cache(
+    source: Path,
+    normalize: Callable[[str], str],
+    cache_path: Path = CACHE_PATH,
+    columns: Sequence[str] | None = None,
+) -> tuple[pd.DataFrame, SearchIndex] | None:
+    """
+    (df, índice) de la caché si sigue vigente para `source` (y trae las
+    columnas pedidas); None si no hay caché, el archivo cambió o está dañada.
+    """
+    cached = load_npz(cache_path, source, CACHE_VERSION)
+    if cached is None:
+        return None
+    meta, data = cached
+    try:
+        if columns is not None and list(meta["index_columns"]) != list(columns):
+            return None
+        df = pd.DataFrame(
+            {c: data[f"col_{i}"].astype(object) for i, c in enumerate(meta["columns"])},
+            columns=meta["columns"],
+        )
+        if len(df) != meta["rows"]:
+            return None
+        arrays = {k[len("idx_"):]: v for k, v in data.items() if k.startswith("idx_")}
+        index = SearchIndex.from_arrays(meta["index_columns"], len(df), arrays, normalize=normalize)
+        return df, index
+    except Exception:
+        return None
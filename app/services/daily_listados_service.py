@@ -2,9 +2,13 @@ from __future__ import annotations
 
 import hashlib
 import json
-from datetime import datetime
+import sqlite3
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator, Mapping
 
 import pandas as pd
 
@@ -14,6 +18,20 @@ from app.utils.app_dirs import DATA_DIR, OUTPUT_DIR
 DAILY_LISTADOS_DIR = DATA_DIR / "daily_listados"
 DAILY_OUTPUT_DIR = OUTPUT_DIR / "cierres_listados"
 
+# Cada impresion se guarda como una base SQLite chica (stdlib, formato estable y
+# sin codigo ejecutable): tabla `filas` con una columna por columna del listado
+# y tabla `meta` con la version del formato, nombres y dtypes originales. Los
+# .xlsx de versiones anteriores se siguen leyendo; el Excel solo se genera al
+# exportar.
+ARCHIVE_SUFFIX = ".sqlite3"
+ARCHIVE_FORMAT_VERSION = 1
+LEGACY_ARCHIVE_SUFFIXES = (".xlsx", ".xls")
+
+# carpeta del dia -> {nombre_archivo: (mtime_ns, DataFrame)}; permite consolidar de
+# forma incremental cuando la vista "Fin de dia" se reabre.
+_FRAME_CACHE: dict[str, dict[str, tuple[int, pd.DataFrame]]] = {}
+_FRAME_CACHE_LOCK = threading.Lock()
+
 
 def _date_key(dt: datetime | None = None) -> str:
     current = dt or datetime.now()
@@ -40,7 +58,10 @@ def _manifest_path(date_key: str | None = None) -> Path:
 
 
 def _load_manifest(date_key: str | None = None) -> dict[str, Any]:
-    manifest_path = _manifest_path(date_key)
+    return _read_manifest_file(_manifest_path(date_key))
+
+
+def _read_manifest_file(manifest_path: Path) -> dict[str, Any]:
     if not manifest_path.exists():
         return {"entries": []}
     try:
@@ -60,12 +81,52 @@ def _save_manifest(data: dict[str, Any], date_key: str | None = None) -> None:
     )
 
 
-def _build_signature(df: pd.DataFrame) -> str:
+SIGNATURE_VERSION = 2
+
+
+def _build_legacy_signature(df: pd.DataFrame) -> str:
     normalized = df.fillna("").astype(str)
     payload = normalized.to_json(orient="split", force_ascii=False)
     return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
 
+def _column_hashes(series: pd.Series) -> bytes:
+    # Columnas numericas (int, float, nullable) se hashean como float64 para que
+    # 1 / 1.0 / Int64(1) den la misma firma; el resto como texto con vacios = "".
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        values = pd.Series(series.to_numpy(dtype="float64", na_value=float("nan")))
+    else:
+        values = series.astype(object).where(series.notna(), "")
+    hashed = pd.util.hash_pandas_object(values, index=False, categorize=True)
+    return hashed.to_numpy(dtype="uint64").tobytes()
+
+
+def _build_signature(df: pd.DataFrame) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"v{SIGNATURE_VERSION}|{len(df)}|{df.shape[1]}".encode("utf-8"))
+    for position in range(df.shape[1]):
+        digest.update(b"\x00" + str(df.columns[position]).encode("utf-8") + b"\x00")
+        digest.update(_column_hashes(df.iloc[:, position]))
+    return digest.hexdigest()
+
+
+def _find_duplicate_entry(df: pd.DataFrame, entries: list[dict[str, Any]], signature: str) -> dict[str, Any] | None:
+    legacy_signature: str | None = None
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        if entry.get("signature_version") == SIGNATURE_VERSION:
+            if entry.get("signature") == signature:
+                return entry
+            continue
+        # Manifiestos antiguos: la firma legacy solo se calcula si hace falta.
+        if legacy_signature is None:
+            legacy_signature = _build_legacy_signature(df)
+        if entry.get("signature") == legacy_signature:
+            return entry
+    return None
+
+
 def archive_printed_listado(df: pd.DataFrame, source_name: str | None = None, printed_at: datetime | None = None) -> Path | None:
     if df is None or df.empty:
         return None
@@ -76,24 +137,26 @@ def archive_printed_listado(df: pd.DataFrame, source_name: str | None = None, pr
     manifest = _load_manifest(date_key)
     signature = _build_signature(df)
 
-    for entry in manifest.get("entries", []):
-        if entry.get("signature") == signature:
-            existing = day_dir / str(entry.get("file", ""))
-            if existing.exists():
-                return existing
+    duplicate = _find_duplicate_entry(df, manifest.get("entries", []), signature)
+    if duplicate is not None:
+        existing = day_dir / str(duplicate.get("file", ""))
+        if existing.exists():
+            return existing
 
     timestamp = when.strftime("%H%M%S")
-    base_name = f"listado_{timestamp}_{len(manifest['entries']) + 1:02d}.xlsx"
+    base_name = f"listado_{timestamp}_{len(manifest['entries']) + 1:02d}{ARCHIVE_SUFFIX}"
     out_path = day_dir / base_name
-    df.reset_index(drop=True).to_excel(out_path, index=False, engine="openpyxl")
+    _write_archive_frame(df, out_path)
 
     manifest["entries"].append(
         {
             "file": base_name,
             "signature": signature,
+            "signature_version": SIGNATURE_VERSION,
             "source_name": (source_name or "").strip(),
             "printed_at": when.isoformat(timespec="seconds"),
             "rows": int(len(df)),
+            "columns": [str(c) for c in df.columns],
         }
     )
     _save_manifest(manifest, date_key)
@@ -108,34 +171,178 @@ def list_daily_archives(date_key: str | None = None) -> list[dict[str, Any]]:
     return [entry for entry in entries if isinstance(entry, dict)]
 
 
+def _sql_value(value: Any) -> Any:
+    if value is None:
+        return None
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        value = value.item()  # escalares numpy
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float, str, bytes)):
+        return value
+    if isinstance(value, (datetime, date, pd.Timestamp)):
+        return value.isoformat()
+    return str(value)
+
+
+def _write_archive_frame(df: pd.DataFrame, path: Path) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+    names = [f"c{i}" for i in range(df.shape[1])]
+    columns = [{"name": str(c), "dtype": str(df.dtypes.iloc[i])} for i, c in enumerate(df.columns)]
+    values = [
+        [_sql_value(v) for v in df.iloc[:, i].astype(object).tolist()]
+        for i in range(df.shape[1])
+    ]
+    try:
+        conn = sqlite3.connect(tmp_path)
+        try:
+            with conn:
+                conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+                conn.executemany(
+                    "INSERT INTO meta (key, value) VALUES (?, ?)",
+                    [
+                        ("version", str(ARCHIVE_FORMAT_VERSION)),
+                        ("columns", json.dumps(columns, ensure_ascii=False)),
+                        ("rows", str(len(df))),
+                    ],
+                )
+                conn.execute(f"CREATE TABLE filas ({', '.join(names) or 'vacio'})")
+                if names:
+                    conn.executemany(
+                        f"INSERT INTO filas VALUES ({', '.join('?' for _ in names)})",
+                        zip(*values),
+                    )
+        finally:
+            conn.close()
+        tmp_path.replace(path)
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _restore_dtype(values: pd.Series, dtype: str) -> pd.Series:
+    try:
+        if dtype.startswith("datetime64"):
+            return pd.to_datetime(values, errors="coerce", format="ISO8601")
+        if dtype == "object":
+            return values.astype(object)
+        if dtype in ("string", "category"):
+            return values.astype(dtype)
+        if values.isna().any() and dtype.startswith(("int", "uint", "bool")):
+            return values  # no representable sin nulos: queda como vino
+        return values.astype(dtype)
+    except (TypeError, ValueError):
+        return values
+
+
+def _read_sqlite_archive(path: Path) -> pd.DataFrame:
+    conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        if int(meta.get("version", 0)) != ARCHIVE_FORMAT_VERSION:
+            raise ValueError(f"Formato de archivo no soportado: {path.name}")
+        columns = json.loads(meta.get("columns", "[]"))
+        rows = conn.execute("SELECT * FROM filas ORDER BY rowid").fetchall() if columns else []
+    finally:
+        conn.close()
+
+    df = pd.DataFrame.from_records(rows, columns=range(len(columns)))
+    return pd.DataFrame(
+        {i: _restore_dtype(df[i], col["dtype"]) for i, col in enumerate(columns)}
+    ).set_axis([col["name"] for col in columns], axis=1)
+
+
+def _read_archive_frame(path: Path) -> pd.DataFrame:
+    if path.suffix.lower() in LEGACY_ARCHIVE_SUFFIXES:
+        return pd.read_excel(path, dtype=object)
+    return _read_sqlite_archive(path)
+
+
+def _read_archive_columns(path: Path) -> list[str]:
+    """Solo los nombres de columna (encabezado del xlsx o `meta` del SQLite)."""
+    if path.suffix.lower() in LEGACY_ARCHIVE_SUFFIXES:
+        return [str(c) for c in pd.read_excel(path, nrows=0).columns]
+    conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'columns'").fetchone()
+    finally:
+        conn.close()
+    return [str(col["name"]) for col in json.loads(row[0])] if row else []
+
+
+def _cached_archive_frame(path: Path) -> pd.DataFrame | None:
+    day_key = str(path.parent)
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+    with _FRAME_CACHE_LOCK:
+        cached = _FRAME_CACHE.get(day_key, {}).get(path.name)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+
+    try:
+        frame = _read_archive_frame(path)
+    except Exception:
+        return None
+
+    with _FRAME_CACHE_LOCK:
+        # Solo se conserva el dia que se esta consultando
+        for other in [k for k in _FRAME_CACHE if k != day_key]:
+            del _FRAME_CACHE[other]
+        _FRAME_CACHE.setdefault(day_key, {})[path.name] = (mtime_ns, frame)
+    return frame
+
+
+def _prune_frame_cache(day_dir: Path, file_names: set[str]) -> None:
+    """Quita del cache los archivos del dia que ya no estan en el manifiesto."""
+    with _FRAME_CACHE_LOCK:
+        cached = _FRAME_CACHE.get(str(day_dir))
+        if cached is None:
+            return
+        for name in [n for n in cached if n not in file_names]:
+            del cached[name]
+
+
 def load_daily_listados_dataframe(date_key: str | None = None) -> pd.DataFrame:
-    day_dir = _daily_dir(date_key)
+    key = date_key or _date_key()
+    day_dir = _daily_dir(key)
     frames: list[pd.DataFrame] = []
-    for entry in list_daily_archives(date_key):
+    file_names: set[str] = set()
+    for entry in list_daily_archives(key):
         file_name = str(entry.get("file", "")).strip()
         if not file_name:
             continue
-        excel_path = _safe_daily_file(day_dir, file_name)
-        if excel_path is None:
-            continue
-        if not excel_path.exists():
-            continue
-        try:
-            frame = pd.read_excel(excel_path, dtype=object)
-        except Exception:
+        archive_path = _safe_daily_file(day_dir, file_name)
+        if archive_path is None:
             continue
+        file_names.add(archive_path.name)
+        frame = _cached_archive_frame(archive_path)
         if frame is None or frame.empty:
             continue
         frames.append(frame)
+    _prune_frame_cache(day_dir, file_names)
 
     if not frames:
         return pd.DataFrame()
     return pd.concat(frames, ignore_index=True, sort=False)
 
 
-def export_daily_listados(date_key: str | None = None) -> Path | None:
-    df = load_daily_listados_dataframe(date_key)
-    if df.empty:
+def export_daily_listados(date_key: str | None = None, df: pd.DataFrame | None = None) -> Path | None:
+    """
+    Exporta el consolidado del dia a Excel. Con `df` se exporta ese frame
+    (p. ej. el editado en la vista previa) en vez de releer los archivos.
+    """
+    if df is None:
+        df = load_daily_listados_dataframe(date_key)
+    if df is None or df.empty:
         return None
 
     DAILY_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -143,3 +350,317 @@ def export_daily_listados(date_key: str | None = None) -> Path | None:
     out_path = DAILY_OUTPUT_DIR / f"fin_dia_listados_{key}.xlsx"
     df.to_excel(out_path, index=False, engine="openpyxl")
     return out_path
+
+
+# ---------------------------------------------------------------------------
+# Consolidado por rango de fechas (cierres de mes)
+# ---------------------------------------------------------------------------
+
+RANGE_DATE_COL = "Fecha listado"
+RANGE_MAX_WORKERS = 8
+
+
+def _coerce_date(value: date | datetime | str) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value).strip(), "%Y-%m-%d").date()
+
+
+def _range_date_keys(from_date: date | datetime | str, to_date: date | datetime | str) -> list[str]:
+    start, end = _coerce_date(from_date), _coerce_date(to_date)
+    if end < start:
+        start, end = end, start
+    keys: list[str] = []
+    current = start
+    while current <= end:
+        keys.append(current.strftime("%Y-%m-%d"))
+        current += timedelta(days=1)
+    return keys
+
+
+def _read_day_entries(date_key: str) -> list[dict[str, Any]]:
+    # No usa _daily_dir: recorrer un rango no debe crear carpetas vacias.
+    manifest = _read_manifest_file(DAILY_LISTADOS_DIR / date_key / "manifest.json")
+    return [entry for entry in manifest.get("entries", []) if isinstance(entry, dict)]
+
+
+def _entry_matches(entry: dict[str, Any], source_contains: str | None) -> bool:
+    if not source_contains:
+        return True
+    return source_contains.strip().lower() in str(entry.get("source_name", "")).lower()
+
+
+def _apply_row_filters(frame: pd.DataFrame, filters: Mapping[str, Any] | None) -> pd.DataFrame:
+    if not filters or frame.empty:
+        return frame
+    mask = pd.Series(True, index=frame.index)
+    for column, wanted in filters.items():
+        if column not in frame.columns:
+            return frame.iloc[0:0]
+        values = wanted if isinstance(wanted, (list, tuple, set, frozenset)) else [wanted]
+        allowed = {str(v).strip() for v in values}
+        mask &= frame[column].astype(str).str.strip().isin(allowed)
+    return frame.loc[mask]
+
+
+def list_range_archives(
+    from_date: date | datetime | str,
+    to_date: date | datetime | str,
+    source_contains: str | None = None,
+) -> list[tuple[str, dict[str, Any]]]:
+    """
+    Entradas de manifiesto del rango, en orden cronologico y sin duplicados:
+    un listado reimpreso otro dia (misma firma) solo se considera una vez.
+    """
+    keys = [k for k in _range_date_keys(from_date, to_date) if (DAILY_LISTADOS_DIR / k).is_dir()]
+    if not keys:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(RANGE_MAX_WORKERS, len(keys))) as pool:
+        per_day = list(pool.map(_read_day_entries, keys))
+
+    candidates = [
+        (date_key, entry)
+        for date_key, entries in zip(keys, per_day)
+        for entry in entries
+        if _entry_matches(entry, source_contains)
+    ]
+    legacy_of_current = _range_legacy_signatures(candidates)
+
+    seen: set[str] = set()
+    seen_legacy: set[str] = set()
+    result: list[tuple[str, dict[str, Any]]] = []
+    for position, (date_key, entry) in enumerate(candidates):
+        signature = str(entry.get("signature", ""))
+        if _is_legacy_entry(entry):
+            # Firma legacy: se compara con las legacy (propias o calculadas) ya vistas
+            if signature:
+                if signature in seen_legacy:
+                    continue
+                seen_legacy.add(signature)
+        else:
+            legacy_signature = legacy_of_current.get(position)
+            if signature in seen or (legacy_signature and legacy_signature in seen_legacy):
+                continue
+            if signature:
+                seen.add(signature)
+            if legacy_signature:
+                seen_legacy.add(legacy_signature)
+        result.append((date_key, entry))
+    return result
+
+
+def _is_legacy_entry(entry: dict[str, Any]) -> bool:
+    return entry.get("signature_version") != SIGNATURE_VERSION
+
+
+def _range_legacy_signature(date_key: str, entry: dict[str, Any]) -> str:
+    frame = _read_range_frame(date_key, entry)
+    return _build_legacy_signature(frame) if frame is not None else ""
+
+
+def _range_legacy_signatures(candidates: list[tuple[str, dict[str, Any]]]) -> dict[int, str]:
+    """
+    Firma legacy de las entradas actuales que podrian repetir una entrada
+    legacy del rango (mismo numero de filas). Sin entradas legacy no se lee
+    ningun archivo.
+    """
+    legacy_rows = {entry.get("rows") for _, entry in candidates if _is_legacy_entry(entry)}
+    if not legacy_rows:
+        return {}
+    any_rows = None in legacy_rows
+    positions = [
+        position
+        for position, (_, entry) in enumerate(candidates)
+        if not _is_legacy_entry(entry) and (any_rows or entry.get("rows") in legacy_rows)
+    ]
+    if not positions:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(RANGE_MAX_WORKERS, len(positions))) as pool:
+        signatures = pool.map(lambda p: _range_legacy_signature(*candidates[p]), positions)
+        return dict(zip(positions, signatures))
+
+
+def _range_archive_path(date_key: str, entry: dict[str, Any]) -> Path | None:
+    file_name = str(entry.get("file", "")).strip()
+    if not file_name:
+        return None
+    archive_path = _safe_daily_file(DAILY_LISTADOS_DIR / date_key, file_name)
+    if archive_path is None or not archive_path.exists():
+        return None
+    return archive_path
+
+
+def _read_range_frame(date_key: str, entry: dict[str, Any]) -> pd.DataFrame | None:
+    archive_path = _range_archive_path(date_key, entry)
+    if archive_path is None:
+        return None
+    try:
+        return _read_archive_frame(archive_path)
+    except Exception:
+        return None
+
+
+def _read_range_columns(date_key: str, entry: dict[str, Any]) -> list[str]:
+    archive_path = _range_archive_path(date_key, entry)
+    if archive_path is None:
+        return []
+    try:
+        return _read_archive_columns(archive_path)
+    except Exception:
+        return []
+
+
+def iter_daily_listados_range(
+    from_date: date | datetime | str,
+    to_date: date | datetime | str,
+    source_contains: str | None = None,
+    filters: Mapping[str, Any] | None = None,
+) -> Iterator[tuple[str, pd.DataFrame]]:
+    """
+    Genera (date_key, frame) en orden cronologico. Los archivos se leen en un
+    pool de hilos con una ventana acotada, asi nunca hay mas de
+    RANGE_MAX_WORKERS frames en memoria a la vez.
+    """
+    entries = list_range_archives(from_date, to_date, source_contains)
+    if not entries:
+        return
+
+    with ThreadPoolExecutor(max_workers=min(RANGE_MAX_WORKERS, len(entries))) as pool:
+        pending: deque = deque()
+        queue = iter(entries)
+
+        def _submit_next() -> None:
+            item = next(queue, None)
+            if item is not None:
+                pending.append((item[0], pool.submit(_read_range_frame, *item)))
+
+        for _ in range(RANGE_MAX_WORKERS):
+            _submit_next()
+
+        while pending:
+            date_key, future = pending.popleft()
+            _submit_next()
+            frame = future.result()
+            if frame is None or frame.empty:
+                continue
+            frame = _apply_row_filters(frame, filters)
+            if frame.empty:
+                continue
+            yield date_key, frame
+
+
+def load_daily_listados_range(
+    from_date: date | datetime | str,
+    to_date: date | datetime | str,
+    source_contains: str | None = None,
+    filters: Mapping[str, Any] | None = None,
+) -> pd.DataFrame:
+    frames = [
+        frame.assign(**{RANGE_DATE_COL: date_key})
+        for date_key, frame in iter_daily_listados_range(from_date, to_date, source_contains, filters)
+    ]
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True, sort=False)
+    return df[[RANGE_DATE_COL] + [c for c in df.columns if c != RANGE_DATE_COL]]
+
+
+def _range_columns(entries: list[tuple[str, dict[str, Any]]]) -> list[str]:
+    # Manifiestos antiguos no guardan columnas: de esos archivos se lee solo el
+    # encabezado (nrows=0 en los xlsx), en paralelo.
+    missing = [item for item in entries if not isinstance(item[1].get("columns"), list)]
+    headers: list[list[str]] = []
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(RANGE_MAX_WORKERS, len(missing))) as pool:
+            headers = list(pool.map(lambda item: _read_range_columns(*item), missing))
+    pending_headers = iter(headers)
+
+    columns: list[str] = []
+    known: set[str] = set()
+    for _date_key, entry in entries:
+        entry_columns = entry.get("columns")
+        if not isinstance(entry_columns, list):
+            entry_columns = next(pending_headers)
+        for column in entry_columns:
+            if column not in known:
+                known.add(column)
+                columns.append(column)
+    return columns
+
+
+def _cell_value(value: Any) -> Any:
+    if value is None:
+        return None
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value
+
+
+def export_daily_listados_range(
+    from_date: date | datetime | str,
+    to_date: date | datetime | str,
+    fmt: str = "xlsx",
+    source_contains: str | None = None,
+    filters: Mapping[str, Any] | None = None,
+    out_path: Path | None = None,
+) -> Path | None:
+    """
+    Exporta el consolidado del rango a xlsx o csv escribiendo dia por dia
+    (openpyxl write_only / csv en modo append), sin armar el frame completo.
+    """
+    fmt = (fmt or "xlsx").strip().lower().lstrip(".")
+    if fmt not in ("xlsx", "csv"):
+        raise ValueError(f"Formato no soportado: {fmt}")
+
+    entries = list_range_archives(from_date, to_date, source_contains)
+    if not entries:
+        return None
+
+    keys = _range_date_keys(from_date, to_date)
+    header = [RANGE_DATE_COL] + [c for c in _range_columns(entries) if c != RANGE_DATE_COL]
+    if out_path is None:
+        DAILY_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        out_path = DAILY_OUTPUT_DIR / f"listados_{keys[0]}_a_{keys[-1]}.{fmt}"
+    else:
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    frames = iter_daily_listados_range(from_date, to_date, source_contains, filters)
+    written = 0
+    if fmt == "csv":
+        import csv
+
+        with open(out_path, "w", newline="", encoding="utf-8-sig") as fh:
+            writer = csv.writer(fh, delimiter=";")
+            writer.writerow(header)
+            for date_key, frame in frames:
+                frame = frame.rename(columns=str).assign(**{RANGE_DATE_COL: date_key})
+                frame.reindex(columns=header).to_csv(fh, sep=";", header=False, index=False)
+                written += len(frame)
+    else:
+        from openpyxl import Workbook
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Listados")
+        ws.append(header)
+        for date_key, frame in frames:
+            frame = frame.rename(columns=str).assign(**{RANGE_DATE_COL: date_key})
+            for row in frame.reindex(columns=header).itertuples(index=False, name=None):
+                ws.append([_cell_value(v) for v in row])
+            written += len(frame)
+        wb.save(out_path)
+
+    if written == 0:
+        try:
+            out_path.unlink()
+        except OSError:
+            pass
+        return None
+    return out_path
@@ -5,8 +5,11 @@ from __future__ import annotations
 import re
 import zipfile
 import xml.etree.ElementTree as ET
+from functools import lru_cache
 from pathlib import Path, PurePosixPath
+from typing import Iterable, Iterator
 
+import numpy as np
 import pandas as pd
 
 EXISTENCE_COLUMNS = [
@@ -26,6 +29,8 @@ EXISTENCE_COLUMNS = [
 ]
 
 _PRODUCT_HEADER_RE = re.compile(r"^\s*(?P<codigo>[^-]+?)\s*-\s*(?P<producto>.+?)\s*$")
+_PROBABLE_DATE_RE = r"^\d{1,2}[/-]\d{1,2}[/-]\d{2,4}$"
+_RAW_COLUMNS = 11
 
 
 def _local_name(tag: str) -> str:
@@ -38,103 +43,136 @@ def _clean_text(value) -> str:
     return " ".join(text.strip().split())
 
 
-def _parse_number(value) -> int:
-    text = _clean_text(value)
-    if not text:
-        return 0
-    text = text.replace(".", "").replace(",", ".")
-    try:
-        return int(round(float(text)))
-    except Exception:
+def _clean_text_series(values: pd.Series) -> pd.Series:
+    # Equivalente vectorizado de _clean_text para columnas de texto.
+    text = values.fillna("").astype(str).str.replace("\u200b", "", regex=False)
+    return text.str.replace(r"\s+", " ", regex=True).str.strip()
+
+
+def _parse_number_series(values: pd.Series) -> pd.Series:
+    # Formato chileno: "." miles, "," decimales. Vacios o invalidos => 0.
+    text = values.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    numbers = pd.to_numeric(text, errors="coerce").to_numpy(dtype="float64")
+    numbers[~np.isfinite(numbers)] = 0.0
+    return pd.Series(np.round(numbers).astype("int64"), index=values.index)
+
+
+def _map_unique(values: np.ndarray, transform) -> np.ndarray:
+    # Los informes repiten mucho (bodegas, fechas, unidades): se transforma
+    # cada valor distinto una sola vez y se expande con los códigos.
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    mapped = transform(pd.Series(uniques, dtype=object))
+    return np.asarray(mapped)[codes]
+
+
+@lru_cache(maxsize=None)
+def _column_index(letters: str) -> int:
+    col_index = 0
+    for ch in letters.upper():
+        col_index = col_index * 26 + (ord(ch) - 64)
+    return col_index
+
+
+def _cell_ref_index(ref: str) -> int:
+    letters = ref.rstrip("0123456789")
+    if not letters or not letters.isalpha():
         return 0
+    return _column_index(letters)
 
 
-def _split_product_header(value: str) -> tuple[str, str] | None:
-    text = _clean_text(value)
-    if not text:
-        return None
-    match = _PRODUCT_HEADER_RE.match(text)
-    if not match:
-        return None
-    return _clean_text(match.group("codigo")), _clean_text(match.group("producto"))
+def _iter_shared_strings(zf: zipfile.ZipFile) -> Iterator[str]:
+    with zf.open("xl/sharedStrings.xml") as fh:
+        for _event, node in ET.iterparse(fh, events=("end",)):
+            if _local_name(node.tag) != "si":
+                continue
+            yield "".join(t.text or "" for t in node.iter() if _local_name(t.tag) == "t")
+            node.clear()
 
 
-def _is_probable_date(value: str) -> bool:
-    text = _clean_text(value)
-    if not text:
-        return False
-    return bool(re.match(r"^\d{1,2}[/-]\d{1,2}[/-]\d{2,4}$", text))
+def _first_sheet_path(zf: zipfile.ZipFile) -> str:
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    rel_map = {
+        rel.attrib["Id"]: rel.attrib["Target"]
+        for rel in rels
+        if _local_name(rel.tag) == "Relationship"
+    }
 
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    first_sheet = next(node for node in workbook.iter() if _local_name(node.tag) == "sheet")
+    rel_id = first_sheet.attrib["{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"]
+    target = rel_map[rel_id]
+    sheet_path = str(PurePosixPath(target.lstrip("/")))
+    if not sheet_path.startswith("xl/"):
+        sheet_path = f"xl/{sheet_path}"
+    return sheet_path
 
-def _extract_xlsx_sheet_rows(path: Path) -> list[list[str]]:
+
+def _cell_value(cell: ET.Element, shared_strings: list[str]) -> str:
+    value = ""
+    for child in cell:
+        name = _local_name(child.tag)
+        if name == "v":
+            value = child.text or ""
+            break
+        if name == "is":
+            value = "".join(
+                t_node.text or ""
+                for t_node in child.iter()
+                if _local_name(t_node.tag) == "t"
+            )
+            break
+    if value != "" and cell.attrib.get("t", "") == "s":
+        value = shared_strings[int(value)]
+    return _clean_text(value)
+
+
+def _iter_xlsx_sheet_rows(path: Path) -> Iterator[list[str]]:
+    """
+    Lee la primera hoja fila a fila con iterparse, liberando cada <row> apenas
+    se procesa; la memoria queda acotada por sharedStrings y no por la hoja.
+    """
     with zipfile.ZipFile(path) as zf:
         shared_strings: list[str] = []
         if "xl/sharedStrings.xml" in zf.namelist():
-            root = ET.fromstring(zf.read("xl/sharedStrings.xml"))
-            for si in root.iter():
-                if _local_name(si.tag) != "si":
-                    continue
-                parts = [t.text or "" for t in si.iter() if _local_name(t.tag) == "t"]
-                shared_strings.append("".join(parts))
-
-        rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
-        rel_map = {
-            rel.attrib["Id"]: rel.attrib["Target"]
-            for rel in rels
-            if _local_name(rel.tag) == "Relationship"
-        }
-
-        workbook = ET.fromstring(zf.read("xl/workbook.xml"))
-        first_sheet = next(node for node in workbook.iter() if _local_name(node.tag) == "sheet")
-        rel_id = first_sheet.attrib["{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"]
-        target = rel_map[rel_id]
-        sheet_path = str(PurePosixPath(target.lstrip("/")))
-        if not sheet_path.startswith("xl/"):
-            sheet_path = f"xl/{sheet_path}"
-
-        worksheet = ET.fromstring(zf.read(sheet_path))
-        rows: list[list[str]] = []
-        for row in worksheet.iter():
-            if _local_name(row.tag) != "row":
-                continue
-            values_by_col: dict[int, str] = {}
-            max_col = 0
-            for cell in row:
-                if _local_name(cell.tag) != "c":
+            shared_strings = list(_iter_shared_strings(zf))
+
+        with zf.open(_first_sheet_path(zf)) as fh:
+            sheet_data = None
+            for event, node in ET.iterparse(fh, events=("start", "end")):
+                name = _local_name(node.tag)
+                if event == "start":
+                    if name == "sheetData":
+                        sheet_data = node
                     continue
-                ref = cell.attrib.get("r", "")
-                letters = "".join(ch for ch in ref if ch.isalpha())
-                if not letters:
+                if name != "row":
                     continue
-                col_index = 0
-                for ch in letters:
-                    col_index = col_index * 26 + (ord(ch.upper()) - 64)
-                max_col = max(max_col, col_index)
-
-                cell_type = cell.attrib.get("t", "")
-                value = ""
-                for child in cell:
-                    if _local_name(child.tag) == "v":
-                        value = child.text or ""
-                        break
-                    if _local_name(child.tag) == "is":
-                        value = "".join(
-                            t_node.text or ""
-                            for t_node in child.iter()
-                            if _local_name(t_node.tag) == "t"
-                        )
-                        break
-                if cell_type == "s" and value != "":
-                    value = shared_strings[int(value)]
-                values_by_col[col_index] = _clean_text(value)
-            rows.append([values_by_col.get(i, "") for i in range(1, max_col + 1)])
-        return rows
 
+                values_by_col: dict[int, str] = {}
+                max_col = 0
+                for cell in node:
+                    if _local_name(cell.tag) != "c":
+                        continue
+                    col_index = _cell_ref_index(cell.attrib.get("r", ""))
+                    if not col_index:
+                        continue
+                    if col_index > max_col:
+                        max_col = col_index
+                    values_by_col[col_index] = _cell_value(cell, shared_strings)
 
-def _read_sheet_rows(path: Path) -> list[list[str]]:
+                node.clear()
+                if sheet_data is not None:
+                    sheet_data.clear()
+                yield [values_by_col.get(i, "") for i in range(1, max_col + 1)]
+
+
+def _extract_xlsx_sheet_rows(path: Path) -> list[list[str]]:
+    return list(_iter_xlsx_sheet_rows(path))
+
+
+def _iter_sheet_rows(path: Path) -> Iterator[list[str]]:
     suffix = path.suffix.lower()
     if suffix == ".xlsx":
-        return _extract_xlsx_sheet_rows(path)
+        return _iter_xlsx_sheet_rows(path)
     if suffix == ".xls":
         try:
             df = pd.read_excel(path, header=None, engine="xlrd").fillna("")
@@ -142,67 +180,88 @@ def _read_sheet_rows(path: Path) -> list[list[str]]:
             raise RuntimeError(
                 "Missing optional dependency 'xlrd'. Instala xlrd >= 2.0.1 para abrir archivos .xls."
             ) from exc
-        return [[_clean_text(value) for value in row] for row in df.values.tolist()]
+        return ([_clean_text(value) for value in row] for row in df.values.tolist())
     raise ValueError("Formato no soportado. Usa archivos .xlsx o .xls")
 
 
+def _read_sheet_rows(path: Path) -> list[list[str]]:
+    return list(_iter_sheet_rows(path))
+
+
+def _forward_fill(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    # Propaga el último valor marcado por mask; antes del primero queda "".
+    marks = np.where(mask, np.arange(len(values)), -1)
+    last = np.maximum.accumulate(marks)
+    return np.where(last >= 0, values[np.maximum(last, 0)], "").astype(object)
+
+
+def _movements_frame(rows: Iterable[list[str]]) -> pd.DataFrame:
+    """
+    Arma los movimientos en forma columnar: las filas crudas pasan una sola vez
+    a columnas, las filas "CODIGO - Producto" se detectan con mascaras y
+    código/producto/unidad se propagan hacia sus movimientos.
+
+    Las celdas llegan ya normalizadas con _clean_text desde _iter_sheet_rows.
+    """
+    empty_row = [""] * _RAW_COLUMNS
+    grid = np.array(
+        [row if len(row) == _RAW_COLUMNS else (row + empty_row)[:_RAW_COLUMNS] for row in rows],
+        dtype=object,
+    )
+    if not len(grid):
+        return pd.DataFrame(columns=EXISTENCE_COLUMNS)
+    cols = [grid[:, j] for j in range(_RAW_COLUMNS)]
+    is_blank = grid == ""
+    del grid
+
+    first = cols[0]
+    is_date = _map_unique(first, lambda u: u.str.match(_PROBABLE_DATE_RE)).astype(bool)
+    header_code = _map_unique(
+        first, lambda u: _clean_text_series(u.str.extract(_PRODUCT_HEADER_RE)["codigo"])
+    )
+    header_product = _map_unique(
+        first, lambda u: _clean_text_series(u.str.extract(_PRODUCT_HEADER_RE)["producto"])
+    )
+    others_blank = is_blank[:, [1, 2, 4, 5, 6, 7, 8, 9, 10]].all(axis=1)
+    is_header = (header_code != "") & ~is_date & others_blank
+
+    unit = cols[3]
+    current_code = _forward_fill(header_code, is_header)
+    current_product = _forward_fill(header_product, is_header)
+    current_unit = _forward_fill(unit, is_header & ~is_blank[:, 3])
+
+    has_movement_data = is_date | ~is_blank[:, 1:].all(axis=1)
+    keep = ~is_header & (current_code != "") & (current_product != "") & has_movement_data
+    if not keep.any():
+        return pd.DataFrame(columns=EXISTENCE_COLUMNS)
+
+    def number(j: int) -> np.ndarray:
+        return _map_unique(cols[j][keep], _parse_number_series).astype("int64")
+
+    data = {
+        "Código": current_code[keep],
+        "Producto": current_product[keep],
+        "Fecha": first[keep],
+        "Documento": cols[1][keep],
+        "Modalidad": cols[2][keep],
+        "Unidad de stock": np.where(is_blank[:, 3], current_unit, unit)[keep],
+        "Bodega": cols[4][keep],
+        "Ubicación": cols[5][keep],
+        "Cantidad": number(6),
+        "N° Serie": cols[7][keep],
+        "Entrada": number(8),
+        "Salida": number(9),
+        "Saldo": number(10),
+    }
+    return pd.DataFrame(data, columns=EXISTENCE_COLUMNS)
+
+
 def load_product_movements(path: str | Path) -> pd.DataFrame:
     source = Path(path)
     if not source.exists():
         raise FileNotFoundError(f"No existe el archivo: {source}")
 
-    rows = _read_sheet_rows(source)
-    if len(rows) < 2:
+    rows = _iter_sheet_rows(source)
+    if next(rows, None) is None:
         return pd.DataFrame(columns=EXISTENCE_COLUMNS)
-
-    records: list[dict[str, object]] = []
-    current_code = ""
-    current_product = ""
-    current_unit = ""
-
-    for row in rows[1:]:
-        padded = (row + [""] * 11)[:11]
-        first_value = _clean_text(padded[0])
-        header_candidate = _split_product_header(first_value)
-
-        if header_candidate and not _is_probable_date(first_value) and not any(
-            _clean_text(v)
-            for v in (
-                padded[1],
-                padded[2],
-                padded[4],
-                padded[5],
-                padded[6],
-                padded[7],
-                padded[8],
-                padded[9],
-                padded[10],
-            )
-        ):
-            current_code, current_product = header_candidate
-            current_unit = _clean_text(padded[3]) or current_unit
-            continue
-
-        has_movement_data = any(_clean_text(v) for v in padded[1:]) or _is_probable_date(first_value)
-        if not current_code or not current_product or not has_movement_data:
-            continue
-
-        records.append(
-            {
-                "Código": current_code,
-                "Producto": current_product,
-                "Fecha": first_value,
-                "Documento": _clean_text(padded[1]),
-                "Modalidad": _clean_text(padded[2]),
-                "Unidad de stock": _clean_text(padded[3]) or current_unit,
-                "Bodega": _clean_text(padded[4]),
-                "Ubicación": _clean_text(padded[5]),
-                "Cantidad": _parse_number(padded[6]),
-                "N° Serie": _clean_text(padded[7]),
-                "Entrada": _parse_number(padded[8]),
-                "Salida": _parse_number(padded[9]),
-                "Saldo": _parse_number(padded[10]),
-            }
-        )
-
-    return pd.DataFrame(records, columns=EXISTENCE_COLUMNS)
+    return _movements_frame(rows)
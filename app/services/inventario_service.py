@@ -0,0 +1,385 @@
+# app/services/inventario_service.py
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import unicodedata
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from app.utils.ngram_index import NgramIndex
+
+
+def norm_text(value) -> str:
+    s = str(value or "").strip().lower()
+    s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+    return " ".join(s.split())
+
+
+def extract_main_row(ubicacion: str) -> str:
+    value = str(ubicacion or "").strip()
+    if not value:
+        return ""
+    main = value.split("-", 1)[0].strip()
+    return norm_text(main)
+
+
+def extract_letter_row(ubicacion: str) -> str:
+    value = str(ubicacion or "").strip()
+    if "-" not in value:
+        return ""
+    suffix = value.split("-", 1)[1].strip()
+    letters = "".join(ch for ch in suffix if ch.isalpha())
+    return norm_text(letters)
+
+
+def extract_position(ubicacion: str) -> str:
+    value = str(ubicacion or "").strip()
+    if "-" not in value:
+        return ""
+    suffix = value.split("-", 1)[1].strip()
+    digits = "".join(ch for ch in suffix if ch.isdigit())
+    return norm_text(digits)
+
+
+def _categorical_map(values: pd.Series, func) -> pd.Categorical:
+    # Un inventario repite mucho Bodega/Ubicación/Código: se transforma cada
+    # valor distinto una sola vez y las filas quedan como códigos enteros.
+    codes, uniques = pd.factorize(values.astype(str), use_na_sentinel=False)
+    mapped = pd.Index([func(u) for u in uniques], dtype=object)
+    categories, remap = np.unique(mapped.to_numpy(dtype=str), return_inverse=True)
+    return pd.Categorical.from_codes(remap[codes], categories=pd.Index(categories, dtype=object))
+
+
+class LocationTree:
+    """
+    Jerarquía de ubicaciones del inventario, armada una vez por carga:
+    ubicación principal -> fila letra -> posición -> cantidad de ítems.
+
+    Trabaja sobre las ubicaciones distintas (cientos o pocos miles), no sobre
+    las filas: búsquedas por prefijo, conteos y "marcar visibles" se
+    responden sin recorrer el inventario.
+    """
+
+    FUZZY_RATIO = 0.62
+
+    def __init__(self, ubicaciones: pd.Series):
+        values = ubicaciones.dropna().astype(str).str.strip()
+        counts = values.value_counts(sort=False)
+        self.locations: list[str] = sorted(counts.index)
+        self.counts: dict[str, int] = {loc: int(n) for loc, n in counts.items()}
+        self.normalized: dict[str, str] = {loc: norm_text(loc) for loc in self.locations}
+
+        # principal -> fila letra -> posición -> cantidad
+        self.tree: dict[str, dict[str, dict[str, int]]] = {}
+        self.by_main: dict[str, list[str]] = {}
+        self.main_counts: dict[str, int] = {}
+        self._parts: dict[str, tuple[str, str, str]] = {}
+        for loc in self.locations:
+            main, letter, position = extract_main_row(loc), extract_letter_row(loc), extract_position(loc)
+            self._parts[loc] = (main, letter, position)
+            count = self.counts[loc]
+            positions = self.tree.setdefault(main, {}).setdefault(letter, {})
+            positions[position] = positions.get(position, 0) + count
+            self.by_main.setdefault(main, []).append(loc)
+            self.main_counts[main] = self.main_counts.get(main, 0) + count
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+    def locations_for_main(self, mains: Iterable[str]) -> list[str]:
+        found: list[str] = []
+        for main in mains:
+            found.extend(self.by_main.get(main, ()))
+        return sorted(set(found))
+
+    def _prefix_matches(self, term: str) -> list[str]:
+        # "r1" -> principales que empiezan con r1; "r1-a" / "r1-a3" -> dentro
+        # de r1, fila letra y posición por prefijo.
+        if "-" in term:
+            main = extract_main_row(term)
+            letter, position = extract_letter_row(term), extract_position(term)
+            return [
+                loc for loc in self.by_main.get(main, ())
+                if self._parts[loc][1].startswith(letter) and self._parts[loc][2].startswith(position)
+            ]
+        return [loc for main, locs in self.by_main.items() if main.startswith(term) for loc in locs]
+
+    def match(self, term: str) -> list[str]:
+        """
+        Ubicaciones (en orden) que coinciden con `term` ya normalizado: por
+        prefijo en la jerarquía o por subcadena; si nada coincide, por
+        parecido (SequenceMatcher), como el selector original.
+        """
+        if not term:
+            return list(self.locations)
+        hits = set(self._prefix_matches(term))
+        hits.update(loc for loc, norm in self.normalized.items() if term in norm)
+        if not hits:
+            hits = {
+                loc for loc, norm in self.normalized.items()
+                if SequenceMatcher(None, term, norm).ratio() >= self.FUZZY_RATIO
+            }
+        return [loc for loc in self.locations if loc in hits]
+
+
+class InventorySortKeys:
+    """
+    Claves de orden por columna, calculadas una vez por carga y solo para las
+    columnas que se ordenan.
+
+    Cada columna se clasifica una sola vez como numérica, fecha o texto
+    normalizado y se guarda su rango (posición en el orden ascendente
+    estable, vacíos al final). Ordenar cualquier subconjunto de filas es un
+    argsort de enteros sobre esos rangos; descendente invierte la permutación
+    dejando los vacíos al final.
+    """
+
+    DATE_COLUMNS = {"Fecha Vencimiento": "%d/%m/%Y"}
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._ranks: dict[str, np.ndarray] = {}
+        self._valid: dict[str, np.ndarray] = {}
+        self._orders: dict[str, np.ndarray] = {}
+
+    def _sort_values(self, column: str) -> np.ndarray:
+        s = self.df[column]
+        numeric = pd.to_numeric(s, errors="coerce")
+        if numeric.notna().any():
+            return numeric.to_numpy(dtype=float)
+        date_format = self.DATE_COLUMNS.get(column)
+        if date_format:
+            dt = pd.to_datetime(s, format=date_format, errors="coerce")
+            if dt.notna().any():
+                values = np.full(len(dt), np.nan)
+                valid = dt.notna().to_numpy()
+                values[valid] = dt[valid].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+                return values
+        # Los códigos del categórico ya son el orden de los textos normalizados
+        return _categorical_map(s, norm_text).codes.astype(float)
+
+    def _ensure(self, column: str) -> np.ndarray:
+        rank = self._ranks.get(column)
+        if rank is None:
+            values = self._sort_values(column)
+            order = np.argsort(values, kind="stable")  # NaN al final
+            rank = np.empty(len(order), dtype=np.int64)
+            rank[order] = np.arange(len(order))
+            self._ranks[column] = rank
+            self._valid[column] = ~np.isnan(values)
+            self._orders[column] = order
+        return rank
+
+    def order(self, column: str, ascending: bool = True, positions: np.ndarray | None = None) -> np.ndarray:
+        """
+        Posiciones (en self.df) ordenadas por `column`. Con `positions` se
+        ordena solo ese subconjunto, p. ej. las filas de un filtro.
+        """
+        rank = self._ensure(column)
+        if positions is None:
+            order = self._orders.get(column)
+            if order is None:
+                order = self._orders[column] = np.argsort(rank)
+        else:
+            positions = np.asarray(positions)
+            order = positions[np.argsort(rank[positions])]
+        if ascending:
+            return order
+        valid = self._valid[column][order]
+        return np.concatenate([order[valid][::-1], order[~valid]])
+
+    def take(self, positions: np.ndarray) -> "InventorySortKeys":
+        """Claves alineadas a df.iloc[positions], sin recalcular columnas."""
+        positions = np.asarray(positions)
+        clone = InventorySortKeys(self.df.iloc[positions].reset_index(drop=True))
+        inverse = None
+        if len(positions) == len(self.df):
+            inverse = np.empty(len(positions), dtype=np.int64)
+            inverse[positions] = np.arange(len(positions))
+        for column, rank in self._ranks.items():
+            clone._ranks[column] = rank[positions]
+            clone._valid[column] = self._valid[column][positions]
+            if inverse is not None and column in self._orders:
+                clone._orders[column] = inverse[self._orders[column]]
+        return clone
+
+
+class InventorySearchModel:
+    """
+    Modelo de búsqueda del inventario, construido una vez por carga.
+
+    Guarda las columnas de texto normalizadas (sin acentos, minúsculas) y los
+    componentes de la ubicación (principal, fila letra, posición) como
+    categóricos; cada filtro se resuelve sobre las categorías y se expande a
+    filas con los códigos, así que filtrar es solo combinar máscaras.
+
+    La búsqueda libre sobre Ubicación/Código/Producto usa un índice de
+    trigramas sobre esas categorías (ver app.utils.ngram_index).
+    """
+
+    TEXT_COLUMNS = {
+        "ubicacion": "Ubicación",
+        "codigo": "Código",
+        "producto": "Producto",
+        "bodega": "Bodega",
+    }
+
+    NGRAM_COLUMNS = ("ubicacion", "codigo", "producto")
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.columns: dict[str, pd.Categorical] = {}
+        for key, column in self.TEXT_COLUMNS.items():
+            self.columns[key] = _categorical_map(df[column], norm_text)
+        self.text_indexes: dict[str, NgramIndex] = {
+            key: NgramIndex(self.columns[key].categories) for key in self.NGRAM_COLUMNS
+        }
+
+        ubicaciones = df["Ubicación"]
+        self.columns["main_row"] = _categorical_map(ubicaciones, extract_main_row)
+        self.columns["letter_row"] = _categorical_map(ubicaciones, extract_letter_row)
+        self.columns["position"] = _categorical_map(ubicaciones, extract_position)
+
+        self.stock = pd.to_numeric(df["Saldo Stock"], errors="coerce").fillna(0).to_numpy()
+        self.sort_keys = InventorySortKeys(df)
+
+    @classmethod
+    def from_parts(
+        cls,
+        df: pd.DataFrame,
+        columns: dict[str, pd.Categorical],
+        stock: np.ndarray,
+        text_indexes: dict[str, NgramIndex],
+    ) -> "InventorySearchModel":
+        """Modelo ya calculado (p. ej. leído de un snapshot), sin normalizar de nuevo."""
+        model = object.__new__(cls)
+        model.df = df
+        model.columns = columns
+        model.text_indexes = text_indexes
+        model.stock = stock
+        model.sort_keys = InventorySortKeys(df)
+        return model
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def all_rows(self) -> np.ndarray:
+        return np.ones(len(self.df), dtype=bool)
+
+    def _expand(self, key: str, category_mask: np.ndarray) -> np.ndarray:
+        codes = self.columns[key].codes
+        return category_mask[codes] if len(category_mask) else np.zeros(len(codes), dtype=bool)
+
+    def contains_all(self, key: str, terms: Iterable[str]) -> np.ndarray:
+        """Filas cuyo valor normalizado contiene todos los términos."""
+        terms = [t for t in terms if t]
+        index = self.text_indexes.get(key)
+        if index is not None:
+            return self._expand(key, index.mask(terms))
+        categories = self.columns[key].categories
+        category_mask = np.ones(len(categories), dtype=bool)
+        for term in terms:
+            category_mask &= np.asarray(categories.str.contains(term, regex=False), dtype=bool)
+        return self._expand(key, category_mask)
+
+    def equals(self, key: str, value: str) -> np.ndarray:
+        return self.isin(key, {value})
+
+    def isin(self, key: str, values: Iterable[str]) -> np.ndarray:
+        categories = self.columns[key].categories
+        return self._expand(key, categories.isin(list(values)))
+
+    def stock_at_most(self, limit: float) -> np.ndarray:
+        return self.stock <= limit
+
+    def take(self, positions: np.ndarray) -> "InventorySearchModel":
+        """Modelo alineado a df.iloc[positions] sin recalcular normalizaciones."""
+        positions = np.asarray(positions)
+        clone = object.__new__(InventorySearchModel)
+        clone.df = self.df.iloc[positions].reset_index(drop=True)
+        clone.columns = {key: col[positions] for key, col in self.columns.items()}
+        clone.text_indexes = self.text_indexes
+        clone.stock = self.stock[positions]
+        clone.sort_keys = self.sort_keys.take(positions)
+        return clone
+
+
+# ------------------------------ Diff ------------------------------------
+
+DIFF_KEY_COLUMNS = ["Código", "Lote", "N° Serie", "Ubicación", "Bodega"]
+DIFF_SECTIONS = {
+    "agregados": "Agregados",
+    "eliminados": "Eliminados",
+    "cambios_stock": "Cambios de stock",
+}
+
+
+def _diff_groups(df: pd.DataFrame) -> tuple[np.ndarray, pd.DataFrame, np.ndarray]:
+    """
+    Agrupa `df` por la clave del diff: (hash ordenado de cada clave, fila
+    representativa de cada clave, stock sumado). Todo con numpy, sin loops.
+    """
+    hashes = pd.util.hash_pandas_object(df[DIFF_KEY_COLUMNS].astype(str), index=False, categorize=True).to_numpy()
+    keys, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+    stock = pd.to_numeric(df["Saldo Stock"], errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+    totals = np.bincount(inverse, weights=stock, minlength=len(keys)).astype(np.int64)
+    rows = df.iloc[first][DIFF_KEY_COLUMNS + ["Producto"]].reset_index(drop=True)
+    return keys, rows, totals
+
+
+def diff_inventories(old_df: pd.DataFrame, new_df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """
+    Compara dos inventarios normalizados (_normalize_headers/_clean_for_view)
+    por (Código, Lote, N° Serie, Ubicación, Bodega). Filas repetidas con la
+    misma clave se suman. Devuelve un DataFrame por sección de DIFF_SECTIONS.
+    """
+    old_keys, old_rows, old_stock = _diff_groups(old_df)
+    new_keys, new_rows, new_stock = _diff_groups(new_df)
+
+    _common, old_pos, new_pos = np.intersect1d(old_keys, new_keys, assume_unique=True, return_indices=True)
+    # Una colisión de hash (claves distintas, mismo hash) se trata como baja + alta
+    same = np.ones(len(old_pos), dtype=bool)
+    for column in DIFF_KEY_COLUMNS:
+        same &= old_rows[column].to_numpy()[old_pos] == new_rows[column].to_numpy()[new_pos]
+    old_pos, new_pos = old_pos[same], new_pos[same]
+
+    added = np.ones(len(new_keys), dtype=bool)
+    added[new_pos] = False
+    removed = np.ones(len(old_keys), dtype=bool)
+    removed[old_pos] = False
+    changed = old_stock[old_pos] != new_stock[new_pos]
+
+    agregados = new_rows[added].assign(**{"Saldo Stock": new_stock[added]})
+    eliminados = old_rows[removed].assign(**{"Saldo Stock": old_stock[removed]})
+    old_changed, new_changed = old_pos[changed], new_pos[changed]
+    cambios = new_rows.iloc[new_changed].assign(**{
+        "Stock anterior": old_stock[old_changed],
+        "Stock nuevo": new_stock[new_changed],
+        "Diferencia": new_stock[new_changed] - old_stock[old_changed],
+    })
+    return {
+        "agregados": agregados.sort_values(DIFF_KEY_COLUMNS, kind="stable").reset_index(drop=True),
+        "eliminados": eliminados.sort_values(DIFF_KEY_COLUMNS, kind="stable").reset_index(drop=True),
+        "cambios_stock": cambios.sort_values(DIFF_KEY_COLUMNS, kind="stable").reset_index(drop=True),
+    }
+
+
+def export_inventory_diff(diff: dict[str, pd.DataFrame], out_path: Path) -> Path:
+    """Escribe el diff a xlsx (una hoja por sección) con openpyxl write_only."""
+    from openpyxl import Workbook
+
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    wb = Workbook(write_only=True)
+    for key, title in DIFF_SECTIONS.items():
+        frame = diff.get(key, pd.DataFrame())
+        ws = wb.create_sheet(title)
+        ws.append([str(c) for c in frame.columns])
+        for row in frame.itertuples(index=False, name=None):
+            ws.append([v.item() if isinstance(v, np.generic) else v for v in row])
+    wb.save(out_path)
+    return out_path
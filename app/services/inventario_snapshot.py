@@ -0,0 +1,200 @@
+# app/services/inventario_snapshot.py
+# -*- coding: utf-8 -*-
+"""
+Snapshot compilado del inventario.
+
+Guarda el inventario ya normalizado (columnas visibles + InventorySearchModel:
+columnas normalizadas, componentes de ubicación e índices de trigramas) en una
+carpeta junto a la configuración, como arreglos .npy columnares:
+
+- cada columna de texto es un par códigos (int32) + valores distintos,
+- el stock es un int64,
+- los índices de trigramas se guardan como (grams, offsets, ids).
+
+El snapshot queda asociado a la ruta, mtime y tamaño del Excel de origen; si
+el archivo cambia, deja de ser válido y se vuelve a leer el Excel. Los códigos
+y postings se abren con mmap, así que reabrir el inventario no relee ni
+normaliza nada.
+
+Se conservan los SNAPSHOT_KEEP snapshots usados más recientemente (el
+inventario actual y los que se comparan con él); el resto se borra.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from app.services.inventario_service import InventorySearchModel
+from app.utils.app_dirs import CONFIG_DIR
+from app.utils.file_cache import source_key
+from app.utils.ngram_index import NgramIndex
+
+SNAPSHOT_DIR = CONFIG_DIR / "inventario_snapshot"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_KEEP = 3
+META_FILE = "meta.json"
+
+
+def _snapshot_folder(key: dict, snapshot_dir: Path) -> Path:
+    # Una carpeta por versión del origen: la anterior puede seguir abierta con
+    # mmap (en Windows no se puede borrar), así que se limpia a mejor esfuerzo.
+    token = hashlib.sha1(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    return snapshot_dir / token
+
+
+def _last_used(folder: Path) -> int:
+    try:
+        return (folder / META_FILE).stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _prune(snapshot_dir: Path, keep: int) -> None:
+    # LRU por mtime de meta.json (load_snapshot lo toca al usarlo); las
+    # carpetas sin meta van primero. Los .tmp no se tocan: puede haber otro
+    # snapshot escribiéndose (la carga y la comparación corren en paralelo).
+    folders = sorted(
+        (p for p in snapshot_dir.iterdir() if p.is_dir() and not p.name.endswith(".tmp")),
+        key=_last_used,
+        reverse=True,
+    )
+    for other in folders[keep:]:
+        shutil.rmtree(other, ignore_errors=True)
+
+
+def _save(folder: Path, name: str, values: np.ndarray) -> None:
+    np.save(folder / f"{name}.npy", values, allow_pickle=False)
+
+
+def _load(folder: Path, name: str, mmap: bool = True) -> np.ndarray:
+    return np.load(folder / f"{name}.npy", mmap_mode="r" if mmap else None, allow_pickle=False)
+
+
+def _text_array(values: Sequence) -> np.ndarray:
+    return np.asarray([str(v) for v in values], dtype=str)
+
+
+def _object_array(values: np.ndarray) -> np.ndarray:
+    return np.asarray(values, dtype=object)
+
+
+def save_snapshot(
+    source: Path,
+    df: pd.DataFrame,
+    model: InventorySearchModel,
+    snapshot_dir: Path = SNAPSHOT_DIR,
+) -> Path:
+    """Escribe el snapshot de `df`/`model` para el archivo `source`."""
+    key = source_key(source)
+    folder = _snapshot_folder(key, snapshot_dir)
+    tmp = folder.with_name(folder.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True, exist_ok=True)
+
+    display = []
+    numeric = []
+    for i, column in enumerate(df.columns):
+        values = df[column]
+        if pd.api.types.is_integer_dtype(values.dtype):
+            _save(tmp, f"display_{i}", values.to_numpy(dtype=np.int64))
+            numeric.append(column)
+        else:
+            codes, uniques = pd.factorize(values.astype(str), use_na_sentinel=False)
+            _save(tmp, f"display_{i}_codes", codes.astype(np.int32))
+            _save(tmp, f"display_{i}_values", _text_array(uniques))
+        display.append(column)
+
+    for key_name, categorical in model.columns.items():
+        _save(tmp, f"model_{key_name}_codes", np.asarray(categorical.codes))
+        _save(tmp, f"model_{key_name}_categories", _text_array(categorical.categories))
+    _save(tmp, "stock", np.asarray(model.stock))
+
+    ngram = {}
+    for key_name, index in model.text_indexes.items():
+        grams, offsets, ids = index.to_arrays()
+        _save(tmp, f"ngram_{key_name}_grams", grams)
+        _save(tmp, f"ngram_{key_name}_offsets", offsets)
+        _save(tmp, f"ngram_{key_name}_ids", ids)
+        ngram[key_name] = index.n
+
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "source": key,
+        "rows": len(df),
+        "display": display,
+        "numeric": numeric,
+        "model_columns": list(model.columns),
+        "ngram": ngram,
+    }
+    # meta.json va al final: una carpeta sin meta nunca se considera válida
+    (tmp / META_FILE).write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+
+    shutil.rmtree(folder, ignore_errors=True)
+    tmp.replace(folder)
+    _prune(snapshot_dir, SNAPSHOT_KEEP)
+    return folder
+
+
+def load_snapshot(
+    source: Path,
+    snapshot_dir: Path = SNAPSHOT_DIR,
+) -> tuple[pd.DataFrame, InventorySearchModel] | None:
+    """
+    (df, modelo) del snapshot si sigue vigente para `source`; None si no hay
+    snapshot, el archivo cambió o el snapshot está incompleto/corrupto.
+    """
+    try:
+        key = source_key(source)
+    except OSError:
+        return None
+    folder = _snapshot_folder(key, snapshot_dir)
+    meta_path = folder / META_FILE
+    if not meta_path.exists():
+        return None
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta.get("version") != SNAPSHOT_VERSION or meta.get("source") != key:
+            return None
+
+        data = {}
+        numeric = set(meta["numeric"])
+        for i, column in enumerate(meta["display"]):
+            if column in numeric:
+                data[column] = np.array(_load(folder, f"display_{i}"))
+            else:
+                values = _object_array(_load(folder, f"display_{i}_values", mmap=False))
+                data[column] = values[_load(folder, f"display_{i}_codes")]
+        df = pd.DataFrame(data, columns=meta["display"])
+        if len(df) != meta["rows"]:
+            return None
+
+        columns = {}
+        for key_name in meta["model_columns"]:
+            categories = pd.Index(_object_array(_load(folder, f"model_{key_name}_categories", mmap=False)), dtype=object)
+            columns[key_name] = pd.Categorical.from_codes(_load(folder, f"model_{key_name}_codes"), categories=categories)
+
+        text_indexes = {}
+        for key_name, n in meta["ngram"].items():
+            text_indexes[key_name] = NgramIndex.from_arrays(
+                columns[key_name].categories,
+                _load(folder, f"ngram_{key_name}_grams", mmap=False),
+                _load(folder, f"ngram_{key_name}_offsets"),
+                _load(folder, f"ngram_{key_name}_ids"),
+                n=n,
+            )
+
+        model = InventorySearchModel.from_parts(df, columns, _load(folder, "stock"), text_indexes)
+    except Exception:
+        return None
+    try:
+        meta_path.touch()
+    except OSError:
+        pass
+    return df, model
@@ -0,0 +1,245 @@
+# app/services/sra_mary_store.py
+# -*- coding: utf-8 -*-
+"""
+Almacén SQLite de los clientes de Sra. Mary (días de despacho FedEx/Urbano).
+
+Reemplaza a data/sra_mary_db.json, que se reescribía completo en cada
+guardado. Cada registro es una fila de `clientes`; guardar, actualizar y
+eliminar son operaciones de una fila dentro de una transacción.
+
+La búsqueda de la tabla usa un índice FTS5 con tokenizador trigram sobre el
+texto normalizado (minúsculas, sin acentos) de cliente, dirección, región y
+comuna: un MATCH de frase equivale a "contiene" y usa el índice. Términos de
+menos de 3 letras (o SQLite sin trigram) caen a instr() sobre las columnas
+normalizadas. Si el índice FTS no está al día con `clientes` al abrir (recién
+creado sobre una base existente, o desincronizado), se reconstruye desde las
+columnas *_norm.
+
+La primera vez que se abre, si existe el JSON anterior, sus registros se
+migran en una sola transacción (una única vez, marcada en `meta`).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import unicodedata
+from pathlib import Path
+from typing import Iterable
+
+from app.utils.app_dirs import DATA_DIR
+
+STORE_PATH = DATA_DIR / "sra_mary.sqlite3"
+LEGACY_JSON_PATH = DATA_DIR / "sra_mary_db.json"
+
+TEXT_FIELDS = ("cliente", "direccion", "region", "comuna")
+DAY_FIELDS = ("fedex_dias", "urbano_dias")
+
+logger = logging.getLogger("eventos_logger")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS clientes (
+    id INTEGER PRIMARY KEY,
+    cliente TEXT NOT NULL DEFAULT '',
+    direccion TEXT NOT NULL DEFAULT '',
+    region TEXT NOT NULL DEFAULT '',
+    comuna TEXT NOT NULL DEFAULT '',
+    fedex_dias TEXT NOT NULL DEFAULT '[]',
+    urbano_dias TEXT NOT NULL DEFAULT '[]',
+    cliente_norm TEXT NOT NULL DEFAULT '',
+    direccion_norm TEXT NOT NULL DEFAULT '',
+    region_norm TEXT NOT NULL DEFAULT '',
+    comuna_norm TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_clientes_region_comuna ON clientes (region_norm, comuna_norm);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS clientes_fts USING fts5(
+    cliente, direccion, region, comuna, tokenize = 'trigram'
+);
+"""
+
+
+def _norm_text(s: str) -> str:
+    s = str(s or "").strip().lower()
+    s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+    return " ".join(s.split())
+
+
+def _row_values(registro: dict) -> dict:
+    values = {f: str(registro.get(f, "") or "").strip() for f in TEXT_FIELDS}
+    for f in TEXT_FIELDS:
+        values[f"{f}_norm"] = _norm_text(values[f])
+    for f in DAY_FIELDS:
+        values[f] = json.dumps(list(registro.get(f, []) or []), ensure_ascii=False)
+    return values
+
+
+class SraMaryStore:
+    def __init__(self, db_path: Path = STORE_PATH, legacy_json: Path | None = LEGACY_JSON_PATH):
+        db_path = Path(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.row_factory = sqlite3.Row
+        with self.conn:
+            self.conn.executescript(_SCHEMA)
+        try:
+            creado = not self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'clientes_fts'"
+            ).fetchone()
+            with self.conn:
+                self.conn.executescript(_FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError as e:
+            # SQLite sin FTS5/trigram: la búsqueda usa instr() sobre *_norm
+            logger.warning(f"Sra Mary: búsqueda sin FTS ({e}).")
+            self.fts = False
+        if self.fts and (creado or self._fts_desincronizado()):
+            self._reconstruir_fts()
+        if legacy_json is not None:
+            self._migrar_json(Path(legacy_json))
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # ------------------------------ Lectura ------------------------------
+
+    @staticmethod
+    def _registro(row: sqlite3.Row) -> dict:
+        registro = {"id": row["id"]}
+        for f in TEXT_FIELDS:
+            registro[f] = row[f]
+        for f in DAY_FIELDS:
+            registro[f] = json.loads(row[f] or "[]")
+        return registro
+
+    def contar(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM clientes").fetchone()[0]
+
+    def obtener(self, cliente_id: int) -> dict | None:
+        row = self.conn.execute("SELECT * FROM clientes WHERE id = ?", (cliente_id,)).fetchone()
+        return self._registro(row) if row is not None else None
+
+    def buscar(self, termino: str = "") -> list[dict]:
+        """Registros (en orden de alta) cuyo cliente/dirección/región/comuna contiene `termino`."""
+        term = _norm_text(termino)
+        if not term:
+            rows = self.conn.execute("SELECT * FROM clientes ORDER BY id")
+        elif self.fts and len(term) >= 3:
+            phrase = '"' + term.replace('"', '""') + '"'
+            rows = self.conn.execute(
+                "SELECT c.* FROM clientes c JOIN clientes_fts f ON f.rowid = c.id "
+                "WHERE clientes_fts MATCH ? ORDER BY c.id",
+                (phrase,),
+            )
+        else:
+            cond = " OR ".join(f"instr({f}_norm, :t) > 0" for f in TEXT_FIELDS)
+            rows = self.conn.execute(f"SELECT * FROM clientes WHERE {cond} ORDER BY id", {"t": term})
+        return [self._registro(r) for r in rows]
+
+    # ------------------------------ Escritura ----------------------------
+
+    def _insert(self, values: dict) -> int:
+        cols = list(values)
+        cur = self.conn.execute(
+            f"INSERT INTO clientes ({', '.join(cols)}) VALUES ({', '.join(':' + c for c in cols)})",
+            values,
+        )
+        cliente_id = cur.lastrowid
+        self._sync_fts(cliente_id, values)
+        return cliente_id
+
+    def _update(self, cliente_id: int, values: dict) -> None:
+        sets = ", ".join(f"{c} = :{c}" for c in values)
+        self.conn.execute(f"UPDATE clientes SET {sets} WHERE id = :id", {**values, "id": cliente_id})
+        self._sync_fts(cliente_id, values)
+
+    def _sync_fts(self, cliente_id: int, values: dict) -> None:
+        if not self.fts:
+            return
+        self.conn.execute("DELETE FROM clientes_fts WHERE rowid = ?", (cliente_id,))
+        self.conn.execute(
+            "INSERT INTO clientes_fts (rowid, cliente, direccion, region, comuna) VALUES (?, ?, ?, ?, ?)",
+            (cliente_id, *(values[f"{f}_norm"] for f in TEXT_FIELDS)),
+        )
+
+    def _fts_desincronizado(self) -> bool:
+        fts = self.conn.execute("SELECT COUNT(*) FROM clientes_fts").fetchone()[0]
+        return fts != self.contar()
+
+    def _reconstruir_fts(self) -> None:
+        """Vuelve a llenar clientes_fts desde las columnas *_norm, en una transacción."""
+        cols = ", ".join(TEXT_FIELDS)
+        norm = ", ".join(f"{f}_norm" for f in TEXT_FIELDS)
+        with self.conn:
+            self.conn.execute("DELETE FROM clientes_fts")
+            self.conn.execute(
+                f"INSERT INTO clientes_fts (rowid, {cols}) SELECT id, {norm} FROM clientes"
+            )
+
+    def guardar(self, registro: dict, cliente_id: int | None = None) -> int:
+        """Inserta `registro` (o reemplaza el de `cliente_id`) y devuelve su id."""
+        values = _row_values(registro)
+        with self.conn:
+            if cliente_id is None:
+                return self._insert(values)
+            self._update(cliente_id, values)
+            return cliente_id
+
+    def eliminar(self, cliente_id: int) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM clientes WHERE id = ?", (cliente_id,))
+            if self.fts:
+                self.conn.execute("DELETE FROM clientes_fts WHERE rowid = ?", (cliente_id,))
+
+    def importar_por_comuna(self, registros: Iterable[dict]) -> int:
+        """
+        Alta o actualización por (región, comuna) normalizadas, en una sola
+        transacción: si ya existe, se actualizan cliente/región/comuna y los
+        días FedEx del último registro con esa clave; si no, se agrega.
+        """
+        total = 0
+        with self.conn:
+            for registro in registros:
+                values = _row_values(registro)
+                row = self.conn.execute(
+                    "SELECT * FROM clientes WHERE region_norm = ? AND comuna_norm = ? ORDER BY id DESC LIMIT 1",
+                    (values["region_norm"], values["comuna_norm"]),
+                ).fetchone()
+                if row is None:
+                    self._insert(values)
+                else:
+                    cambios = {f: registro.get(f) for f in ("cliente", "region", "comuna", "fedex_dias")}
+                    self._update(row["id"], _row_values({**self._registro(row), **cambios}))
+                total += 1
+        return total
+
+    # ------------------------------ Migración ----------------------------
+
+    def _migrar_json(self, legacy_json: Path) -> None:
+        if self.conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrado'").fetchone():
+            return
+        registros = []
+        if legacy_json.exists():
+            try:
+                data = json.loads(legacy_json.read_text(encoding="utf-8") or "[]")
+                registros = [r for r in data if isinstance(r, dict)] if isinstance(data, list) else []
+            except Exception as e:
+                logger.warning(f"Sra Mary: no se pudo leer {legacy_json} para migrar: {e}")
+                return
+        with self.conn:
+            for registro in registros:
+                self._insert(_row_values(registro))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrado', ?)",
+                (str(legacy_json),),
+            )
+        if registros:
+            logger.info(f"Sra Mary: {len(registros)} registros migrados desde {legacy_json}.")
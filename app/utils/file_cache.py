@@ -0,0 +1,75 @@
+# app/utils/file_cache.py
+# -*- coding: utf-8 -*-
+"""
+Cachés compiladas asociadas a un archivo de origen.
+
+Una caché queda ligada a la ruta, mtime y tamaño de su origen (source_key):
+si el archivo cambia, deja de ser válida. save_npz/load_npz guardan arreglos
+numpy y un diccionario `meta` (JSON) en un único .npz, escrito en un .tmp y
+reemplazado de forma atómica. Lo usan la caché de códigos postales y la del
+Excel de clientes; el snapshot del inventario usa solo source_key.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Mapping
+
+import numpy as np
+
+
+def source_key(path: Path) -> dict:
+    stat = Path(path).stat()
+    return {
+        "path": str(Path(path).resolve()),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+    }
+
+
+def save_npz(
+    cache_path: Path,
+    source: Path,
+    version: int,
+    arrays: Mapping[str, np.ndarray],
+    meta: Mapping[str, Any] | None = None,
+) -> Path:
+    """Escribe `arrays` + meta (con versión y clave del origen) en `cache_path`."""
+    full_meta = {**(meta or {}), "version": version, "source": source_key(source)}
+    payload = dict(arrays)
+    payload["meta"] = np.asarray(json.dumps(full_meta, ensure_ascii=False))
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_path.with_name(cache_path.name + ".tmp")
+    with open(tmp, "wb") as fh:
+        np.savez(fh, **payload)
+    os.replace(tmp, cache_path)
+    return cache_path
+
+
+def load_npz(
+    cache_path: Path,
+    source: Path,
+    version: int,
+) -> tuple[dict, dict[str, np.ndarray]] | None:
+    """
+    (meta, arreglos) si la caché existe, es de esta versión y sigue vigente
+    para `source`; None si no, o si el archivo está dañado.
+    """
+    try:
+        key = source_key(source)
+    except OSError:
+        return None
+    if not cache_path.exists():
+        return None
+    try:
+        with np.load(cache_path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("version") != version or meta.get("source") != key:
+                return None
+            arrays = {name: data[name] for name in data.files if name != "meta"}
+        return meta, arrays
+    except Exception:
+        return None
@@ -0,0 +1,135 @@
+# app/utils/ngram_index.py
+# -*- coding: utf-8 -*-
+"""
+Índice invertido de n-gramas (trigramas por defecto) para búsqueda por
+subcadena.
+
+- NgramIndex: indexa una lista de textos ya normalizados. Una consulta con
+  varios términos intersecta las listas de postings de sus trigramas y luego
+  verifica los candidatos con `term in texto`, así el resultado es idéntico a
+  un filtro `all(term in texto ...)` pero sin recorrer todos los textos.
+- ColumnNgramIndex: índice sobre una columna de pandas. Indexa solo los
+  valores distintos y expande a filas con los códigos de factorize.
+
+Sin dependencias de la app: se puede usar desde cualquier vista.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class NgramIndex:
+    def __init__(self, texts: Sequence[str], n: int = 3):
+        self.n = n
+        self.texts = [str(t) for t in texts]
+        postings: dict[str, list[int]] = {}
+        for doc_id, text in enumerate(self.texts):
+            for gram in {text[i:i + n] for i in range(len(text) - n + 1)}:
+                postings.setdefault(gram, []).append(doc_id)
+        self._postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def to_arrays(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Postings en forma columnar (grams, offsets, ids) para persistirlos."""
+        grams = sorted(self._postings)
+        lengths = np.fromiter((len(self._postings[g]) for g in grams), dtype=np.int64, count=len(grams))
+        offsets = np.zeros(len(grams) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        ids = np.concatenate([self._postings[g] for g in grams]) if grams else np.empty(0, dtype=np.int32)
+        return np.asarray(grams, dtype=str), offsets, ids.astype(np.int32, copy=False)
+
+    @classmethod
+    def from_arrays(cls, texts: Sequence[str], grams, offsets, ids, n: int = 3) -> "NgramIndex":
+        """Inverso de to_arrays; las listas quedan como vistas de `ids` (sirve con mmap)."""
+        index = object.__new__(cls)
+        index.n = n
+        index.texts = [str(t) for t in texts]
+        index._postings = {
+            str(gram): ids[offsets[i]:offsets[i + 1]] for i, gram in enumerate(grams)
+        }
+        return index
+
+    def _candidates(self, term: str) -> np.ndarray | None:
+        """Documentos que contienen todos los n-gramas del término (None si es corto)."""
+        n = self.n
+        if len(term) < n:
+            return None
+        lists = []
+        for gram in {term[i:i + n] for i in range(len(term) - n + 1)}:
+            ids = self._postings.get(gram)
+            if ids is None:
+                return np.empty(0, dtype=np.int32)
+            lists.append(ids)
+        lists.sort(key=len)
+        result = lists[0]
+        for ids in lists[1:]:
+            result = np.intersect1d(result, ids, assume_unique=True)
+            if not len(result):
+                break
+        return result
+
+    def shared_counts(self, term: str) -> np.ndarray:
+        """Por documento, cuántos n-gramas distintos del término contiene (base de la búsqueda difusa)."""
+        n = self.n
+        lists = [
+            self._postings[gram]
+            for gram in {term[i:i + n] for i in range(len(term) - n + 1)}
+            if gram in self._postings
+        ]
+        if not lists:
+            return np.zeros(len(self.texts), dtype=np.int64)
+        return np.bincount(np.concatenate(lists), minlength=len(self.texts))
+
+    def search(self, terms: Iterable[str]) -> np.ndarray:
+        """Ids (ordenados) de los textos que contienen todos los términos."""
+        terms = [t for t in terms if t]
+        if not terms:
+            return np.arange(len(self.texts))
+
+        candidates: np.ndarray | None = None
+        for term in sorted(terms, key=len, reverse=True):
+            ids = self._candidates(term)
+            if ids is None:
+                continue
+            candidates = ids if candidates is None else np.intersect1d(candidates, ids, assume_unique=True)
+            if not len(candidates):
+                return candidates.astype(np.int64)
+
+        texts = self.texts
+        pool = range(len(texts)) if candidates is None else candidates.tolist()
+        return np.fromiter(
+            (i for i in pool if all(t in texts[i] for t in terms)),
+            dtype=np.int64,
+        )
+
+    def mask(self, terms: Iterable[str]) -> np.ndarray:
+        out = np.zeros(len(self.texts), dtype=bool)
+        out[self.search(terms)] = True
+        return out
+
+
+class ColumnNgramIndex:
+    def __init__(
+        self,
+        values: pd.Series,
+        normalize: Callable[[str], str] = str.lower,
+        n: int = 3,
+    ):
+        codes, uniques = pd.factorize(values.fillna("").astype(str), use_na_sentinel=False)
+        self.codes = codes
+        self.index = NgramIndex([normalize(u) for u in uniques], n=n)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def mask(self, terms: Iterable[str]) -> np.ndarray:
+        """Máscara por fila; los términos deben venir ya normalizados."""
+        if not len(self.codes):
+            return np.zeros(0, dtype=bool)
+        return self.index.mask(terms)[self.codes]
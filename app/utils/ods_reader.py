@@ -0,0 +1,141 @@
+# app/utils/ods_reader.py
+# -*- coding: utf-8 -*-
+"""
+Lector de hojas .ods en streaming, sin odfpy.
+
+Recorre content.xml con iterparse y libera cada fila apenas se procesa. Las
+repeticiones (number-rows-repeated / number-columns-repeated) se resuelven de
+forma perezosa: las celdas y filas vacías solo se cuentan, y se materializan
+únicamente si después aparece un dato. Así, la "cola" vacía con formato que
+deja LibreOffice (cientos de miles de filas repetidas) no ocupa memoria.
+
+Las celdas repetidas se acotan a MAX_REPEAT_COLUMNS y los huecos de filas
+vacías entre datos a MAX_REPEAT_ROWS. Las filas con datos repetidas se
+entregan completas: son datos reales, no relleno.
+"""
+
+from __future__ import annotations
+
+import zipfile
+import xml.etree.ElementTree as ET
+from contextlib import closing
+from pathlib import Path
+from typing import Callable, Iterator
+
+TABLE_NS = "urn:oasis:names:tc:opendocument:xmlns:table:1.0"
+TEXT_NS = "urn:oasis:names:tc:opendocument:xmlns:text:1.0"
+
+_TABLE = f"{{{TABLE_NS}}}table"
+_ROW = f"{{{TABLE_NS}}}table-row"
+_CELL = f"{{{TABLE_NS}}}table-cell"
+_COVERED_CELL = f"{{{TABLE_NS}}}covered-table-cell"
+_NAME = f"{{{TABLE_NS}}}name"
+_ROWS_REPEATED = f"{{{TABLE_NS}}}number-rows-repeated"
+_COLS_REPEATED = f"{{{TABLE_NS}}}number-columns-repeated"
+_P = f"{{{TEXT_NS}}}p"
+
+MAX_REPEAT_COLUMNS = 16_384
+MAX_REPEAT_ROWS = 10_000
+
+
+def _cell_text(cell: ET.Element) -> str:
+    vals = []
+    for p in cell.iter(_P):
+        t = "".join(p.itertext()).strip()
+        if t:
+            vals.append(t)
+    return " ".join(vals)
+
+
+def _repeat(node: ET.Element, attr: str) -> int:
+    try:
+        return max(1, int(node.get(attr, "1")))
+    except ValueError:
+        return 1
+
+
+def iter_ods_rows(
+    path: Path,
+    accept_table: Callable[[str], bool] | None = None,
+) -> Iterator[tuple[int, str, list[str]]]:
+    """
+    (n° de hoja, nombre de hoja, fila) de las hojas aceptadas por
+    `accept_table`. Cada fila viene sin celdas vacías al final y las filas
+    vacías del final de cada hoja no se entregan.
+    """
+    with zipfile.ZipFile(path, "r") as zf, zf.open("content.xml") as fh:
+        table = None
+        table_no = -1
+        table_name = ""
+        accepted = False
+        row: list[str] = []
+        pending_cells = 0
+        pending_rows = 0
+
+        for event, node in ET.iterparse(fh, events=("start", "end")):
+            tag = node.tag
+            if event == "start":
+                if tag == _TABLE:
+                    table = node
+                    table_no += 1
+                    table_name = node.get(_NAME, "")
+                    accepted = accept_table is None or accept_table(table_name)
+                    pending_rows = 0
+                elif tag == _ROW:
+                    row = []
+                    pending_cells = 0
+                continue
+
+            if tag == _CELL or tag == _COVERED_CELL:
+                if not accepted:
+                    continue
+                text = _cell_text(node)
+                repeat = _repeat(node, _COLS_REPEATED)
+                node.clear()
+                if not text:
+                    pending_cells += repeat
+                    continue
+                if pending_cells:
+                    row.extend([""] * min(pending_cells, MAX_REPEAT_COLUMNS))
+                    pending_cells = 0
+                row.extend([text] * min(repeat, MAX_REPEAT_COLUMNS))
+
+            elif tag == _ROW:
+                repeat = _repeat(node, _ROWS_REPEATED)
+                node.clear()
+                if table is not None:
+                    table.clear()
+                if not accepted:
+                    continue
+                if not row:
+                    pending_rows += repeat
+                    continue
+                for _ in range(min(pending_rows, MAX_REPEAT_ROWS)):
+                    yield table_no, table_name, []
+                pending_rows = 0
+                for _ in range(repeat):
+                    yield table_no, table_name, list(row)
+
+            elif tag == _TABLE:
+                node.clear()
+                table = None
+                accepted = False
+
+
+def read_ods_rows(
+    path: Path,
+    accept_table: Callable[[str], bool] | None = None,
+) -> list[list[str]]:
+    """
+    Filas de la primera hoja aceptada que tenga algún dato ([] si ninguna).
+    Deja de leer el archivo apenas termina esa hoja.
+    """
+    rows: list[list[str]] = []
+    current = None
+    with closing(iter_ods_rows(path, accept_table)) as it:
+        for table_no, _name, row in it:
+            if current is not None and table_no != current:
+                break
+            current = table_no
+            rows.append(row)
+    return rows
@@ -0,0 +1,255 @@
+# app/utils/search_index.py
+# -*- coding: utf-8 -*-
+"""
+Índice de búsqueda con ranking para tablas chicas de consulta frecuente
+(comunas, regiones, códigos postales).
+
+- ColumnSearchIndex: una columna. Guarda los valores distintos ya
+  normalizados, un índice de prefijos (lista ordenada de los sufijos que
+  empiezan en cada palabra, consultada con bisect: equivale a recorrer un
+  trie) y un NgramIndex para subcadenas y candidatos difusos.
+- SearchIndex: varias columnas con prioridad; devuelve posiciones de fila
+  ordenadas por relevancia.
+
+Orden del ranking: coincidencia exacta, prefijo del valor, prefijo de una
+palabra, subcadena (desde 3 letras; con menos, solo prefijos). Solo si nada
+de eso coincide se prueba la búsqueda difusa (Levenshtein acotado contra los
+candidatos que comparten más trigramas), para errores de tipeo como
+"vina dle mar".
+
+Sin dependencias de la app: se puede usar desde cualquier vista.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Callable, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from app.utils.ngram_index import NgramIndex
+
+EXACT, PREFIX, WORD_PREFIX, SUBSTRING, FUZZY = range(5)
+
+# Candidatos (por trigramas compartidos) que se comparan con Levenshtein
+FUZZY_CANDIDATES = 64
+
+
+def bounded_levenshtein(a: str, b: str, max_dist: int) -> int | None:
+    """Distancia de edición entre a y b, o None si supera max_dist (corta antes)."""
+    if abs(len(a) - len(b)) > max_dist:
+        return None
+    if len(a) > len(b):
+        a, b = b, a
+    previous = list(range(len(a) + 1))
+    for i, cb in enumerate(b, start=1):
+        current = [i]
+        best = i
+        for j, ca in enumerate(a, start=1):
+            value = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            )
+            current.append(value)
+            if value < best:
+                best = value
+        if best > max_dist:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= max_dist else None
+
+
+def fuzzy_max_distance(term: str) -> int:
+    return max(1, min(3, len(term) // 4))
+
+
+class ColumnSearchIndex:
+    def __init__(self, values: pd.Series, normalize: Callable[[str], str] = str.lower):
+        codes, uniques = pd.factorize(values.fillna("").astype(str), use_na_sentinel=False)
+        self.texts = [normalize(u) for u in uniques]
+
+        # Filas de cada valor distinto (CSR), en el orden original
+        order = np.argsort(codes, kind="stable")
+        offsets = np.zeros(len(self.texts) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(self.texts)), out=offsets[1:])
+        self._rows = order.astype(np.int64, copy=False)
+        self._offsets = offsets
+
+        # Prefijos: sufijos que comienzan en cada palabra, ordenados
+        entries = []
+        for text_id, text in enumerate(self.texts):
+            if not text:
+                continue
+            start = 0
+            for word in text.split(" "):
+                if word:
+                    entries.append((text[start:], text_id, start == 0))
+                start += len(word) + 1
+        entries.sort()
+        self._suffixes = [e[0] for e in entries]
+        self._suffix_ids = [e[1] for e in entries]
+        self._suffix_whole = [e[2] for e in entries]
+
+        self.ngrams = NgramIndex(self.texts)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """Estado del índice como arreglos (para guardarlo en un .npz)."""
+        grams, gram_offsets, gram_ids = self.ngrams.to_arrays()
+        return {
+            "texts": np.asarray(self.texts, dtype=str),
+            "rows": self._rows,
+            "offsets": self._offsets,
+            "suffixes": np.asarray(self._suffixes, dtype=str),
+            "suffix_ids": np.asarray(self._suffix_ids, dtype=np.int32),
+            "suffix_whole": np.asarray(self._suffix_whole, dtype=bool),
+            "grams": grams,
+            "gram_offsets": gram_offsets,
+            "gram_ids": gram_ids,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, np.ndarray]) -> "ColumnSearchIndex":
+        """Inverso de to_arrays."""
+        index = object.__new__(cls)
+        index.texts = [str(t) for t in arrays["texts"]]
+        index._rows = np.asarray(arrays["rows"], dtype=np.int64)
+        index._offsets = np.asarray(arrays["offsets"], dtype=np.int64)
+        index._suffixes = [str(t) for t in arrays["suffixes"]]
+        index._suffix_ids = np.asarray(arrays["suffix_ids"]).tolist()
+        index._suffix_whole = np.asarray(arrays["suffix_whole"]).tolist()
+        index.ngrams = NgramIndex.from_arrays(
+            index.texts, arrays["grams"], arrays["gram_offsets"], arrays["gram_ids"]
+        )
+        return index
+
+    def rows(self, text_id: int) -> np.ndarray:
+        return self._rows[self._offsets[text_id]:self._offsets[text_id + 1]]
+
+    def rank(self, term: str) -> dict[int, int]:
+        """{id de valor: nivel} para exacta/prefijo/palabra/subcadena (sin difusa)."""
+        ranks: dict[int, int] = {}
+        lo = bisect_left(self._suffixes, term)
+        hi = bisect_left(self._suffixes, term + "\uffff")
+        for k in range(lo, hi):
+            text_id = self._suffix_ids[k]
+            if self._suffix_whole[k]:
+                level = EXACT if self._suffixes[k] == term else PREFIX
+            else:
+                level = WORD_PREFIX
+            if level < ranks.get(text_id, FUZZY):
+                ranks[text_id] = level
+        # Con menos de n letras no hay trigramas: mientras se escribe, solo prefijos
+        if len(term) >= self.ngrams.n:
+            for text_id in self.ngrams.search([term]).tolist():
+                ranks.setdefault(text_id, SUBSTRING)
+        return ranks
+
+    def fuzzy(self, term: str, max_dist: int | None = None) -> dict[int, int]:
+        """{id de valor: distancia} de los valores a distancia <= max_dist del término."""
+        n = self.ngrams.n
+        if len(term) < n:
+            return {}
+        max_dist = fuzzy_max_distance(term) if max_dist is None else max_dist
+        shared = self.ngrams.shared_counts(term)
+        candidates = np.flatnonzero(shared)
+        if not len(candidates):
+            return {}
+        if len(candidates) > FUZZY_CANDIDATES:
+            top = np.argpartition(-shared[candidates], FUZZY_CANDIDATES)[:FUZZY_CANDIDATES]
+            candidates = candidates[top]
+
+        found: dict[int, int] = {}
+        size = len(term)
+        for text_id in candidates.tolist():
+            text = self.texts[text_id]
+            # Valor completo, o su comienzo / el de una palabra (mientras se escribe)
+            options = [text, text[:size]]
+            start = text.find(" ")
+            while start != -1:
+                options.append(text[start + 1:start + 1 + size])
+                start = text.find(" ", start + 1)
+            best = None
+            for option in options:
+                dist = bounded_levenshtein(term, option, max_dist if best is None else best)
+                if dist is not None and (best is None or dist < best):
+                    best = dist
+            if best is not None:
+                found[text_id] = best
+        return found
+
+
+class SearchIndex:
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        columns: Sequence[str],
+        normalize: Callable[[str], str] = str.lower,
+    ):
+        # El orden de `columns` es la prioridad en el ranking
+        self.columns = [c for c in columns if c in df.columns]
+        self.normalize = normalize
+        self.size = len(df)
+        self.indexes: Mapping[str, ColumnSearchIndex] = {
+            col: ColumnSearchIndex(df[col], normalize=normalize) for col in self.columns
+        }
+
+    def __len__(self) -> int:
+        return self.size
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """Arreglos de todas las columnas, con prefijo "<n>_" por columna."""
+        arrays = {}
+        for i, col in enumerate(self.columns):
+            for name, values in self.indexes[col].to_arrays().items():
+                arrays[f"{i}_{name}"] = values
+        return arrays
+
+    @classmethod
+    def from_arrays(
+        cls,
+        columns: Sequence[str],
+        size: int,
+        arrays: Mapping[str, np.ndarray],
+        normalize: Callable[[str], str] = str.lower,
+    ) -> "SearchIndex":
+        """Inverso de to_arrays; `normalize` debe ser el mismo usado al construirlo."""
+        index = object.__new__(cls)
+        index.columns = list(columns)
+        index.normalize = normalize
+        index.size = size
+        index.indexes = {}
+        for i, col in enumerate(index.columns):
+            prefix = f"{i}_"
+            own = {k[len(prefix):]: v for k, v in arrays.items() if k.startswith(prefix)}
+            index.indexes[col] = ColumnSearchIndex.from_arrays(own)
+        return index
+
+    def search(self, query: str) -> np.ndarray:
+        """Posiciones de fila que coinciden con `query`, de la más a la menos relevante."""
+        term = self.normalize(query)
+        if not term:
+            return np.arange(self.size)
+
+        hits = []
+        for priority, col in enumerate(self.columns):
+            index = self.indexes[col]
+            for text_id, level in index.rank(term).items():
+                hits.append((level, 0, priority, index.texts[text_id], col, text_id))
+        if not hits:
+            for priority, col in enumerate(self.columns):
+                index = self.indexes[col]
+                for text_id, dist in index.fuzzy(term).items():
+                    hits.append((FUZZY, dist, priority, index.texts[text_id], col, text_id))
+        if not hits:
+            return np.empty(0, dtype=np.int64)
+
+        hits.sort()
+        rows = np.concatenate([self.indexes[h[4]].rows(h[5]) for h in hits])
+        # Una fila puede coincidir en varias columnas: queda su mejor posición
+        _, first = np.unique(rows, return_index=True)
+        return rows[np.sort(first)]
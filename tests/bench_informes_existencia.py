@@ -0,0 +1,90 @@
+# tests/bench_informes_existencia.py
+"""
+Benchmark manual del lector de informes de existencia.
+
+Genera un informe sintético (por defecto 200.000 filas de movimiento) y mide
+tiempo y memoria pico (tracemalloc) de:
+  - lectura materializada de la hoja (lista completa de filas)
+  - lectura en streaming (generador con iterparse)
+  - constructor columnar de movimientos sobre filas ya leídas
+  - load_product_movements completo
+
+Uso:
+    python tests/bench_informes_existencia.py [filas] [ruta_xlsx]
+"""
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from openpyxl import Workbook
+
+# Asegura que se pueda importar app.*
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from app.services import informes_existencia_service as svc
+
+
+def generar_informe(path: Path, filas: int, movimientos_por_producto: int = 40) -> Path:
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Informe")
+    ws.append(["Fecha", "Documento", "Modalidad", "Unidad", "Bodega", "Ubicación",
+               "Cantidad", "N° Serie", "Entrada", "Salida", "Saldo"])
+    saldo = 0
+    for i in range(filas):
+        if i % movimientos_por_producto == 0:
+            ws.append([f"P{i:06d} - Producto de prueba {i}", None, None, "UN"])
+        entrada = (i % 7) * 3
+        salida = (i % 5) * 2
+        saldo += entrada - salida
+        ws.append([
+            f"{(i % 28) + 1:02d}/{(i % 12) + 1:02d}/2024",
+            f"GD-{i}",
+            "Venta" if i % 2 else "Compra",
+            "",
+            "Central",
+            f"RE-{chr(65 + i % 6)}-{i % 30}",
+            f"{entrada + salida:,}".replace(",", "."),
+            f"SN{i}" if i % 3 == 0 else "",
+            entrada,
+            salida,
+            f"{saldo:,}".replace(",", "."),
+        ])
+    wb.save(path)
+    return path
+
+
+def medir(nombre: str, fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    resultado = fn()
+    elapsed = time.perf_counter() - t0
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{nombre:<32} {elapsed:8.2f} s   pico {peak / 1024 / 1024:8.1f} MiB")
+    return resultado
+
+
+def main():
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    if len(sys.argv) > 2:
+        path = Path(sys.argv[2])
+    else:
+        path = Path(tempfile.gettempdir()) / f"bench_informe_{filas}.xlsx"
+    if not path.exists():
+        print(f"Generando {path} ({filas:,} filas)...")
+        generar_informe(path, filas)
+
+    rows = medir("hoja materializada (lista)", lambda: svc._extract_xlsx_sheet_rows(path))
+    medir("constructor columnar", lambda: svc._movements_frame(iter(rows[1:])))
+    del rows
+    medir("hoja en streaming (generador)", lambda: sum(1 for _ in svc._iter_xlsx_sheet_rows(path)))
+    df = medir("load_product_movements", lambda: svc.load_product_movements(path))
+    print(f"Movimientos: {len(df):,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# tests/bench_inventario_diff.py
+"""
+Benchmark manual del diff de inventarios.
+
+Genera un inventario, deriva una segunda "foto" con altas, bajas y cambios
+de stock, y mide diff_inventories y la exportación.
+
+Uso:
+    python tests/bench_inventario_diff.py [lineas]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Asegura que se pueda importar app.*
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from app.services.inventario_service import diff_inventories, export_inventory_diff  # noqa: E402
+from bench_inventario_filtro import generar_inventario  # noqa: E402
+
+
+def derivar_foto(df, seed: int = 11):
+    rng = np.random.default_rng(seed)
+    nuevo = df.drop(index=rng.choice(len(df), len(df) // 100, replace=False))
+    cambios = rng.choice(nuevo.index, len(df) // 50, replace=False)
+    nuevo.loc[cambios, "Saldo Stock"] = nuevo.loc[cambios, "Saldo Stock"] + 1
+    altas = generar_inventario(len(df) // 100, seed=seed).assign(Lote="LNUEVO")
+    return pd.concat([nuevo, altas], ignore_index=True)
+
+
+def main():
+    lineas = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    viejo = generar_inventario(lineas)
+    nuevo = derivar_foto(viejo)
+
+    inicio = time.perf_counter()
+    diff = diff_inventories(viejo, nuevo)
+    duracion = time.perf_counter() - inicio
+    resumen = ", ".join(f"{k}={len(v)}" for k, v in diff.items())
+    print(f"{lineas} lineas: diff en {duracion:.2f}s ({resumen})")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inicio = time.perf_counter()
+        export_inventory_diff(diff, Path(tmp) / "diff.xlsx")
+        print(f"exportacion xlsx: {time.perf_counter() - inicio:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
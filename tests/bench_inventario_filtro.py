@@ -0,0 +1,98 @@
+# tests/bench_inventario_filtro.py
+"""
+Benchmark manual de filtros del inventario.
+
+Compara el filtrado anterior (normalizar columnas completas en cada búsqueda)
+con InventorySearchModel (normalización una vez por carga + máscaras).
+
+Uso:
+    python tests/bench_inventario_filtro.py [lineas]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Asegura que se pueda importar app.*
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from app.services.inventario_service import (
+    InventorySearchModel,
+    extract_letter_row,
+    extract_main_row,
+    extract_position,
+    norm_text,
+)
+
+
+def generar_inventario(lineas: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    productos = [f"Producto {i} Guantes Nitrilo Talla {'SML'[i % 3]}" for i in range(4000)]
+    prod_idx = rng.integers(0, len(productos), lineas)
+    return pd.DataFrame({
+        "Código": [f"P{i:05d}" for i in prod_idx],
+        "Producto": [productos[i] for i in prod_idx],
+        "Bodega": rng.choice(["Central", "Sucursal Ñuñoa", "Tránsito"], lineas),
+        "Ubicación": [
+            f"R{a}-{chr(65 + b)}{c}" for a, b, c in zip(
+                rng.integers(1, 40, lineas), rng.integers(0, 8, lineas), rng.integers(1, 25, lineas)
+            )
+        ],
+        "N° Serie": "",
+        "Lote": [f"L{i % 900}" for i in range(lineas)],
+        "Fecha Vencimiento": "31/12/2026",
+        "Saldo Stock": rng.integers(0, 50, lineas),
+    })
+
+
+def filtro_anterior(df: pd.DataFrame, terminos, fila_letra: str) -> pd.Series:
+    df = df.copy()
+    m_ubi = df["Ubicación"].astype(str).map(norm_text)
+    m_cod = df["Código"].astype(str).map(norm_text)
+    m_prod = df["Producto"].astype(str).map(norm_text)
+    df["Bodega"].astype(str).map(norm_text)
+    df["Ubicación"].astype(str).map(extract_main_row)
+    m_fila = df["Ubicación"].astype(str).map(extract_letter_row)
+    df["Ubicación"].astype(str).map(extract_position)
+    mask_ubi = m_ubi.apply(lambda val: all(t in val for t in terminos))
+    mask_cod = m_cod.apply(lambda val: all(t in val for t in terminos))
+    mask_prod = m_prod.apply(lambda val: all(t in val for t in terminos))
+    return (mask_ubi | mask_cod | mask_prod) & (m_fila == fila_letra)
+
+
+def filtro_modelo(model: InventorySearchModel, terminos, fila_letra: str) -> np.ndarray:
+    texto = (
+        model.contains_all("ubicacion", terminos)
+        | model.contains_all("codigo", terminos)
+        | model.contains_all("producto", terminos)
+    )
+    return texto & model.equals("letter_row", fila_letra)
+
+
+def medir(nombre: str, fn, repeticiones: int = 1):
+    t0 = time.perf_counter()
+    for _ in range(repeticiones):
+        resultado = fn()
+    elapsed = (time.perf_counter() - t0) / repeticiones
+    print(f"{nombre:<36} {elapsed * 1000:10.1f} ms")
+    return resultado
+
+
+def main():
+    lineas = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    df = generar_inventario(lineas)
+    terminos, fila = ["guantes", "talla m"], "c"
+
+    anterior = medir("filtro anterior (por búsqueda)", lambda: filtro_anterior(df, terminos, fila))
+    model = medir("construir modelo (una vez)", lambda: InventorySearchModel(df))
+    nuevo = medir("filtro con modelo", lambda: filtro_modelo(model, terminos, fila), repeticiones=20)
+    assert np.array_equal(anterior.to_numpy(), nuevo)
+    print(f"Coincidencias: {int(nuevo.sum()):,} de {lineas:,}")
+
+
+if __name__ == "__main__":
+    main()
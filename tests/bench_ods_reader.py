@@ -0,0 +1,114 @@
+# tests/bench_ods_reader.py
+"""
+Benchmark manual del lector ODS en streaming.
+
+Genera un .ods "patológico" como los que deja LibreOffice: pocas filas con
+datos, filas con celdas vacías repetidas hasta la última columna y una cola
+vacía con formato de ~1 millón de filas repetidas. Mide tiempo y memoria pico
+(tracemalloc) de:
+  - lector anterior (ET.fromstring + expansión literal de repeticiones)
+  - read_ods_rows (iterparse + repeticiones perezosas)
+
+Uso:
+    python tests/bench_ods_reader.py [filas_con_datos] [filas_cola_vacia]
+"""
+
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+import zipfile
+from pathlib import Path
+
+# Asegura que se pueda importar app.*
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from app.utils.ods_reader import read_ods_rows  # noqa: E402
+
+NS = {
+    "table": "urn:oasis:names:tc:opendocument:xmlns:table:1.0",
+    "text": "urn:oasis:names:tc:opendocument:xmlns:text:1.0",
+}
+
+
+def generar_ods(path: Path, filas: int, cola: int) -> Path:
+    def celda(texto: str) -> str:
+        return f"<table:table-cell><text:p>{texto}</text:p></table:table-cell>"
+
+    vacio_fin = '<table:table-cell table:number-columns-repeated="16000"/>'
+    partes = [
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<office:document-content xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+        f'xmlns:table="{NS["table"]}" xmlns:text="{NS["text"]}"><office:body><office:spreadsheet>'
+        '<table:table table:name="Ubigeo">',
+        f"<table:table-row>{celda('Tránsito')}{vacio_fin}</table:table-row>",
+        f"<table:table-row>{celda('Región')}{celda('Comuna')}{celda('Días de salida de agencia')}{vacio_fin}</table:table-row>",
+    ]
+    for i in range(filas):
+        partes.append(
+            f"<table:table-row>{celda(f'Región {i % 16}')}{celda(f'Comuna {i}')}{celda('LMXJV')}{vacio_fin}</table:table-row>"
+        )
+    partes.append(
+        f'<table:table-row table:number-rows-repeated="{cola}">'
+        '<table:table-cell table:number-columns-repeated="1024"/></table:table-row>'
+    )
+    partes.append("</table:table></office:spreadsheet></office:body></office:document-content>")
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("content.xml", "".join(partes))
+    return path
+
+
+def lector_anterior(path: Path) -> list[list[str]]:
+    """Lógica previa de sra_mary/buscador, para comparar."""
+    def cell_text(cell) -> str:
+        vals = []
+        for p in cell.findall(".//text:p", NS):
+            t = "".join(p.itertext()).strip()
+            if t:
+                vals.append(t)
+        return " ".join(vals)
+
+    with zipfile.ZipFile(path, "r") as zf:
+        root = ET.fromstring(zf.read("content.xml"))
+
+    for t in root.findall(".//table:table", NS):
+        tmp_rows = []
+        for tr in t.findall("table:table-row", NS):
+            rep_rows = int(tr.get(f"{{{NS['table']}}}number-rows-repeated", "1"))
+            row = []
+            for tc in tr.findall("table:table-cell", NS):
+                rep_cols = int(tc.get(f"{{{NS['table']}}}number-columns-repeated", "1"))
+                row.extend([cell_text(tc)] * rep_cols)
+            while row and row[-1] == "":
+                row.pop()
+            for _ in range(rep_rows):
+                tmp_rows.append(list(row))
+        if any(any(str(c).strip() for c in r) for r in tmp_rows):
+            return tmp_rows
+    return []
+
+
+def medir(nombre: str, fn, path: Path) -> None:
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    rows = fn(path)
+    duracion = time.perf_counter() - inicio
+    _actual, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{nombre:<16} {duracion:6.2f}s  pico {pico / 1e6:8.1f} MB  filas={len(rows)}")
+
+
+def main():
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    cola = int(sys.argv[2]) if len(sys.argv) > 2 else 1_048_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = generar_ods(Path(tmp) / "transito.ods", filas, cola)
+        print(f"{filas} filas con datos + cola vacía de {cola} filas ({path.stat().st_size / 1e3:.0f} KB)")
+        medir("lector anterior", lector_anterior, path)
+        medir("read_ods_rows", read_ods_rows, path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# tests/bench_sra_mary_frecuencias.py
+"""
+Benchmark manual de la importación de frecuencias FedEx (Sra. Mary).
+
+Genera un libro nacional sintético (varias hojas "Frecuencias ...") y mide:
+  - lector anterior (read_excel por hoja + iloc celda a celda + setdefault)
+  - _read_fedex_frequencies_xlsx (ExcelFile abierto + marcas vectorizadas + groupby)
+
+Uso:
+    python tests/bench_sra_mary_frecuencias.py [filas_por_hoja] [hojas]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Asegura que se pueda importar app.*
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from app.gui.sra_mary import _norm_text, _read_fedex_frequencies_xlsx  # noqa: E402
+
+
+def generar_libro(path: Path, filas: int, hojas: int, seed: int = 5) -> Path:
+    rng = np.random.default_rng(seed)
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for h in range(hojas):
+            datos = np.full((filas + 2, 13), "", dtype=object)
+            datos[1, 8:13] = ["L", "M", "X", "J", "V"]
+            datos[2:, 3] = [f"Región {i % 16}" for i in range(filas)]
+            datos[2:, 5] = [f"Comuna {(h * filas + i) % 2000}" for i in range(filas)]
+            datos[2:, 8:13] = np.where(rng.random((filas, 5)) < 0.4, "X", "")
+            pd.DataFrame(datos, columns=[f"C{i}" for i in range(13)]).to_excel(
+                writer, sheet_name=f"Frecuencias Zona {h + 1}", index=False
+            )
+    return path
+
+
+def lector_anterior(path: Path) -> dict:
+    """Lógica previa de _read_fedex_frequencies_xlsx, para comparar."""
+    out: dict = {}
+    xls = pd.ExcelFile(path, engine="openpyxl")
+    for sh in [s for s in xls.sheet_names if "frecuencia" in _norm_text(s)]:
+        df = pd.read_excel(path, sheet_name=sh, dtype=str, engine="openpyxl").fillna("")
+        if len(df.columns) < 13 or len(df) < 3:
+            continue
+        for i in range(2, len(df)):
+            region = str(df.iloc[i, 3]).strip()
+            comuna = str(df.iloc[i, 5]).strip()
+            if not region or not comuna:
+                continue
+            day_cells = [str(df.iloc[i, j]).strip().upper() for j in range(8, 13)]
+            nombres = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes"]
+            dias = [d for d, c in zip(nombres, day_cells) if c == "X"]
+            if not dias:
+                continue
+            out.setdefault((_norm_text(region), _norm_text(comuna)), set()).update(dias)
+    return out
+
+
+def medir(nombre: str, fn, path: Path):
+    inicio = time.perf_counter()
+    resultado = fn(path)
+    print(f"{nombre:<30} {time.perf_counter() - inicio:6.2f}s  claves={len(resultado)}")
+    return resultado
+
+
+def main():
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    hojas = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    with tempfile.TemporaryDirectory() as tmp:
+        path = generar_libro(Path(tmp) / "Frecuencias FedEx.xlsx", filas, hojas)
+        print(f"{hojas} hojas x {filas} filas")
+        anterior = medir("lector anterior", lector_anterior, path)
+        nuevo = medir("_read_fedex_frequencies_xlsx", _read_fedex_frequencies_xlsx, path)
+        print("resultados iguales:", anterior == nuevo)
+
+
+if __name__ == "__main__":
+    main()
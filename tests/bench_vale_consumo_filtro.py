@@ -0,0 +1,95 @@
+# tests/bench_vale_consumo_filtro.py
+"""
+Benchmark manual de FilterOptions.apply (vale_consumo).
+
+Compara el filtrado anterior (copia + lower() de columnas completas y
+strptime por fila para el rango de vencimiento) con el actual (columnas en
+minúsculas y Vencimiento datetime64 precalculados en load_inventory).
+
+Uso:
+    python tests/bench_vale_consumo_filtro.py [filas]
+"""
+
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# vale_consumo usa imports planos
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "vale_consumo"))
+
+from data_loader import LOWER_COLUMNS, VENCIMIENTO_DT, lower_column  # noqa: E402
+from filters import FilterOptions  # noqa: E402
+
+
+def inventario(filas: int) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    productos = np.array([f"Placa {t} {i}" for i, t in enumerate(["Petri", "Agar", "BHI", "MH"] * 500)])
+    venc = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 900, filas), unit="D")
+    df = pd.DataFrame({
+        "Subfamilia": rng.choice(["Placas", "Medios", "Caldos"], filas),
+        "Nombre_del_Producto": productos[rng.integers(0, len(productos), filas)],
+        "Ubicacion": [f"R{i % 40}-{chr(65 + i % 6)}" for i in range(filas)],
+        "Lote": [f"L-{i % 5000:05d}" for i in range(filas)],
+        "Vencimiento": venc.strftime("%Y-%m-%d"),
+        "Stock": rng.integers(0, 20, filas),
+    })
+    df[VENCIMIENTO_DT] = venc
+    for c in LOWER_COLUMNS:
+        df[lower_column(c)] = df[c].str.lower()
+    return df
+
+
+def apply_anterior(opts: FilterOptions, df: pd.DataFrame) -> pd.DataFrame:
+    out = df.copy()
+    if opts.producto:
+        out = out[out["Nombre_del_Producto"].str.lower().str.contains(opts.producto.lower(), na=False)]
+    if opts.lote:
+        out = out[out["Lote"].astype(str).str.lower().str.contains(opts.lote.lower(), na=False)]
+    if opts.ubicacion:
+        out = out[out["Ubicacion"].astype(str).str.lower().str.contains(opts.ubicacion.lower(), na=False)]
+    d1 = datetime.strptime(opts.venc_desde, "%Y-%m-%d") if opts.venc_desde else None
+    d2 = datetime.strptime(opts.venc_hasta, "%Y-%m-%d") if opts.venc_hasta else None
+    if d1 or d2:
+        def _ok(s):
+            try:
+                t = datetime.strptime(s, "%Y-%m-%d")
+            except Exception:
+                return False
+            return not (d1 and t < d1) and not (d2 and t > d2)
+        out = out[out["Vencimiento"].astype(str).apply(_ok)]
+    if opts.solo_con_stock:
+        out = out[out["Stock"] > 0]
+    return out
+
+
+def medir(fn, repeticiones: int = 5) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        fn()
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+def main() -> None:
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    df = inventario(filas)
+    casos = {
+        "producto": FilterOptions(producto="agar"),
+        "producto+lote": FilterOptions(producto="placa", lote="l-00"),
+        "rango vencimiento": FilterOptions(venc_desde="2024-06-01", venc_hasta="2025-01-31"),
+        "todo": FilterOptions(producto="petri", ubicacion="r1", venc_desde="2024-03-01", solo_con_stock=True),
+    }
+    print(f"Filas: {filas}")
+    for nombre, opts in casos.items():
+        assert apply_anterior(opts, df).index.equals(opts.apply(df).index)
+        antes = medir(lambda: apply_anterior(opts, df))
+        ahora = medir(lambda: opts.apply(df))
+        print(f"{nombre:<20} anterior {antes * 1000:8.1f} ms | actual {ahora * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -28,11 +28,24 @@ def inst(mod_buscador):
     return obj
 
 class FakeExcelFile:
+    # Grillas crudas por hoja (como header=None); los tests las reemplazan
+    sheets = {"Hoja1": pd.DataFrame()}
+    parses = []
+
     def __init__(self, path, engine=None):
         self.path = path
         self.engine = engine
-        # emula 1 sola hoja por defecto
-        self.sheet_names = ["Hoja1"]
+        self.sheet_names = list(self.sheets)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def parse(self, sheet_name=0, header=0, dtype=None, **kwargs):
+        FakeExcelFile.parses.append((sheet_name, header))
+        return self.sheets[sheet_name].copy()
 
 @pytest.fixture
 def fake_excel_file(monkeypatch):
@@ -40,4 +53,5 @@ def fake_excel_file(monkeypatch):
     Parcha pandas.ExcelFile para evitar leer archivos reales.
     """
     monkeypatch.setattr(pd, "ExcelFile", FakeExcelFile)
+    monkeypatch.setattr(FakeExcelFile, "parses", [])
     return FakeExcelFile
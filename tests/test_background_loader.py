@@ -0,0 +1,61 @@
+# tests/test_background_loader.py
+import threading
+import time
+
+from app.gui.background_loader import BackgroundLoader
+
+
+class FakeWidget:
+    """Sustituto de un widget Tk: guarda los after() y los corre a mano."""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, _ms, func, *args):
+        self.pending.append((func, args))
+
+    def pump(self, timeout=5.0):
+        limite = time.monotonic() + timeout
+        while self.pending and time.monotonic() < limite:
+            func, args = self.pending.pop(0)
+            func(*args)
+            time.sleep(0.005)
+
+
+def test_entrega_progreso_y_resultado_en_el_hilo_de_ui():
+    widget = FakeWidget()
+    loader = BackgroundLoader(widget)
+    eventos = []
+
+    def trabajo(job):
+        job.progress("leyendo", 0.5)
+        return 42
+
+    loader.start(trabajo, on_done=lambda r: eventos.append(("done", r, threading.current_thread())),
+                 on_progress=lambda msg, frac: eventos.append(("progress", msg, frac)))
+    widget.pump()
+    assert eventos[0] == ("progress", "leyendo", 0.5)
+    assert eventos[1][:2] == ("done", 42)
+    assert eventos[1][2] is threading.main_thread()
+    assert not loader.busy
+
+
+def test_error_y_cancelacion_al_iniciar_otra_carga():
+    widget = FakeWidget()
+    loader = BackgroundLoader(widget)
+    liberar = threading.Event()
+    eventos = []
+
+    def lento(job):
+        liberar.wait(5)
+        job.check()
+        return "viejo"
+
+    def falla(_job):
+        raise ValueError("archivo roto")
+
+    loader.start(lento, on_done=lambda r: eventos.append(r))
+    loader.start(falla, on_done=lambda r: eventos.append(r), on_error=lambda e: eventos.append(str(e)))
+    liberar.set()
+    widget.pump()
+    assert eventos == ["archivo roto"]
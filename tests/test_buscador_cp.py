@@ -1,133 +1,90 @@
 # tests/test_buscador_cp.py
+from pathlib import Path
+
 import pandas as pd
-import unicodedata
 import pytest
 
 # ---------- Utilidades de apoyo ----------
+# Las hojas se entregan como grillas crudas (lo que devuelve header=None)
+
+def grid(rows):
+    return pd.DataFrame(rows, dtype=object)
+
+def grid_preferente_header_1():
+    # Simula tu Excel real: título en fila 1, encabezado en fila 2 visible
+    return grid([
+        ["Códigos postales de Chile", None, None, None, None],
+        ["Comuna/Localidad", "Provincia", "Region", "Codigo Postal", "Notas"],
+        ["Algarrobo", "San Antonio", "Valparaiso", "2710000", None],
+        ["Alhué", "Melipilla", "Metropolitana de Santiago", "9650000", None],
+        ["Alto Biobío", "Biobío", "Biobio", "4590000", "región nueva"],
+    ])
 
-def df_preferente_header_1():
-    # Simula tu Excel real: header en fila 2 visible => header=1 (0-based)
-    # Columnas A:D
-    return pd.DataFrame({
-        "Comuna/Localidad": ["Algarrobo", "Alhué", "Alto Biobío"],
-        "Provincia": ["San Antonio", "Melipilla", "Biobío"],
-        "Region": ["Valparaiso", "Metropolitana de Santiago", "Biobio"],
-        "Codigo Postal": ["2710000", "9650000", "4590000"],
-    })
-
-def df_header_2_columna_generica():
-    # Caso donde header=2 da nombres genericos pero los datos están en filas siguientes
-    return pd.DataFrame({
-        "Columna1": ["Comuna/Localidad", "Algarrobo", "Alhué"],
-        "Columna2": ["Provincia", "San Antonio", "Melipilla"],
-        "Columna3": ["Region", "Valparaiso", "Metropolitana de Santiago"],
-        "Columna4": ["Codigo Postal", "2710000", "9650000"],
-    })
+def grid_header_desplazado():
+    # Encabezados genéricos y los reales una fila más abajo
+    return grid([
+        [None, None, None, None],
+        [None, None, None, None],
+        ["Columna1", "Columna2", "Columna3", "Columna4"],
+        ["Comuna/Localidad", "Provincia", "Region", "Codigo Postal"],
+        ["Algarrobo", "San Antonio", "Valparaiso", "2710000"],
+        ["Alhué", "Melipilla", "Metropolitana de Santiago", "9650000"],
+    ])
 
-def df_sin_header_posicional():
+def grid_sin_header_posicional():
     # Sin encabezado: 4 columnas que corresponden a COMUNA, PROVINCIA, REGIÓN, CP
-    return pd.DataFrame([
+    return grid([
         ["Algarrobo", "San Antonio", "Valparaiso", "2710000"],
         ["Alhué", "Melipilla", "Metropolitana de Santiago", "9650000"],
     ])
 
-def df_inferencia_contenido():
-    # Sin encabezado y sin claves claras, pero CP es la cuarta col numérica
-    return pd.DataFrame([
-        ["Foo", "Bar", "Valparaiso", "2710000"],
-        ["Baz", "Qux", "Metropolitana de Santiago", "9650000"],
-        ["Quillota", "Provincia X", "Valparaiso", "2260000"],
+def grid_inferencia_contenido():
+    # Sin encabezado, 3 columnas y CP en la última
+    return grid([
+        ["Valparaiso", "Algarrobo", "2710000"],
+        ["Metropolitana de Santiago", "Alhué", "9650000"],
+        ["Valparaiso", "Quillota", "2260000"],
     ])
 
-# ---------- Mocks de lectura Excel ----------
-
-def make_read_excel_mock(switch):
-    """
-    Retorna una función que emula pandas.read_excel en base a 'switch':
-    switch es un dict con claves (sheet_name, header, usecols|None) -> DataFrame
-    Si no hay match exacto, intenta por (sheet_name, header) ignorando usecols.
-    """
-    def _mock_read_excel(path, sheet_name=0, header=0, dtype=None, engine=None, usecols=None, names=None, skiprows=None):
-        key_full = (sheet_name, header, usecols)
-        key_loose = (sheet_name, header)
-        if key_full in switch:
-            df = switch[key_full].copy()
-        elif key_loose in switch:
-            df = switch[key_loose].copy()
-        else:
-            # Por defecto, devuelve un DF vacío y dejará avanzar a otros respaldos
-            return pd.DataFrame()
-
-        # Si 'names' fue pedido (caso forzado A:D), reasignamos columnas
-        if names is not None:
-            df.columns = list(names)
-        # Si hay skiprows, simulamos saltar n filas
-        if skiprows:
-            df = df.iloc[skiprows:, :].reset_index(drop=True)
-        # Si usecols limita A:D, ya lo manejamos por el switch; aquí no es necesario
-        return df
-    return _mock_read_excel
+PATH = Path("codigos_postales.xlsx")
 
 # ---------- Tests ----------
 
 def test_preferente_header_1(mod_buscador, inst, monkeypatch, fake_excel_file):
     """
-    Caso real: header=1 y A:D con [Comuna/Localidad, Provincia, Region, Codigo Postal]
+    Caso real: encabezado en fila 2 con [Comuna/Localidad, Provincia, Region, Codigo Postal]
     Debe devolver columnas normalizadas REGIÓN, COMUNA, CÓDIGO POSTAL.
     """
-    switch = {
-        ("Hoja1", 1, "A:D"): df_preferente_header_1(),
-    }
-    monkeypatch.setattr(pd, "read_excel", make_read_excel_mock(switch))
+    monkeypatch.setattr(fake_excel_file, "sheets", {"Hoja1": grid_preferente_header_1()})
 
-    df = inst._leer_y_normalizar_excel(path=pd.Timestamp.now())  # path dummy
+    df = inst._leer_y_normalizar_excel(PATH)
     assert list(df.columns) == ["REGIÓN", "COMUNA", "CÓDIGO POSTAL"]
     assert df.shape[0] == 3
     assert df.iloc[0]["COMUNA"] == "Algarrobo"
     assert df.iloc[0]["REGIÓN"].lower().startswith("valpar")  # Valparaiso
     assert df.iloc[0]["CÓDIGO POSTAL"] == "2710000"
+    # Una sola lectura por hoja
+    assert fake_excel_file.parses == [("Hoja1", None)]
 
-def test_respaldo_header_2(mod_buscador, inst, monkeypatch, fake_excel_file):
+def test_header_desplazado_y_segunda_hoja(mod_buscador, inst, monkeypatch, fake_excel_file):
     """
-    Si el preferente falla, header=2 con datos alineados debe poder normalizar.
+    El encabezado se busca en las primeras filas de cada hoja, no solo en la fila 2.
     """
-    switch = {
-        ("Hoja1", 1, "A:D"): pd.DataFrame(),  # fuerza fallo preferente
-        ("Hoja1", 2): df_header_2_columna_generica(),
-    }
-    monkeypatch.setattr(pd, "read_excel", make_read_excel_mock(switch))
-
-    df = inst._leer_y_normalizar_excel(path=object())  # path dummy
-    # Debe haber detectado y normalizado por respaldo
-    assert set(["REGIÓN", "COMUNA", "CÓDIGO POSTAL"]).issubset(df.columns)
-    assert df.shape[0] >= 2
+    sheets = {"Portada": grid([["Resumen"], ["sin datos"]]), "Datos": grid_header_desplazado()}
+    monkeypatch.setattr(fake_excel_file, "sheets", sheets)
+
+    df = inst._leer_y_normalizar_excel(PATH)
+    assert list(df.columns) == ["REGIÓN", "COMUNA", "CÓDIGO POSTAL"]
+    assert df["COMUNA"].tolist() == ["Algarrobo", "Alhué"]
+    assert fake_excel_file.parses == [("Portada", None), ("Datos", None)]
 
 def test_respaldo_sin_header_posicional(mod_buscador, inst, monkeypatch, fake_excel_file):
     """
     Sin encabezado: asignación posicional COMUNA, PROVINCIA, REGIÓN, CÓDIGO POSTAL.
     """
-    switch = {
-        ("Hoja1", 1, "A:D"): pd.DataFrame(),  # preferente falla
-        ("Hoja1", 2): pd.DataFrame(),         # header=2 falla
-        ("Hoja1", 0): pd.DataFrame(),         # otros headers fallan
-        ("Hoja1", 3): pd.DataFrame(),
-        ("Hoja1", 4): pd.DataFrame(),
-        ("Hoja1", 5): pd.DataFrame(),
-        ("Hoja1", None): df_sin_header_posicional(),  # simulamos lectura sin header
-    }
-
-    def read_excel_mux(path, sheet_name=0, header=0, **kw):
-        # Si header=None en pandas pasa como None. Pero nuestro mock usa key (sheet, None)
-        # Aquí direccionamos: cuando header=None, usamos esa entrada; en otro caso, key normal.
-        if header is None:
-            return switch.get((sheet_name, None), pd.DataFrame())
-        return switch.get((sheet_name, header), pd.DataFrame())
-
-    monkeypatch.setattr(pd, "read_excel", read_excel_mux)
-
-    # Parcheamos método interno que llama varias veces a read_excel sin header:
-    # Nuestra implementación usa header=None en caminos “sin encabezado”, así que este mock lo cubre.
-    df = inst._leer_y_normalizar_excel(path="dummy")
+    monkeypatch.setattr(fake_excel_file, "sheets", {"Hoja1": grid_sin_header_posicional()})
+
+    df = inst._leer_y_normalizar_excel(PATH)
     assert list(df.columns) == ["REGIÓN", "COMUNA", "CÓDIGO POSTAL"]
     assert df.iloc[0]["COMUNA"] == "Algarrobo"
     assert df.iloc[0]["CÓDIGO POSTAL"] == "2710000"
@@ -136,24 +93,9 @@ def test_inferencia_por_contenido(mod_buscador, inst, monkeypatch, fake_excel_fi
     """
     Sin encabezado y sin claves evidentes, pero CP detectable por contenido.
     """
-    switch = {
-        ("Hoja1", 1, "A:D"): pd.DataFrame(),  # forzar camino inferencia
-        ("Hoja1", 2): pd.DataFrame(),
-        ("Hoja1", 0): pd.DataFrame(),
-        ("Hoja1", 3): pd.DataFrame(),
-        ("Hoja1", 4): pd.DataFrame(),
-        ("Hoja1", 5): pd.DataFrame(),
-        ("Hoja1", None): df_inferencia_contenido(),
-    }
-
-    def read_excel_mux(path, sheet_name=0, header=0, **kw):
-        if header is None:
-            return switch.get((sheet_name, None), pd.DataFrame())
-        return switch.get((sheet_name, header), pd.DataFrame())
-
-    monkeypatch.setattr(pd, "read_excel", read_excel_mux)
-
-    df = inst._leer_y_normalizar_excel(path="dummy")
+    monkeypatch.setattr(fake_excel_file, "sheets", {"Hoja1": grid_inferencia_contenido()})
+
+    df = inst._leer_y_normalizar_excel(PATH)
     assert set(["REGIÓN", "COMUNA", "CÓDIGO POSTAL"]).issubset(df.columns)
     # Valida que detectó CP como columna con valores numéricos de 7 dígitos
     assert all(df["CÓDIGO POSTAL"].str.len().between(4, 8))
@@ -166,13 +108,10 @@ def test_error_si_no_detecta(mod_buscador, inst, monkeypatch, fake_excel_file):
     """
     Si todos los caminos fallan, debe lanzar ValueError con mensaje claro.
     """
-    def always_empty(*args, **kwargs):
-        return pd.DataFrame()
-
-    monkeypatch.setattr(pd, "read_excel", always_empty)
+    monkeypatch.setattr(fake_excel_file, "sheets", {"Hoja1": pd.DataFrame()})
 
     with pytest.raises(ValueError) as exc:
-        inst._leer_y_normalizar_excel(path="no_importa")
+        inst._leer_y_normalizar_excel(PATH)
     assert "No se pudieron detectar las columnas" in str(exc.value)
 
 def test_synonyms_renames(mod_buscador, inst):
@@ -0,0 +1,63 @@
+# tests/test_clientes_index.py
+import os
+
+import numpy as np
+import pandas as pd
+
+from app.services import clientes_index as ci
+
+
+def df_clientes():
+    return pd.DataFrame({
+        "RUT": ["76.123.456-7", 12345678.0, "9.876.543-K", "76123456-7"],
+        "Razón Social": ["Clínica Ñuñoa SpA", "Hospital Naval", "Laboratorio Andes", "Duplicado"],
+        "Dirección": ["Av. Irarrázaval 100", "Subida Alessandri 1", np.nan, "Otra"],
+        "Comuna": ["Ñuñoa", "Viña del Mar", "Santiago", "X"],
+    })
+
+
+def test_buscar_rut_y_razon_social():
+    indice = ci.ClientesIndex.from_frame(df_clientes())
+
+    assert indice.buscar_rut("761234567") == {
+        "razsoc": "Clínica Ñuñoa SpA",
+        "dir": "Av. Irarrázaval 100",
+        "comuna": "Ñuñoa",
+        "ciudad": "",
+    }
+    assert indice.buscar_rut("12.345.678")["razsoc"] == "Hospital Naval"
+    assert indice.buscar_rut("9876543-k")["dir"] == ""
+    assert indice.buscar_rut("1-9") is None
+    assert indice.buscar_razsoc("  clinica nunoa   SPA")["comuna"] == "Ñuñoa"
+    assert indice.buscar_razsoc("clinica") is None
+    assert ci.ClientesIndex.from_frame(pd.DataFrame()) is None
+
+
+def test_cargar_indice_usa_cache_mientras_no_cambie(tmp_path, monkeypatch):
+    excel = tmp_path / "clientes.xlsx"
+    with pd.ExcelWriter(excel, engine="openpyxl") as writer:
+        df_clientes().to_excel(writer, sheet_name="Clientes", index=False)
+    cache_path = tmp_path / "clientes_cache.npz"
+
+    lecturas = []
+    leer = ci.leer_clientes_excel
+    monkeypatch.setattr(ci, "leer_clientes_excel", lambda p: lecturas.append(p) or leer(p))
+
+    primero = ci.cargar_indice_clientes(excel, cache_path=cache_path)
+    segundo = ci.cargar_indice_clientes(excel, cache_path=cache_path)
+    assert len(lecturas) == 1
+    pd.testing.assert_frame_equal(segundo.df, primero.df)
+    assert segundo.buscar_rut("12345678")["razsoc"] == "Hospital Naval"
+
+    stat = excel.stat()
+    os.utime(excel, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    ci.cargar_indice_clientes(excel, cache_path=cache_path)
+    assert len(lecturas) == 2
+
+
+def test_cache_danada_se_ignora(tmp_path):
+    excel = tmp_path / "clientes.xlsx"
+    excel.write_bytes(b"excel")
+    cache_path = tmp_path / "clientes_cache.npz"
+    cache_path.write_bytes(b"no es un npz")
+    assert ci.load_cache(excel, cache_path=cache_path) is None
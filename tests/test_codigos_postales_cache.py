@@ -0,0 +1,54 @@
+# tests/test_codigos_postales_cache.py
+import os
+
+import pandas as pd
+
+from app.services import codigos_postales_cache as cache
+from app.utils.search_index import SearchIndex
+
+COLUMNAS = ("COMUNA", "CÓDIGO POSTAL", "REGIÓN")
+
+
+def df_cp():
+    return pd.DataFrame({
+        "REGIÓN": ["Valparaíso", "Metropolitana", "Valparaíso"],
+        "COMUNA": ["Viña del Mar", "Santiago", "Quilpué"],
+        "CÓDIGO POSTAL": ["2520000", "8320000", "2430000"],
+    })
+
+
+def norm(s: str) -> str:
+    return str(s).strip().lower().replace("ñ", "n").replace("é", "e").replace("í", "i")
+
+
+def test_cache_ida_y_vuelta(tmp_path):
+    origen = tmp_path / "cp.xlsx"
+    origen.write_bytes(b"excel")
+    df = df_cp()
+    index = SearchIndex(df, COLUMNAS, normalize=norm)
+    ruta = cache.save_cache(origen, df, index, cache_path=tmp_path / "cp.npz")
+
+    cargado = cache.load_cache(origen, norm, cache_path=ruta, columns=COLUMNAS)
+    assert cargado is not None
+    df2, index2 = cargado
+    pd.testing.assert_frame_equal(df2, df)
+    for query in ("vina", "valpa", "832", "santaigo", "x"):
+        assert index2.search(query).tolist() == index.search(query).tolist()
+
+    # Otras columnas de búsqueda: la caché no sirve
+    assert cache.load_cache(origen, norm, cache_path=ruta, columns=("COMUNA",)) is None
+
+
+def test_cache_invalida_si_cambia_el_origen(tmp_path):
+    origen = tmp_path / "cp.xlsx"
+    origen.write_bytes(b"excel")
+    df = df_cp()
+    ruta = cache.save_cache(origen, df, SearchIndex(df, COLUMNAS, normalize=norm), cache_path=tmp_path / "cp.npz")
+
+    origen.write_bytes(b"excel modificado")
+    assert cache.load_cache(origen, norm, cache_path=ruta) is None
+
+    ruta.write_bytes(b"basura")
+    os.utime(origen)
+    assert cache.load_cache(origen, norm, cache_path=ruta) is None
+    assert cache.load_cache(tmp_path / "no_existe.xlsx", norm, cache_path=ruta) is None
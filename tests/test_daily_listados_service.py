@@ -0,0 +1,220 @@
+# tests/test_daily_listados_service.py
+import pandas as pd
+import pytest
+
+from app.services import daily_listados_service as svc
+
+
+@pytest.fixture
+def daily_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(svc, "DAILY_LISTADOS_DIR", tmp_path / "daily")
+    monkeypatch.setattr(svc, "DAILY_OUTPUT_DIR", tmp_path / "out")
+    return tmp_path
+
+
+def df_listado():
+    return pd.DataFrame({
+        "Código": ["A1", "B2", None],
+        "Cantidad": [1, 2, 3],
+        "Precio": [1.5, None, 2.0],
+    })
+
+
+def test_firma_estable_entre_dtypes_numericos():
+    base = df_listado()
+    otra = base.copy()
+    otra["Cantidad"] = otra["Cantidad"].astype("float64")
+    assert svc._build_signature(base) == svc._build_signature(otra)
+    otra["Cantidad"] = otra["Cantidad"].astype("Int64")
+    assert svc._build_signature(base) == svc._build_signature(otra)
+
+
+def test_firma_sensible_a_contenido_orden_y_encabezados():
+    base = df_listado()
+    firma = svc._build_signature(base)
+    cambiado = base.copy()
+    cambiado.loc[0, "Código"] = "A2"
+    assert svc._build_signature(cambiado) != firma
+    assert svc._build_signature(base.iloc[::-1].reset_index(drop=True)) != firma
+    assert svc._build_signature(base[["Cantidad", "Código", "Precio"]]) != firma
+    assert svc._build_signature(base.rename(columns={"Precio": "Valor"})) != firma
+
+
+def test_archivo_deduplica_con_manifiesto_legacy(daily_dir):
+    df = df_listado()
+    first = svc.archive_printed_listado(df, source_name="x.xlsx")
+    manifest = svc._load_manifest(first.parent.name)
+    entry = manifest["entries"][0]
+    assert entry["signature_version"] == svc.SIGNATURE_VERSION
+
+    # Simula un manifiesto escrito por la versión anterior
+    entry.pop("signature_version")
+    entry["signature"] = svc._build_legacy_signature(df)
+    svc._save_manifest(manifest, first.parent.name)
+
+    again = svc.archive_printed_listado(df, source_name="x.xlsx")
+    assert again == first
+    assert len(svc.list_daily_archives(first.parent.name)) == 1
+
+
+def test_archivo_columnar_y_consolidado_incremental(daily_dir, monkeypatch):
+    first = svc.archive_printed_listado(df_listado(), source_name="a.xlsx")
+    assert first.suffix == svc.ARCHIVE_SUFFIX
+
+    otro = df_listado().assign(Cantidad=[7, 8, 9])
+    svc.archive_printed_listado(otro, source_name="b.xlsx")
+    day = first.parent.name
+
+    consolidado = svc.load_daily_listados_dataframe(day)
+    assert len(consolidado) == 6
+    assert consolidado["Cantidad"].tolist() == [1, 2, 3, 7, 8, 9]
+
+    # Segunda apertura: no debe volver a leer los archivos ya consolidados
+    leidos = []
+    original = svc._read_archive_frame
+    monkeypatch.setattr(svc, "_read_archive_frame", lambda p: leidos.append(p) or original(p))
+    svc.archive_printed_listado(df_listado().assign(Cantidad=[0, 0, 0]))
+    assert len(svc.load_daily_listados_dataframe(day)) == 9
+    assert len(leidos) == 1
+
+    assert not (daily_dir / "out").exists()
+    out = svc.export_daily_listados(day)
+    assert out.suffix == ".xlsx" and out.exists()
+
+
+def test_rango_consolida_deduplica_y_exporta(daily_dir):
+    from datetime import datetime
+
+    base = df_listado()
+    svc.archive_printed_listado(base, source_name="lunes.xlsx", printed_at=datetime(2025, 3, 3, 9))
+    svc.archive_printed_listado(base, source_name="lunes.xlsx", printed_at=datetime(2025, 3, 4, 9))
+    svc.archive_printed_listado(
+        base.assign(Extra=["x", "y", "z"]), source_name="miercoles.xlsx", printed_at=datetime(2025, 3, 5, 9)
+    )
+    svc.archive_printed_listado(base, source_name="fuera.xlsx", printed_at=datetime(2025, 4, 1, 9))
+
+    df = svc.load_daily_listados_range("2025-03-01", "2025-03-31")
+    assert len(df) == 6  # el reimpreso del 04 se descarta por firma
+    assert df[svc.RANGE_DATE_COL].unique().tolist() == ["2025-03-03", "2025-03-05"]
+    assert not (svc.DAILY_LISTADOS_DIR / "2025-03-10").exists()
+
+    solo = svc.load_daily_listados_range("2025-03-01", "2025-03-31", filters={"Código": "A1"})
+    assert len(solo) == 2
+    assert len(svc.load_daily_listados_range("2025-03-01", "2025-03-31", source_contains="MIERC")) == 3
+
+    csv_path = svc.export_daily_listados_range("2025-03-01", "2025-03-31", fmt="csv")
+    leido = pd.read_csv(csv_path, sep=";", encoding="utf-8-sig")
+    assert list(leido.columns) == [svc.RANGE_DATE_COL, "Código", "Cantidad", "Precio", "Extra"]
+    assert len(leido) == 6
+
+    xlsx_path = svc.export_daily_listados_range("2025-03-01", "2025-03-31", fmt="xlsx")
+    assert len(pd.read_excel(xlsx_path)) == 6
+    assert svc.export_daily_listados_range("2024-01-01", "2024-01-02") is None
+
+
+def test_archivo_sqlite_conserva_valores_y_dtypes(tmp_path):
+    df = pd.DataFrame({
+        "Código": ["A1", None, "C3"],
+        "Cantidad": [1, 2, 3],
+        "Lote": pd.array([10, None, 30], dtype="Int64"),
+        "Precio": [1.5, None, 2.0],
+        "Fecha": pd.to_datetime(["2025-03-01 10:00", None, "2025-03-03 00:00"]),
+        "Urgente": [True, False, True],
+        "Mixto": ["x", 2, 3.5],
+        5: ["a", "b", "c"],
+    })
+    path = tmp_path / f"listado{svc.ARCHIVE_SUFFIX}"
+    svc._write_archive_frame(df, path)
+
+    with open(path, "rb") as fh:
+        assert fh.read(16) == b"SQLite format 3\x00"
+    leido = svc._read_archive_frame(path)
+    pd.testing.assert_frame_equal(leido, df.rename(columns=str), check_dtype=True)
+
+
+def test_rango_legacy_lee_solo_encabezado_para_columnas(daily_dir, monkeypatch):
+    from datetime import datetime
+
+    svc.archive_printed_listado(df_listado(), source_name="a.xlsx", printed_at=datetime(2025, 3, 3, 9))
+    # Día anterior a los archivos SQLite: xlsx y manifiesto sin columnas
+    legacy_dir = svc.DAILY_LISTADOS_DIR / "2025-03-02"
+    legacy_dir.mkdir(parents=True)
+    df_listado().assign(Viejo=["v"] * 3).to_excel(legacy_dir / "listado_1.xlsx", index=False)
+    svc._save_manifest({"entries": [{"file": "listado_1.xlsx", "signature": "legacy"}]}, "2025-03-02")
+
+    leidos = []
+    original = svc._read_archive_frame
+    monkeypatch.setattr(svc, "_read_archive_frame", lambda p: leidos.append(p.name) or original(p))
+    out = svc.export_daily_listados_range("2025-03-01", "2025-03-31", fmt="csv")
+
+    assert leidos.count("listado_1.xlsx") == 1
+    leido = pd.read_csv(out, sep=";", encoding="utf-8-sig")
+    assert list(leido.columns) == [svc.RANGE_DATE_COL, "Código", "Cantidad", "Precio", "Viejo"]
+    assert len(leido) == 6
+
+
+def test_archivo_sqlite_fallido_no_deja_tmp(tmp_path, monkeypatch):
+    path = tmp_path / f"listado{svc.ARCHIVE_SUFFIX}"
+
+    def falla(self, target):
+        raise OSError("destino bloqueado")
+
+    monkeypatch.setattr(type(path), "replace", falla)
+    with pytest.raises(OSError):
+        svc._write_archive_frame(df_listado(), path)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cache_de_frames_solo_conserva_el_dia_actual(daily_dir):
+    from datetime import datetime
+
+    lunes = svc.archive_printed_listado(df_listado(), printed_at=datetime(2025, 3, 3, 9))
+    martes = svc.archive_printed_listado(df_listado().assign(Cantidad=[4, 5, 6]), printed_at=datetime(2025, 3, 4, 9))
+    svc.load_daily_listados_dataframe("2025-03-03")
+    svc.load_daily_listados_dataframe("2025-03-04")
+    assert list(svc._FRAME_CACHE) == [str(martes.parent)]
+
+    # Un archivo que sale del manifiesto también sale del cache
+    svc._save_manifest({"entries": []}, "2025-03-04")
+    assert svc.load_daily_listados_dataframe("2025-03-04").empty
+    assert svc._FRAME_CACHE[str(martes.parent)] == {}
+    assert lunes.exists()
+
+
+def test_exportar_dia_usa_el_frame_editado(daily_dir):
+    from datetime import datetime
+
+    svc.archive_printed_listado(df_listado(), printed_at=datetime(2025, 3, 3, 9))
+    editado = svc.load_daily_listados_dataframe("2025-03-03").iloc[:1].assign(Cantidad=[99])
+    out = svc.export_daily_listados("2025-03-03", df=editado)
+    assert pd.read_excel(out)["Cantidad"].tolist() == [99]
+
+
+def test_rango_deduplica_entre_firma_legacy_y_actual(daily_dir):
+    from datetime import datetime
+
+    base = df_listado()
+    svc.archive_printed_listado(base, source_name="a.xlsx", printed_at=datetime(2025, 3, 3, 9))
+    svc.archive_printed_listado(base.assign(Cantidad=[7, 8, 9]), printed_at=datetime(2025, 3, 3, 10))
+    # El mismo listado guardado antes y después por la versión anterior (xlsx + firma legacy)
+    for dia in ("2025-03-02", "2025-03-04"):
+        legacy_dir = svc.DAILY_LISTADOS_DIR / dia
+        legacy_dir.mkdir(parents=True)
+        base.to_excel(legacy_dir / "listado_1.xlsx", index=False)
+        svc._save_manifest({"entries": [{
+            "file": "listado_1.xlsx",
+            "signature": svc._build_legacy_signature(base),
+            "rows": 3,
+        }]}, dia)
+
+    entradas = svc.list_range_archives("2025-03-01", "2025-03-31")
+    assert [(dia, e["file"]) for dia, e in entradas] == [
+        ("2025-03-02", "listado_1.xlsx"),
+        ("2025-03-03", entradas[1][1]["file"]),
+    ]
+    assert entradas[1][1]["rows"] == 3 and entradas[1][1]["signature_version"] == svc.SIGNATURE_VERSION
+    assert len(svc.load_daily_listados_range("2025-03-01", "2025-03-31")) == 6
+
+    # Sin el legacy del 02: el actual del 03 se queda y el legacy del 04 se descarta
+    entradas = svc.list_range_archives("2025-03-03", "2025-03-31")
+    assert [dia for dia, _ in entradas] == ["2025-03-03", "2025-03-03"]
@@ -0,0 +1,46 @@
+# tests/test_informes_existencia_service.py
+from openpyxl import Workbook
+
+from app.services import informes_existencia_service as svc
+
+
+def crear_informe(path):
+    # Workbook normal => openpyxl escribe sharedStrings.xml
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Fecha", "Documento", "Modalidad", "Unidad", "Bodega", "Ubicación",
+               "Cantidad", "N° Serie", "Entrada", "Salida", "Saldo"])
+    ws.append(["P001 - Guantes nitrilo", None, None, "CJ"])
+    ws.append(["01/02/2024", "GD-1", "Compra", None, "Central", "RE-A-1", "1.200", None, 1200, 0, "1.200"])
+    ws.append(["05/02/2024", "FV-9", "Venta", "UN", "Central", "RE-A-1", "200", "SN1", 0, 200, "1.000"])
+    ws.append([None])
+    ws.append(["P002 - Mascarillas", None, None, "UN"])
+    ws.append(["03/03/2024", "GD-2", "Compra", None, "Sucursal", "RE-B-2", "10,5", None, 10, 0, 10])
+    ws["AB8"] = "celda lejana"
+    wb.save(path)
+    return path
+
+
+def test_streaming_equivale_a_lista(tmp_path):
+    path = crear_informe(tmp_path / "informe.xlsx")
+    rows = list(svc._iter_xlsx_sheet_rows(path))
+    assert rows == svc._extract_xlsx_sheet_rows(path)
+    assert rows[1][:4] == ["P001 - Guantes nitrilo", "", "", "CJ"]
+    assert len(rows[7]) == 28 and rows[7][27] == "celda lejana"
+
+
+def test_indice_columna():
+    assert svc._cell_ref_index("A1") == 1
+    assert svc._cell_ref_index("Z10") == 26
+    assert svc._cell_ref_index("AA3") == 27
+    assert svc._cell_ref_index("XFD1048576") == 16384
+    assert svc._cell_ref_index("") == 0
+
+
+def test_load_product_movements(tmp_path):
+    df = svc.load_product_movements(crear_informe(tmp_path / "informe.xlsx"))
+    assert list(df.columns) == svc.EXISTENCE_COLUMNS
+    assert df["Código"].tolist() == ["P001", "P001", "P002"]
+    assert df["Unidad de stock"].tolist() == ["CJ", "UN", "UN"]
+    assert df["Cantidad"].tolist() == [1200, 200, 10]
+    assert df["Saldo"].tolist() == [1200, 1000, 10]
@@ -0,0 +1,100 @@
+# tests/test_inventario_service.py
+import numpy as np
+import pandas as pd
+
+from app.services import inventario_service as svc
+
+
+def df_inventario():
+    return pd.DataFrame({
+        "Código": ["P001", "P002", "P003", "X-10"],
+        "Producto": ["Guantes Nitrilo", "Mascarilla Quirúrgica", "Guantes Látex", "Jeringa"],
+        "Bodega": ["Central", "Central", "Sucursal Ñuñoa", "Central"],
+        "Ubicación": ["R1-A3", "R1-B12", "R2-A3", "BODEGA"],
+        "N° Serie": ["", "", "", ""],
+        "Lote": ["L1", "L2", "L3", "L4"],
+        "Fecha Vencimiento": ["", "", "", ""],
+        "Saldo Stock": [5, 0, 12, 0],
+    })
+
+
+def test_componentes_ubicacion():
+    assert svc.extract_main_row(" R1-A3 ") == "r1"
+    assert svc.extract_letter_row("R1-A3") == "a"
+    assert svc.extract_position("R1-B12") == "12"
+    assert svc.extract_position("BODEGA") == ""
+
+
+def test_modelo_mascaras():
+    model = svc.InventorySearchModel(df_inventario())
+    assert model.contains_all("producto", ["guantes"]).tolist() == [True, False, True, False]
+    assert model.contains_all("producto", ["guantes", "latex"]).tolist() == [False, False, True, False]
+    assert model.contains_all("codigo", []).all()
+    assert model.equals("bodega", "sucursal nunoa").tolist() == [False, False, True, False]
+    assert model.isin("main_row", {"r1"}).tolist() == [True, True, False, False]
+    assert model.equals("letter_row", "a").tolist() == [True, False, True, False]
+    assert model.equals("position", "3").tolist() == [True, False, True, False]
+    assert model.stock_at_most(0).tolist() == [False, True, False, True]
+
+
+def test_modelo_take_mantiene_alineacion():
+    model = svc.InventorySearchModel(df_inventario())
+    order = np.array([3, 2, 1, 0])
+    reordered = model.take(order)
+    assert reordered.df["Código"].tolist() == ["X-10", "P003", "P002", "P001"]
+    assert reordered.contains_all("producto", ["guantes"]).tolist() == [False, True, False, True]
+
+
+def test_sort_keys_orden_y_subconjunto():
+    df = pd.DataFrame({
+        "Código": ["b", "A", "c", "a"],
+        "Saldo Stock": [3, None, 1, 2],
+        "Fecha Vencimiento": ["01/02/2025", "", "15/01/2025", "01/01/2026"],
+        "Producto": ["Ñandú", "nandu", "Zeta", "alfa"],
+    })
+    keys = svc.InventorySortKeys(df)
+    assert keys.order("Saldo Stock").tolist() == [2, 3, 0, 1]
+    # Descendente invierte, pero los vacíos siguen al final
+    assert keys.order("Saldo Stock", ascending=False).tolist() == [0, 3, 2, 1]
+    assert keys.order("Fecha Vencimiento").tolist() == [2, 0, 3, 1]
+    assert keys.order("Producto").tolist() == [3, 0, 1, 2]
+    assert keys.order("Saldo Stock", positions=np.array([0, 1, 3])).tolist() == [3, 0, 1]
+
+    permuted = keys.take(keys.order("Saldo Stock"))
+    assert permuted.order("Saldo Stock").tolist() == [0, 1, 2, 3]
+    assert permuted.df["Código"].tolist() == ["c", "a", "b", "A"]
+
+
+def test_diff_inventarios(tmp_path):
+    viejo = df_inventario()
+    nuevo = df_inventario()
+    nuevo.loc[0, "Saldo Stock"] = 7                      # cambio de stock
+    nuevo = nuevo.drop(index=3)                            # baja
+    extra = df_inventario().iloc[[1]].assign(Lote="L9")    # alta
+    duplicada = df_inventario().iloc[[2]].assign(**{"Saldo Stock": 1})  # misma clave: suma
+    nuevo = pd.concat([nuevo, extra, duplicada], ignore_index=True)
+
+    diff = svc.diff_inventories(viejo, nuevo)
+    assert diff["agregados"][["Código", "Lote", "Saldo Stock"]].values.tolist() == [["P002", "L9", 0]]
+    assert diff["eliminados"]["Código"].tolist() == ["X-10"]
+    cambios = diff["cambios_stock"][["Código", "Stock anterior", "Stock nuevo", "Diferencia"]].values.tolist()
+    assert cambios == [["P001", 5, 7, 2], ["P003", 12, 13, 1]]
+
+    out = svc.export_inventory_diff(diff, tmp_path / "diff.xlsx")
+    hojas = pd.read_excel(out, sheet_name=None)
+    assert list(hojas) == list(svc.DIFF_SECTIONS.values())
+    assert hojas["Cambios de stock"]["Diferencia"].tolist() == [2, 1]
+
+
+def test_location_tree():
+    tree = svc.LocationTree(pd.Series(["R1-A3", "R1-A3 ", "R1-B12", "R10-A1", "BODEGA", None]))
+    assert tree.locations == ["BODEGA", "R1-A3", "R1-B12", "R10-A1"]
+    assert tree.counts["R1-A3"] == 2
+    assert tree.tree["r1"] == {"a": {"3": 2}, "b": {"12": 1}}
+    assert tree.main_counts == {"bodega": 1, "r1": 3, "r10": 1}
+    assert tree.locations_for_main({"r1"}) == ["R1-A3", "R1-B12"]
+    assert tree.match("r1") == ["R1-A3", "R1-B12", "R10-A1"]
+    assert tree.match("r1-b") == ["R1-B12"]
+    assert tree.match("") == tree.locations
+    # Sin prefijo ni subcadena: cae al parecido como el selector original
+    assert tree.match("bodeg4") == ["BODEGA"]
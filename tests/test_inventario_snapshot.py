@@ -0,0 +1,69 @@
+# tests/test_inventario_snapshot.py
+import os
+
+import numpy as np
+import pandas as pd
+
+from app.services import inventario_snapshot as snap
+from app.services.inventario_service import InventorySearchModel
+
+
+def df_inventario():
+    return pd.DataFrame({
+        "Código": ["P001", "P002", "P003"],
+        "Producto": ["Guantes Nitrilo", "Mascarilla Quirúrgica", "Guantes Látex"],
+        "Bodega": ["Central", "Central", "Sucursal Ñuñoa"],
+        "Ubicación": ["R1-A3", "R1-B12", "R2-A3"],
+        "N° Serie": ["", "S-1", ""],
+        "Lote": ["L1", "L2", "L3"],
+        "Fecha Vencimiento": ["01/02/2025", "", "15/01/2025"],
+        "Saldo Stock": np.array([5, 0, 12], dtype=np.int64),
+    })
+
+
+def test_snapshot_ida_y_vuelta(tmp_path):
+    origen = tmp_path / "inventario.xlsx"
+    origen.write_bytes(b"excel")
+    df = df_inventario()
+    model = InventorySearchModel(df)
+    snap.save_snapshot(origen, df, model, snapshot_dir=tmp_path / "snap")
+
+    cargado = snap.load_snapshot(origen, snapshot_dir=tmp_path / "snap")
+    assert cargado is not None
+    df2, model2 = cargado
+    pd.testing.assert_frame_equal(df2, df)
+    for key in ("producto", "main_row", "bodega"):
+        assert model2.columns[key].tolist() == model.columns[key].tolist()
+    assert model2.contains_all("producto", ["guantes", "latex"]).tolist() == [False, False, True]
+    assert model2.isin("main_row", {"r1"}).tolist() == [True, True, False]
+    assert model2.stock_at_most(0).tolist() == [False, True, False]
+
+
+def test_snapshot_invalido_si_cambia_el_origen(tmp_path):
+    origen = tmp_path / "inventario.xlsx"
+    origen.write_bytes(b"excel")
+    df = df_inventario()
+    snap.save_snapshot(origen, df, InventorySearchModel(df), snapshot_dir=tmp_path / "snap")
+
+    origen.write_bytes(b"excel modificado")
+    os.utime(origen, ns=(1, 1))
+    assert snap.load_snapshot(origen, snapshot_dir=tmp_path / "snap") is None
+    assert snap.load_snapshot(tmp_path / "no_existe.xlsx", snapshot_dir=tmp_path / "snap") is None
+
+
+def test_snapshot_conserva_los_usados_recientemente(tmp_path, monkeypatch):
+    monkeypatch.setattr(snap, "SNAPSHOT_KEEP", 2)
+    snap_dir = tmp_path / "snap"
+    df = df_inventario()
+    origenes = []
+    for i, ns in enumerate((10, 20, 30)):
+        origen = tmp_path / f"inventario_{i}.xlsx"
+        origen.write_bytes(b"excel %d" % i)
+        origenes.append(origen)
+        folder = snap.save_snapshot(origen, df, InventorySearchModel(df), snapshot_dir=snap_dir)
+        os.utime(folder / snap.META_FILE, ns=(ns * 10**9, ns * 10**9))
+
+    # Se conservan los dos últimos (actual + el comparado), no solo el último
+    assert snap.load_snapshot(origenes[0], snapshot_dir=snap_dir) is None
+    assert snap.load_snapshot(origenes[1], snapshot_dir=snap_dir) is not None
+    assert snap.load_snapshot(origenes[2], snapshot_dir=snap_dir) is not None
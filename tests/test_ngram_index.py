@@ -0,0 +1,36 @@
+# tests/test_ngram_index.py
+import random
+
+import pandas as pd
+
+from app.utils.ngram_index import ColumnNgramIndex, NgramIndex
+
+
+def test_search_igual_a_filtro_lineal():
+    rnd = random.Random(3)
+    alfabeto = "abcde -"
+    textos = ["".join(rnd.choice(alfabeto) for _ in range(rnd.randint(0, 12))) for _ in range(300)]
+    index = NgramIndex(textos)
+    for terms in (["abc"], ["ab"], ["a", "cde"], ["bad", "e-"], ["zzz"], [""], []):
+        esperado = [i for i, t in enumerate(textos) if all(x in t for x in terms if x)]
+        assert index.search(terms).tolist() == esperado
+
+
+def test_column_index_mascara_por_fila():
+    values = pd.Series(["Guantes Nitrilo", None, "GUANTES látex", "Jeringa", "Guantes Nitrilo"])
+    index = ColumnNgramIndex(values)
+    assert len(index) == 5
+    assert index.mask(["guantes"]).tolist() == [True, False, True, False, True]
+    assert index.mask(["guantes", "nitr"]).tolist() == [True, False, False, False, True]
+    assert index.mask(["xyz"]).tolist() == [False] * 5
+
+
+def test_shared_counts_cuenta_trigramas_distintos():
+    textos = ["hospital", "hostal", "portal", ""]
+    index = NgramIndex(textos)
+    assert index.shared_counts("hostal").tolist() == [2, 4, 1, 0]
+    assert index.shared_counts("xyz").tolist() == [0, 0, 0, 0]
+    assert index.shared_counts("ho").tolist() == [0, 0, 0, 0]
+    # También sobre un índice reconstruido desde arreglos
+    copia = NgramIndex.from_arrays(textos, *index.to_arrays())
+    assert copia.shared_counts("hostal").tolist() == [2, 4, 1, 0]
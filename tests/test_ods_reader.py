@@ -0,0 +1,84 @@
+# tests/test_ods_reader.py
+import zipfile
+
+from app.utils import ods_reader
+
+NS = (
+    'xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+    'xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0" '
+    'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0"'
+)
+
+
+def cell(text="", rep=1):
+    attr = f' table:number-columns-repeated="{rep}"' if rep > 1 else ""
+    if not text:
+        return f"<table:table-cell{attr}/>"
+    return f"<table:table-cell{attr}><text:p>{text}</text:p></table:table-cell>"
+
+
+def row(*cells, rep=1):
+    attr = f' table:number-rows-repeated="{rep}"' if rep > 1 else ""
+    return f"<table:table-row{attr}>{''.join(cells)}</table:table-row>"
+
+
+def table(name, *rows):
+    return f'<table:table table:name="{name}">{"".join(rows)}</table:table>'
+
+
+def write_ods(path, *tables):
+    content = (
+        f'<?xml version="1.0" encoding="UTF-8"?><office:document-content {NS}>'
+        f'<office:body><office:spreadsheet>{"".join(tables)}</office:spreadsheet></office:body>'
+        "</office:document-content>"
+    )
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("content.xml", content)
+    return path
+
+
+def test_read_ods_rows_repeticiones_perezosas(tmp_path):
+    ods = write_ods(
+        tmp_path / "t.ods",
+        table("Vacia", row(cell(rep=50), rep=1000)),
+        table(
+            "Ubigeo",
+            row(cell("Titulo")),
+            row(cell("Region"), cell(rep=2), cell("Comuna"), cell(rep=16000)),
+            row(cell("RM"), cell("x", rep=2), cell("Santiago")),
+            row(cell(rep=1024), rep=3),
+            row(cell("V"), cell(rep=3), cell("Quilpué")),
+            # Cola vacía con formato: no debe expandirse
+            row(cell(rep=1024), rep=1_048_000),
+        ),
+        table("Otra", row(cell("no se lee"))),
+    )
+    rows = ods_reader.read_ods_rows(ods)
+    assert rows == [
+        ["Titulo"],
+        ["Region", "", "", "Comuna"],
+        ["RM", "x", "x", "Santiago"],
+        [],
+        [],
+        [],
+        ["V", "", "", "", "Quilpué"],
+    ]
+
+
+def test_read_ods_rows_filtra_hojas_y_acota_repeticiones(tmp_path, monkeypatch):
+    ods = write_ods(
+        tmp_path / "t.ods",
+        table("Resumen", row(cell("a"))),
+        table(
+            "Datos",
+            row(cell("b", rep=5), cell(), cell("c")),
+            row(cell(rep=2), rep=20),
+            row(cell("d"), rep=50),
+        ),
+    )
+    monkeypatch.setattr(ods_reader, "MAX_REPEAT_COLUMNS", 3)
+    monkeypatch.setattr(ods_reader, "MAX_REPEAT_ROWS", 4)
+    rows = ods_reader.read_ods_rows(ods, accept_table=lambda name: name == "Datos")
+    # Solo el hueco vacío se acota; las filas con datos repetidas llegan todas
+    assert rows == [["b", "b", "b", "", "c"]] + [[]] * 4 + [["d"]] * 50
+    assert ods_reader.read_ods_rows(ods, accept_table=lambda name: False) == []
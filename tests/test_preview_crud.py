@@ -0,0 +1,92 @@
+# tests/test_preview_crud.py
+import pandas as pd
+
+from app.gui import preview_crud as pc
+
+
+class _Var:
+    def __init__(self, value=""):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+def _frame(df: pd.DataFrame, query: str = "") -> pc.PreviewCRUDFrame:
+    # Sin __init__: el filtrado no necesita display
+    crud = object.__new__(pc.PreviewCRUDFrame)
+    crud._df = df
+    crud._filter_var = _Var(query)
+    crud._search_text = None
+    return crud
+
+
+def test_row_search_text_minusculas_y_separado():
+    df = pd.DataFrame({"A": ["Hola", None], "B": [12, 3]}, index=[5, 5])
+    text = pc.row_search_text(df)
+    assert list(text.index) == [5, 5]
+    assert text.iloc[0] == "hola" + pc._SEARCH_SEP + "12"
+    assert text.iloc[1] == "none" + pc._SEARCH_SEP + "3"
+    assert pc.row_search_text(pd.DataFrame()).empty
+
+
+def test_visible_positions_filtra_con_texto_cacheado():
+    df = pd.DataFrame({"NOMBRE": ["Ana (A)", "Beto", "Carla"], "COMUNA": ["Ñuñoa", "Maipú", "ANA"]})
+    crud = _frame(df, "ana")
+    assert crud._visible_positions().tolist() == [0, 2]
+    cached = crud._search_text
+    crud._filter_var.value = "(a)"  # sin regex: los paréntesis son literales
+    assert crud._visible_positions().tolist() == [0]
+    assert crud._search_text is cached
+    # No coincide cruzando columnas
+    crud._filter_var.value = "betomai"
+    assert len(crud._visible_positions()) == 0
+
+    crud._df.loc[1, "NOMBRE"] = "Ana María"
+    crud._invalidate_search()
+    crud._filter_var.value = "ana"
+    assert crud._visible_positions().tolist() == [0, 1, 2]
+
+
+def test_undo_log_deltas_ida_y_vuelta():
+    original = pd.DataFrame({"NOMBRE": ["a", "b", "c", "d"], "BULTOS": [1, 2, 3, 4]}, index=[0, 0, 1, 2])
+    log = pc.UndoLog(max_bytes=None)
+    df = original.copy()
+
+    df = log.apply(df, pc.CellEdit.capture(df, 1, {0: "B", 1: "x"}))
+    assert df["NOMBRE"].tolist() == ["a", "B", "c", "d"]
+    assert df["BULTOS"].tolist() == [1, "x", 3, 4]
+    df = log.apply(df, pc.RowsDeleted.capture(df, [2, 0]))
+    assert df["NOMBRE"].tolist() == ["B", "d"]
+    df = log.apply(df, pc.RowsInserted(pd.DataFrame([{"NOMBRE": "e", "BULTOS": "5"}])))
+    assert df["NOMBRE"].tolist() == ["B", "d", "e"]
+    assert len(log) == 3
+
+    while log.can_undo:
+        df = log.undo(df)
+    pd.testing.assert_frame_equal(df, original)
+
+    while log.can_redo:
+        df = log.redo(df)
+    assert df["NOMBRE"].tolist() == ["B", "d", "e"]
+    assert list(df.index) == [0, 2, 0]
+
+    # Un cambio nuevo descarta lo pendiente de rehacer
+    df = log.undo(df)
+    df = log.apply(df, pc.CellEdit.capture(df, 0, {0: "z"}))
+    assert not log.can_redo
+
+
+def test_undo_log_tope_de_memoria():
+    df = pd.DataFrame({"A": [str(i) * 50 for i in range(200)]})
+    log = pc.UndoLog(max_bytes=20_000)
+    for _ in range(5):
+        df = log.apply(df, pc.RowsDeleted.capture(df, range(30)))
+    assert 1 <= len(log) < 5
+    assert log.nbytes <= 20_000 or len(log) == 1
+
+    frames = [pd.DataFrame({"A": [1]}), pd.DataFrame({"A": [2]})]
+    log = pc.UndoLog(max_bytes=None)
+    actual = log.apply(frames[0], pc.FrameReplaced(frames[0], frames[1]))
+    assert actual is frames[1]
+    assert log.undo(actual) is frames[0]
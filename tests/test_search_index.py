@@ -0,0 +1,52 @@
+# tests/test_search_index.py
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from app.utils.search_index import SearchIndex, bounded_levenshtein
+
+
+def _norm(s: str) -> str:
+    s = " ".join(str(s).strip().split())
+    return unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii").lower()
+
+
+DF = pd.DataFrame({
+    "REGIÓN": ["Valparaíso", "Valparaíso", "Metropolitana", "Valparaíso", "Metropolitana"],
+    "COMUNA": ["Viña del Mar", "Valparaíso", "Santiago", "Quilpué", "Puente Alto"],
+    "CÓDIGO POSTAL": ["2520000", "2340000", "8320000", "2430000", "8150000"],
+})
+
+
+def _comunas(index, query):
+    return DF["COMUNA"].iloc[index.search(query)].tolist()
+
+
+def test_bounded_levenshtein():
+    assert bounded_levenshtein("vina", "vina", 1) == 0
+    assert bounded_levenshtein("vina dle mar", "vina del mar", 2) == 2
+    assert bounded_levenshtein("kitten", "sitting", 2) is None
+    assert bounded_levenshtein("kitten", "sitting", 3) == 3
+
+
+def test_ranking_exacta_prefijo_palabra_subcadena():
+    index = SearchIndex(DF, ["COMUNA", "CÓDIGO POSTAL", "REGIÓN"], normalize=_norm)
+    # Exacta en COMUNA antes que el resto de Valparaíso (región)
+    assert _comunas(index, "valparaiso") == ["Valparaíso", "Viña del Mar", "Quilpué"]
+    # Prefijo de palabra
+    assert _comunas(index, "del m") == ["Viña del Mar"]
+    assert _comunas(index, "alto") == ["Puente Alto"]
+    # Subcadena y código postal
+    assert _comunas(index, "ntiag") == ["Santiago"]
+    assert _comunas(index, "25200") == ["Viña del Mar"]
+    assert len(index.search("")) == len(DF)
+    assert index.search("zzz").dtype == np.int64
+
+
+def test_difusa_solo_sin_coincidencias():
+    index = SearchIndex(DF, ["COMUNA", "CÓDIGO POSTAL", "REGIÓN"], normalize=_norm)
+    assert _comunas(index, "Vina dle mar") == ["Viña del Mar"]
+    assert _comunas(index, "santaigo") == ["Santiago"]
+    assert _comunas(index, "qilpue") == ["Quilpué"]
+    assert _comunas(index, "xyzzy") == []
@@ -0,0 +1,73 @@
+# tests/test_sra_mary.py
+import pandas as pd
+
+from app.gui import sra_mary
+
+
+def escribir_frecuencias(path, filas, hoja="Frecuencias RM"):
+    columnas = [f"C{i}" for i in range(13)]
+    cabecera = [[""] * 13, [""] * 8 + ["L", "M", "X", "J", "V"]]
+    datos = []
+    for region, comuna, marcas in filas:
+        fila = [""] * 13
+        fila[3], fila[5] = region, comuna
+        for j, marca in enumerate(marcas):
+            fila[8 + j] = marca
+        datos.append(fila)
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        pd.DataFrame(cabecera + datos, columns=columnas).to_excel(writer, sheet_name=hoja, index=False)
+        pd.DataFrame({"x": [1]}).to_excel(writer, sheet_name="Resumen", index=False)
+
+
+def test_read_fedex_frequencies_agrupa_por_region_comuna(tmp_path):
+    path = tmp_path / "Frecuencias FedEx.xlsx"
+    escribir_frecuencias(path, [
+        ("Metropolitana", "Ñuñoa", ["X", "", "x ", "", ""]),
+        ("METROPOLITANA", " ñuñoa ", ["", "", "", "", "X"]),
+        ("Valparaíso", "Quilpué", ["", "X", "", "", ""]),
+        ("Valparaíso", "Limache", ["", "", "", "", ""]),
+        ("", "Sin región", ["X", "X", "X", "X", "X"]),
+    ])
+    assert sra_mary._read_fedex_frequencies_xlsx(path) == {
+        ("metropolitana", "nunoa"): {"Lunes", "Miércoles", "Viernes"},
+        ("valparaiso", "quilpue"): {"Martes"},
+    }
+
+
+def clientes_df():
+    return pd.DataFrame({
+        "RAZSOC": ["Hospital San José", "Clínica Santa María", "CLINICA SANTA MARIA", "Laboratorio Andes", ""],
+        "DIR": ["Dir 1", "Dir 2", "Dir 3", "Dir 4", "Dir 5"],
+        "COMUNA": ["Independencia", "Providencia", "Providencia", "Ñuñoa", ""],
+    })
+
+
+def test_client_name_index_sugerencias_por_prefijo_y_palabra():
+    indice = sra_mary.ClientNameIndex.from_frame(clientes_df())
+
+    assert indice.sugerencias("cli") == ["Clínica Santa María"]
+    assert indice.sugerencias("santa") == ["Clínica Santa María"]
+    assert indice.sugerencias("jose") == ["Hospital San José"]
+    # Mismo nivel (prefijo de palabra): orden alfabético del nombre normalizado
+    assert indice.sugerencias("s", limit=2) == ["Clínica Santa María", "Hospital San José"]
+    assert indice.sugerencias("laboratoria andez") == ["Laboratorio Andes"]
+    assert indice.sugerencias("") == []
+
+
+def test_buscar_cliente_por_nombre_prefiere_exacta():
+    df = clientes_df()
+    indice = sra_mary.ClientNameIndex.from_frame(df)
+
+    assert indice.cliente("clinica santa maria")["dir"] == "Dir 2"
+    assert sra_mary._buscar_cliente_por_nombre(df, "andes", indice) == {
+        "razsoc": "Laboratorio Andes",
+        "dir": "Dir 4",
+        "comuna": "Ñuñoa",
+        "ciudad": "",
+    }
+    assert sra_mary._buscar_cliente_por_nombre(df, "san jos")["razsoc"] == "Hospital San José"
+    assert sra_mary._buscar_cliente_por_nombre(df, "inexistente") is None
+    # Subcadenas de 1-2 letras: primera fila que la contiene
+    assert indice.cliente("ar")["razsoc"] == "Clínica Santa María"
+    assert indice.cliente("bo")["razsoc"] == "Laboratorio Andes"
+    assert sra_mary._buscar_cliente_por_nombre(None, "andes") is None
@@ -0,0 +1,106 @@
+# tests/test_sra_mary_store.py
+import json
+
+from app.services.sra_mary_store import SraMaryStore
+
+
+def registro(cliente, region="", comuna="", direccion="", fedex=(), urbano=()):
+    return {
+        "cliente": cliente,
+        "direccion": direccion,
+        "region": region,
+        "comuna": comuna,
+        "fedex_dias": list(fedex),
+        "urbano_dias": list(urbano),
+    }
+
+
+def test_migra_json_una_sola_vez(tmp_path):
+    legacy = tmp_path / "sra_mary_db.json"
+    legacy.write_text(json.dumps([
+        registro("Clínica Ñuñoa", "Metropolitana", "Ñuñoa", fedex=["Lunes"]),
+        registro("Hospital Quilpué", "Valparaíso", "Quilpué", urbano=["Martes"]),
+        "basura",
+    ], ensure_ascii=False), encoding="utf-8")
+    db = tmp_path / "sra_mary.sqlite3"
+
+    store = SraMaryStore(db, legacy_json=legacy)
+    assert store.contar() == 2
+    primero = store.buscar()[0]
+    assert primero["cliente"] == "Clínica Ñuñoa"
+    assert primero["fedex_dias"] == ["Lunes"]
+    store.close()
+
+    store = SraMaryStore(db, legacy_json=legacy)
+    assert store.contar() == 2
+    store.close()
+
+
+def test_guardar_actualizar_eliminar(tmp_path):
+    store = SraMaryStore(tmp_path / "db.sqlite3", legacy_json=None)
+    a = store.guardar(registro("Clínica Alemana", "Metropolitana", "Vitacura"))
+    b = store.guardar(registro("Hospital Naval", "Valparaíso", "Viña del Mar"))
+
+    store.guardar(registro("Clínica Alemana Temuco", "Araucanía", "Temuco"), a)
+    assert store.obtener(a)["comuna"] == "Temuco"
+    assert [r["id"] for r in store.buscar("temuco")] == [a]
+    assert store.buscar("vitacura") == []
+
+    store.eliminar(b)
+    assert store.obtener(b) is None
+    assert store.buscar("naval") == []
+    assert store.contar() == 1
+
+
+def test_buscar_sin_acentos_y_terminos_cortos(tmp_path):
+    store = SraMaryStore(tmp_path / "db.sqlite3", legacy_json=None)
+    a = store.guardar(registro("Clínica Ñuñoa", "Metropolitana", "Ñuñoa", direccion="Av. Irarrázaval 100"))
+    b = store.guardar(registro("Hospital Quilpué", "Valparaíso", "Quilpué"))
+
+    assert [r["id"] for r in store.buscar("NUNOA")] == [a]
+    assert [r["id"] for r in store.buscar("irarrazaval")] == [a]
+    assert [r["id"] for r in store.buscar("pu")] == [b]
+    assert [r["id"] for r in store.buscar("a")] == [a, b]
+    assert [r["id"] for r in store.buscar('"x')] == []
+
+
+def test_importar_por_comuna_actualiza_o_agrega(tmp_path):
+    store = SraMaryStore(tmp_path / "db.sqlite3", legacy_json=None)
+    a = store.guardar(registro("Clínica", "Metropolitana", "Ñuñoa", direccion="Dir 1", urbano=["Lunes"]))
+
+    store.importar_por_comuna([
+        registro("Ñuñoa", "METROPOLITANA", "ñuñoa", fedex=["Martes", "Jueves"]),
+        registro("Limache", "Valparaíso", "Limache", fedex=["Viernes"]),
+    ])
+
+    actualizado = store.obtener(a)
+    assert actualizado["cliente"] == "Ñuñoa"
+    assert actualizado["direccion"] == "Dir 1"
+    assert actualizado["fedex_dias"] == ["Martes", "Jueves"]
+    assert actualizado["urbano_dias"] == ["Lunes"]
+    assert store.contar() == 2
+    assert store.buscar("limache")[0]["fedex_dias"] == ["Viernes"]
+
+
+def test_reconstruye_fts_si_falta_o_esta_desincronizado(tmp_path):
+    db = tmp_path / "db.sqlite3"
+    store = SraMaryStore(db, legacy_json=None)
+    if not store.fts:
+        store.close()
+        return
+    a = store.guardar(registro("Hospital Quilpué", "Valparaíso", "Quilpué"))
+    store.conn.execute("DROP TABLE clientes_fts")
+    store.conn.commit()
+    store.close()
+
+    # Tabla FTS recién creada sobre una base con filas
+    store = SraMaryStore(db, legacy_json=None)
+    assert [r["id"] for r in store.buscar("hospital")] == [a]
+    with store.conn:
+        store.conn.execute("DELETE FROM clientes_fts")
+    store.close()
+
+    # Tabla FTS existente pero con otro número de filas
+    store = SraMaryStore(db, legacy_json=None)
+    assert [r["id"] for r in store.buscar("hospital")] == [a]
+    store.close()
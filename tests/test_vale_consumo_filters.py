@@ -0,0 +1,73 @@
+# tests/test_vale_consumo_filters.py
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# vale_consumo se empaqueta aparte y usa imports planos
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "vale_consumo"))
+
+import data_loader  # noqa: E402
+from filters import FilterOptions  # noqa: E402
+from ngram_index import ColumnNgramIndex  # noqa: E402
+
+
+def escribir_inventario(path):
+    pd.DataFrame({
+        "Área": ["Bioplates"] * 4 + ["Otra"],
+        "Nombre del Producto": ["Placa Petri 90mm", "AGAR Sangre", "Caldo BHI", "Placa Agar MH", "Placa Petri"],
+        "Lote": ["L-001", "a.b-7", None, "L-002", "L-001"],
+        "Fecha de Vencimiento": ["15/01/2025", "31/12/2024", "basura", "01/02/2025", "01/01/2025"],
+        "Cantidad Disponible": [10, 0, 5, 3, 1],
+        "Ubicación": ["R1-A", "R2-B", "R1-C", "", "R1-A"],
+        "Subfamilia": ["Placas", "Medios", "Medios", "Placas", "Placas"],
+    }).to_excel(path, index=False)
+
+
+def test_load_inventory_precalcula_columnas_de_filtro(tmp_path):
+    path = tmp_path / "inventario.xlsx"
+    escribir_inventario(path)
+    df = data_loader.load_inventory(str(path), "Bioplates")
+
+    assert df["Vencimiento"].tolist()[:2] == ["2025-01-15", "2024-12-31"]
+    assert str(df[data_loader.VENCIMIENTO_DT].dtype) == "datetime64[ns]"
+    assert df[data_loader.VENCIMIENTO_DT].isna().tolist() == [False, False, True, False]
+    assert df[data_loader.lower_column("Nombre_del_Producto")].tolist()[1] == "agar sangre"
+    assert df[data_loader.lower_column("Lote")].tolist()[2] == ""
+
+
+def test_filter_options_rango_textos_y_stock(tmp_path):
+    path = tmp_path / "inventario.xlsx"
+    escribir_inventario(path)
+    df = data_loader.load_inventory(str(path), "Bioplates")
+
+    def productos(**kw):
+        return FilterOptions(**kw).apply(df)["Nombre_del_Producto"].tolist()
+
+    assert productos(producto="AGAR") == ["AGAR Sangre", "Placa Agar MH"]
+    assert productos(lote="a.b") == ["AGAR Sangre"]
+    assert productos(lote=".") == ["AGAR Sangre"]
+    assert productos(ubicacion="r1") == ["Placa Petri 90mm", "Caldo BHI"]
+    assert productos(venc_desde="2025-01-01") == ["Placa Petri 90mm", "Placa Agar MH"]
+    assert productos(venc_desde="2025-01-01", venc_hasta="2025-01-15") == ["Placa Petri 90mm"]
+    assert productos(venc_hasta="no-es-fecha") == df["Nombre_del_Producto"].tolist()
+    assert productos(subfamilia="Placas", solo_con_stock=True, producto="placa") == [
+        "Placa Petri 90mm",
+        "Placa Agar MH",
+    ]
+
+    indexes = {"producto": ColumnNgramIndex(df["Nombre_del_Producto"])}
+    out = FilterOptions(producto="agar", venc_hasta="2024-12-31").apply(df, indexes)
+    assert out["Nombre_del_Producto"].tolist() == ["AGAR Sangre"]
+
+
+def test_filter_options_sin_columnas_precalculadas():
+    df = pd.DataFrame({
+        "Nombre_del_Producto": ["Placa", "Caldo"],
+        "Lote": ["L1", None],
+        "Ubicacion": ["", "R1"],
+        "Vencimiento": ["2025-01-01", None],
+        "Stock": [1, 2],
+    })
+    assert FilterOptions(producto="cal").apply(df).index.tolist() == [1]
+    assert FilterOptions(venc_desde="2024-01-01").apply(df).index.tolist() == [0]
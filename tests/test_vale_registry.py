@@ -0,0 +1,133 @@
+# tests/test_vale_registry.py
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# vale_consumo se empaqueta aparte y usa imports planos
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "vale_consumo"))
+
+from vale_registry import ValeRegistry  # noqa: E402
+
+
+def test_numeracion_registro_y_estados(tmp_path):
+    reg = ValeRegistry(str(tmp_path))
+    assert reg.next_number() == 1
+    assert reg.next_number() == 2
+    reg.register_with_number(2, str(tmp_path / "vale_000002.pdf"), "vale_000002.json", 3)
+    reg.register_with_number(10, "vale_000010.pdf", None, 1)
+
+    # Otra instancia (otro equipo) sobre la misma carpeta
+    otro = ValeRegistry(str(tmp_path))
+    assert otro.next_number() == 11
+    assert otro.find_by_number(2) == {
+        "number": 2,
+        "status": "Pendiente",
+        "created_at": otro.find_by_number(2)["created_at"],
+        "pdf": "vale_000002.pdf",
+        "json": "vale_000002.json",
+        "items_count": 3,
+    }
+    assert otro.find_by_number(99) is None
+
+    assert reg.update_status([2, 10, 99], "Descontado") == 2
+    assert [e["number"] for e in reg.list("Descontado")] == [2, 10]
+    assert reg.list("Pendiente") == []
+    assert reg.update_status([], "Anulado") == 0
+
+
+def test_reindex_agrega_solo_pdfs_nuevos_en_lote(tmp_path):
+    reg = ValeRegistry(str(tmp_path))
+    reg.register_with_number(reg.next_number(), "registrado.pdf", "", 1)
+    for i, nombre in enumerate(["viejo_a", "viejo_b", "registrado"]):
+        pdf = tmp_path / f"{nombre}.pdf"
+        pdf.write_bytes(b"%PDF")
+        os.utime(pdf, (1_700_000_000 + i, 1_700_000_000 + i))
+    (tmp_path / "viejo_b.json").write_text(
+        json.dumps({"emission_time": "2024-05-01T10:00:00", "items": [{}, {}]}), encoding="utf-8"
+    )
+
+    assert reg.reindex() == {"added": 2, "skipped": 1}
+    a, b = reg.find_by_number(2), reg.find_by_number(3)
+    assert (a["pdf"], a["json"], a["items_count"]) == ("viejo_a.pdf", "", 0)
+    assert (b["pdf"], b["json"], b["items_count"], b["created_at"]) == ("viejo_b.pdf", "viejo_b.json", 2, "2024-05-01T10:00:00")
+    assert reg.reindex() == {"added": 0, "skipped": 3}
+    assert reg.next_number() == 4
+
+
+def test_registrar_pdf_ya_reindexado_corrige_su_numero(tmp_path):
+    reg = ValeRegistry(str(tmp_path))
+    numero = reg.next_number()
+    (tmp_path / "vale_000001.pdf").write_bytes(b"%PDF")
+    # Otro equipo reindexa antes de que se registre el vale
+    ValeRegistry(str(tmp_path)).reindex()
+    reg.register_with_number(numero, "vale_000001.pdf", "vale_000001.json", 4)
+
+    assert len(reg.list()) == 1
+    assert reg.find_by_number(numero)["items_count"] == 4
+
+
+def test_migra_vales_index_json_una_vez(tmp_path):
+    (tmp_path / "vales_index.json").write_text(json.dumps({
+        "sequence": 7,
+        "vales": [
+            {"number": 3, "status": "Anulado", "created_at": "2024-01-02T00:00:00", "pdf": "a.pdf", "json": "a.json", "items_count": 2},
+            {"number": 3, "status": "Pendiente", "created_at": "2024-01-03T00:00:00", "pdf": "b.pdf", "json": "", "items_count": 1},
+            {"number": 5, "status": "Pendiente", "created_at": "2024-01-04T00:00:00", "pdf": "a.pdf", "json": "", "items_count": 9},
+            {"number": 6, "status": "Pendiente", "created_at": "2024-01-05T00:00:00", "pdf": "b.pdf", "json": "", "items_count": 9},
+            "basura",
+        ],
+    }), encoding="utf-8")
+
+    reg = ValeRegistry(str(tmp_path))
+    assert [(e["number"], e["pdf"], e["status"]) for e in reg.list()] == [
+        (8, "b.pdf", "Pendiente"),
+        (3, "a.pdf", "Anulado"),
+    ]
+    assert reg.next_number() == 9
+
+    # Reabrir no vuelve a migrar
+    assert len(ValeRegistry(str(tmp_path)).list()) == 2
+
+
+def test_carpeta_no_disponible_al_crear_se_prepara_al_usar(tmp_path):
+    # Un archivo en lugar de la carpeta padre: ni makedirs ni sqlite pueden abrirla
+    bloqueo = tmp_path / "compartida"
+    bloqueo.write_text("no es carpeta", encoding="utf-8")
+    history = bloqueo / "historial"
+    reg = ValeRegistry(str(history))
+    with pytest.raises(OSError):
+        reg.next_number()
+
+    # La carpeta vuelve a estar disponible: esquema y migración en la primera operación
+    bloqueo.unlink()
+    history.mkdir(parents=True)
+    (history / "vales_index.json").write_text(json.dumps({
+        "sequence": 4,
+        "vales": [{"number": 4, "status": "Pendiente", "created_at": "", "pdf": "d.pdf", "json": "", "items_count": 1}],
+    }), encoding="utf-8")
+    assert [e["number"] for e in reg.list()] == [4]
+    assert reg.next_number() == 5
+
+
+def test_numeros_unicos_entre_instancias_concurrentes(tmp_path):
+    ValeRegistry(str(tmp_path))
+    numeros = []
+    lock = threading.Lock()
+
+    def reservar():
+        reg = ValeRegistry(str(tmp_path))
+        for _ in range(25):
+            n = reg.next_number()
+            with lock:
+                numeros.append(n)
+
+    hilos = [threading.Thread(target=reservar) for _ in range(4)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    assert sorted(numeros) == list(range(1, 101))
@@ -0,0 +1,29 @@
+# tests/test_virtual_tree.py
+import pandas as pd
+
+from app.gui import virtual_tree as vt
+
+
+def test_visible_window_limites():
+    assert vt.visible_window(0, 20, 60, 10_000) == (0, 0, 80)
+    assert vt.visible_window(500, 20, 60, 10_000) == (500, 440, 580)
+    # offset mas alla del final: se ajusta para que la ultima pagina quede llena
+    assert vt.visible_window(9_999, 20, 60, 10_000) == (9_980, 9_920, 10_000)
+    assert vt.visible_window(5, 20, 60, 8) == (0, 0, 8)
+    assert vt.visible_window(0, 20, 60, 0) == (0, 0, 0)
+
+
+def test_row_values_con_casillas_y_columnas_faltantes():
+    # Sin __init__: no se necesita display para armar los valores de filas
+    table = object.__new__(vt.VirtualTreeview)
+    table._frame = pd.DataFrame({"A": [1, 2, 3], "B": ["x", "y", "z"]}, index=[10, 20, 30])
+    table._value_columns = ["B", "C"]
+    table.check_column = "Sel"
+    table.checked = {1}
+    assert list(table._row_values(0, 3)) == [
+        (vt.CHECK_OFF, "x", ""),
+        (vt.CHECK_ON, "y", ""),
+        (vt.CHECK_OFF, "z", ""),
+    ]
+    table.selected = {2, 7}
+    assert table.selected_labels() == [30]
@@ -8,6 +8,16 @@ import unicodedata
 import pandas as pd
 from typing import Tuple
 
+# Columnas auxiliares para filtrar (no se muestran): se calculan una vez al
+# cargar para que FilterOptions.apply solo compare, sin convertir por fila.
+VENCIMIENTO_DT = "Vencimiento_dt"
+LOWER_SUFFIX = "__lower"
+LOWER_COLUMNS = ("Nombre_del_Producto", "Lote", "Ubicacion")
+
+
+def lower_column(name: str) -> str:
+    return name + LOWER_SUFFIX
+
 
 def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     # normaliza espacios por guiones bajos y quita espacios
@@ -94,9 +104,9 @@ def load_inventory(file_path: str, area_filter: str | None = None) -> pd.DataFra
     # Campos normalizados
     df = df.copy()
     df["Stock"] = df["Cantidad_Disponible"].fillna(0).astype(int)
-    df["Vencimiento"] = pd.to_datetime(
-        df["Fecha_de_Vencimiento"], errors="coerce", dayfirst=True
-    ).dt.strftime("%Y-%m-%d")
+    vencimiento = pd.to_datetime(df["Fecha_de_Vencimiento"], errors="coerce", dayfirst=True).dt.normalize()
+    df["Vencimiento"] = vencimiento.dt.strftime("%Y-%m-%d")
+    df[VENCIMIENTO_DT] = vencimiento
 
     # Ubicación opcional
     if "Ubicacion" not in df.columns:
@@ -127,4 +137,8 @@ def load_inventory(file_path: str, area_filter: str | None = None) -> pd.DataFra
             else:
                 df[c] = ""
 
-    return df[desired]
+    out = df[desired].copy()
+    out[VENCIMIENTO_DT] = df[VENCIMIENTO_DT]
+    for c in LOWER_COLUMNS:
+        out[lower_column(c)] = out[c].fillna("").astype(str).str.lower()
+    return out
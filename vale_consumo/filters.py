@@ -5,8 +5,41 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
 import pandas as pd
 
+from data_loader import VENCIMIENTO_DT, lower_column
+
+# Columnas con búsqueda por texto libre -> nombre del campo en FilterOptions
+TEXT_SEARCH_COLUMNS = {
+    'producto': 'Nombre_del_Producto',
+    'lote': 'Lote',
+    'ubicacion': 'Ubicacion',
+}
+
+
+def _parse_date(d: str) -> Optional[pd.Timestamp]:
+    try:
+        return pd.Timestamp(datetime.strptime(d, '%Y-%m-%d'))
+    except Exception:
+        return None
+
+
+def _lower_values(df: pd.DataFrame, column: str) -> pd.Series:
+    # Precalculada por load_inventory; si no está (df armado a mano), se calcula aquí
+    pre = lower_column(column)
+    if pre in df.columns:
+        return df[pre]
+    return df[column].fillna('').astype(str).str.lower()
+
+
+def _vencimientos(df: pd.DataFrame) -> pd.Series:
+    if VENCIMIENTO_DT in df.columns:
+        return df[VENCIMIENTO_DT]
+    return pd.to_datetime(df['Vencimiento'], format='%Y-%m-%d', errors='coerce')
+
 
 @dataclass
 class FilterOptions:
@@ -18,56 +51,56 @@ class FilterOptions:
     subfamilia: str = "(Todas)"
     solo_con_stock: bool = False
 
-    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
-        out = df.copy()
-
-        # Texto de producto
-        term = (self.producto or "").strip().lower()
-        if term:
-            out = out[out['Nombre_del_Producto'].str.lower().str.contains(term, na=False)]
-
-        # Subfamilia exacta
-        if self.subfamilia and self.subfamilia != '(Todas)' and 'Subfamilia' in out.columns:
-            out = out[out['Subfamilia'].astype(str) == self.subfamilia]
-
-        # Lote
-        lote_t = (self.lote or "").strip().lower()
-        if lote_t:
-            out = out[out['Lote'].astype(str).str.lower().str.contains(lote_t, na=False)]
-
-        # Ubicacion
-        ubi_t = (self.ubicacion or "").strip().lower()
-        if ubi_t and 'Ubicacion' in out.columns:
-            out = out[out['Ubicacion'].astype(str).str.lower().str.contains(ubi_t, na=False)]
-
-        # Vencimiento rango (YYYY-MM-DD)
-        def _parse(d: str):
-            try:
-                return datetime.strptime(d, '%Y-%m-%d')
-            except Exception:
-                return None
-        d1 = _parse(self.venc_desde) if self.venc_desde else None
-        d2 = _parse(self.venc_hasta) if self.venc_hasta else None
-        if d1 or d2:
-            vdt = out['Vencimiento'].astype(str)
-            vdt = vdt.where(vdt.ne('NaT'), None)
-
-            def _ok(s: str) -> bool:
-                try:
-                    t = datetime.strptime(s, '%Y-%m-%d')
-                except Exception:
-                    return False
-                if d1 and t < d1:
-                    return False
-                if d2 and t > d2:
-                    return False
-                return True
-
-            out = out[vdt.apply(_ok)]
-
-        # Solo con stock
-        if self.solo_con_stock and 'Stock' in out.columns:
-            out = out[out['Stock'] > 0]
-
-        return out
+    def mask(self, df: pd.DataFrame, text_indexes: Optional[Dict] = None) -> np.ndarray:
+        """
+        Máscara booleana (por posición) de las filas de df que cumplen los
+        filtros. Todo se evalúa sobre columnas completas; los textos que no
+        resuelve un índice se buscan solo entre las filas aún candidatas.
+        """
+        text_indexes = text_indexes or {}
+        mask = np.ones(len(df), dtype=bool)
+
+        # Los filtros baratos primero: reducen las filas para los textos
+        if self.subfamilia and self.subfamilia != '(Todas)' and 'Subfamilia' in df.columns:
+            mask &= (df['Subfamilia'].astype(str) == self.subfamilia).to_numpy()
+
+        if self.solo_con_stock and 'Stock' in df.columns:
+            mask &= (df['Stock'] > 0).to_numpy()
+
+        # Vencimiento rango (YYYY-MM-DD); una fecha inválida no filtra
+        d1 = _parse_date(self.venc_desde) if self.venc_desde else None
+        d2 = _parse_date(self.venc_hasta) if self.venc_hasta else None
+        if d1 is not None or d2 is not None:
+            venc = _vencimientos(df)
+            ok = venc.notna()
+            if d1 is not None:
+                ok &= venc >= d1
+            if d2 is not None:
+                ok &= venc <= d2
+            mask &= ok.to_numpy()
+
+        for key, column in TEXT_SEARCH_COLUMNS.items():
+            term = (getattr(self, key) or "").strip().lower()
+            if not term or column not in df.columns:
+                continue
+            index = text_indexes.get(key)
+            if index is not None and len(index) == len(df):
+                mask &= index.mask([term])
+                continue
+            rows = np.flatnonzero(mask)
+            if not len(rows):
+                break
+            hit = _lower_values(df, column).iloc[rows].str.contains(term, regex=False).to_numpy()
+            mask[rows[~hit]] = False
+
+        return mask
 
+    def apply(self, df: pd.DataFrame, text_indexes: Optional[Dict] = None) -> pd.DataFrame:
+        """
+        text_indexes: índices de trigramas por campo ('producto', 'lote',
+        'ubicacion') construidos sobre este mismo df (ver ValeManager.load).
+        Si no vienen, los textos se filtran con las columnas en minúsculas
+        precalculadas por load_inventory.
+        """
+        mask = self.mask(df, text_indexes)
+        return df[mask] if not mask.all() else df.copy()
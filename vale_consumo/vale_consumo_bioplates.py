@@ -27,6 +27,10 @@ from filters import FilterOptions
 from printing_utils import print_pdf_windows
 import settings_store as settings
 from vale_registry import ValeRegistry
+from virtual_tree import VirtualTreeview
+
+# Columnas del inventario que muestra la tabla de productos, en orden
+PRODUCT_TABLE_COLUMNS = ['Nombre_del_Producto', 'Lote', 'Ubicacion', 'Vencimiento', 'Stock']
 
 
 class ValeConsumoApp:
@@ -409,12 +413,15 @@ class ValeConsumoApp:
         table_frame.grid(row=1, column=0, sticky='nsew')
         frame.columnconfigure(0, weight=1)
 
-        self.product_tree = ttk.Treeview(
+        self.product_table = VirtualTreeview(
             table_frame,
-            columns=("Producto", "Lote", "Ubicacion", "Vencimiento", "Stock"),
-            show='headings',
-            selectmode='browse'
+            ("Producto", "Lote", "Ubicacion", "Vencimiento", "Stock"),
+            selectmode='browse',
+            stripe_tags=('evenrow', 'oddrow'),
         )
+        self.product_tree = self.product_table.tree
+        self.product_tree.tag_configure('evenrow', background='#ffffff')
+        self.product_tree.tag_configure('oddrow', background='#fafafa')
         self.product_tree.heading('Producto', text='Producto')
         self.product_tree.heading('Lote', text='Lote')
         self.product_tree.heading('Ubicacion', text='Ubicacion')
@@ -427,15 +434,9 @@ class ValeConsumoApp:
         self.product_tree.column('Vencimiento', width=130, minwidth=110, anchor='center', stretch=True)
         self.product_tree.column('Stock', width=80, minwidth=60, anchor='center', stretch=True)
 
-        self.product_tree.grid(row=0, column=0, sticky='nsew')
-        table_frame.rowconfigure(1, weight=1)
+        self.product_table.grid(row=0, column=0, sticky='nsew')
+        table_frame.rowconfigure(0, weight=1)
         table_frame.columnconfigure(0, weight=1)
-
-        vsb = ttk.Scrollbar(table_frame, orient='vertical', command=self.product_tree.yview)
-        vsb.grid(row=0, column=1, sticky='ns')
-        hsb = ttk.Scrollbar(table_frame, orient='horizontal', command=self.product_tree.xview)
-        hsb.grid(row=1, column=0, sticky='ew')
-        self.product_tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
         self.product_tree.bind('<Configure>', self._autosize_product_columns)
 
         # Panel de control con scroll
@@ -1024,31 +1025,19 @@ class ValeConsumoApp:
             solo_con_stock=bool(self.stock_only_var.get()),
         )
         try:
-            out = opts.apply(df)
+            out = opts.apply(df, self.manager.text_indexes)
         except Exception:
             out = df.copy()
         self.filtered_df = out
         self._populate_products(out)
 
     def _populate_products(self, df: pd.DataFrame) -> None:
-        for i in self.product_tree.get_children():
-            self.product_tree.delete(i)
-        if df is None or df.empty:
-            return
-        for idx, row in df.iterrows():
-            values = [
-                row.get('Nombre_del_Producto', ''),
-                row.get('Lote', ''),
-                row.get('Ubicacion', ''),
-                row.get('Vencimiento', ''),
-                row.get('Stock', ''),
-            ]
-            self.product_tree.insert('', 'end', iid=str(int(idx)), values=values)
-        self._apply_stripes(self.product_tree)
+        # Solo se insertan las filas visibles; el foco se guarda como posicion en df
+        self.product_table.set_frame(df, PRODUCT_TABLE_COLUMNS)
 
     def add_to_vale(self) -> None:
-        sel = self.product_tree.focus()
-        if not sel:
+        pos = self.product_table.focus_position()
+        if pos is None:
             messagebox.showwarning('Seleccion', 'Seleccione un producto de la tabla.')
             return
         try:
@@ -1059,7 +1048,7 @@ class ValeConsumoApp:
             messagebox.showerror('Cantidad', 'Ingrese una cantidad valida (> 0).')
             return
         try:
-            item_index = int(sel)
+            item_index = int(self.product_table.label_at(pos))
             self.manager.add_to_vale(item_index, qty)
         except Exception as e:
             messagebox.showerror('Agregar al Vale', str(e))
@@ -10,6 +10,8 @@ from typing import List, Dict, Optional
 import pandas as pd
 
 from data_loader import load_inventory
+from filters import TEXT_SEARCH_COLUMNS
+from ngram_index import ColumnNgramIndex
 from pdf_utils import build_vale_pdf
 
 
@@ -17,9 +19,15 @@ from pdf_utils import build_vale_pdf
 class ValeManager:
     bioplates_inventory: pd.DataFrame = field(default_factory=pd.DataFrame)
     current_vale: List[Dict] = field(default_factory=list)
+    text_indexes: Dict[str, ColumnNgramIndex] = field(default_factory=dict)
 
     def load(self, file_path: str, area_filter: Optional[str] = None) -> pd.DataFrame:
         self.bioplates_inventory = load_inventory(file_path, area_filter)
+        self.text_indexes = {
+            key: ColumnNgramIndex(self.bioplates_inventory[col])
+            for key, col in TEXT_SEARCH_COLUMNS.items()
+            if col in self.bioplates_inventory.columns
+        }
         return self.bioplates_inventory
 
     def add_to_vale(self, item_index: int, quantity: int) -> Dict:
@@ -5,148 +5,294 @@ from __future__ import annotations
 
 import json
 import os
+import sqlite3
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS vales (
+    number INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'Pendiente',
+    created_at TEXT NOT NULL DEFAULT '',
+    pdf TEXT NOT NULL DEFAULT '',
+    json TEXT NOT NULL DEFAULT '',
+    items_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_vales_number ON vales (number);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_vales_pdf ON vales (pdf) WHERE pdf <> '';
+CREATE INDEX IF NOT EXISTS idx_vales_status_created ON vales (status, created_at);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('sequence', '0');
+"""
+
+_COLUMNS = ('number', 'status', 'created_at', 'pdf', 'json', 'items_count')
+
+# Espera máxima (s) por el bloqueo cuando otro equipo está escribiendo
+LOCK_TIMEOUT = 15.0
+
+
+def _now_iso() -> str:
+    return datetime.now().isoformat(timespec='seconds')
 
 
 class ValeRegistry:
-    """Registro simple basado en JSON para numerar y llevar estados de vales.
-
-    Estructura del archivo:
-    {
-      "sequence": 15,
-      "vales": [
-        {
-          "number": 1,
-          "status": "Pendiente",  # Pendiente | Descontado | Anulado
-          "created_at": "2025-11-13T15:04:09",
-          "pdf": "vale_20251113_150409.pdf",
-          "json": "vale_20251113_150409.json",
-          "items_count": 3
-        },
-        ...
-      ]
-    }
+    """Registro SQLite (vales_index.sqlite3 en la carpeta de historial) para
+    numerar y llevar estados de vales.
+
+    Cada vale es una fila de `vales`:
+      number (único), status (Pendiente | Descontado | Anulado), created_at
+      (ISO), pdf (nombre base, único), json (sidecar) e items_count.
+    El correlativo vive en `meta.sequence`.
+
+    La carpeta de historial puede estar compartida entre equipos: cada
+    operación abre su propia conexión (journal clásico, no WAL, que no
+    funciona en carpetas de red) y las escrituras toman el bloqueo de
+    escritura al comenzar (BEGIN IMMEDIATE), así que reservar un número o
+    reindexar nunca se intercalan entre equipos.
+
+    El esquema (y la migración única del vales_index.json anterior, si
+    existe) se prepara en la primera conexión que se logra abrir: si la
+    carpeta no está disponible al crear el registro, se reintenta en cada
+    operación hasta que lo esté.
     """
 
     def __init__(self, history_dir: str) -> None:
         self.history_dir = history_dir
         self.index_path = os.path.join(history_dir, 'vales_index.json')
-        self.data: Dict[str, Any] = {}
-        self._load()
+        self.db_path = os.path.join(history_dir, 'vales_index.sqlite3')
+        self._ready = False
+        try:
+            with self._connect():
+                pass
+        except Exception:
+            # Carpeta no disponible por ahora: _connect vuelve a preparar el
+            # esquema en la próxima operación
+            pass
 
     # ---------------- Internals ----------------
-    def _load(self) -> None:
-        if not os.path.exists(self.history_dir):
-            try:
-                os.makedirs(self.history_dir, exist_ok=True)
-            except Exception:
-                pass
-        if os.path.exists(self.index_path):
-            try:
-                with open(self.index_path, 'r', encoding='utf-8') as f:
-                    self.data = json.load(f)
-            except Exception:
-                self.data = {}
-        if not isinstance(self.data, dict):
-            self.data = {}
-        self.data.setdefault('sequence', 0)
-        self.data.setdefault('vales', [])
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        if not self._ready:
+            os.makedirs(self.history_dir, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=LOCK_TIMEOUT, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            if not self._ready:
+                self._prepare(conn)
+            yield conn
+        finally:
+            conn.close()
 
-    def _save(self) -> None:
+    def _prepare(self, conn: sqlite3.Connection) -> None:
+        """Esquema y migración del JSON anterior (la base puede ser el archivo vacío que crea sqlite3.connect)."""
+        conn.executescript(_SCHEMA)
+        self._migrate_json(conn)
+        self._ready = True
+
+    @staticmethod
+    @contextmanager
+    def _transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+        """Transacción de escritura: bloquea la base para otros equipos hasta el COMMIT."""
+        conn.execute('BEGIN IMMEDIATE')
         try:
-            with open(self.index_path, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, ensure_ascii=False, indent=2)
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        with self._connect() as conn, self._transaction(conn):
+            yield conn
+
+    @staticmethod
+    def _sequence(conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'sequence'").fetchone()
+        try:
+            return int(row['value']) if row else 0
+        except (TypeError, ValueError):
+            return 0
+
+    @staticmethod
+    def _set_sequence(conn: sqlite3.Connection, value: int) -> None:
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('sequence', ?)", (str(int(value)),))
+
+    def _bump_sequence(self, conn: sqlite3.Connection, count: int = 1) -> int:
+        """Reserva `count` números consecutivos y devuelve el primero."""
+        first = self._sequence(conn) + 1
+        self._set_sequence(conn, first + count - 1)
+        return first
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, entry: Dict[str, Any]) -> None:
+        conn.execute(
+            f"INSERT INTO vales ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' for _ in _COLUMNS)})",
+            tuple(entry[c] for c in _COLUMNS),
+        )
+
+    @staticmethod
+    def _entry(row: sqlite3.Row) -> Dict[str, Any]:
+        return {c: row[c] for c in _COLUMNS}
+
+    def _migrate_json(self, conn: sqlite3.Connection) -> None:
+        if not os.path.exists(self.index_path):
+            return
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrado'").fetchone():
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
         except Exception:
-            pass
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+        vales = [e for e in data.get('vales', []) if isinstance(e, dict)]
+        try:
+            json_seq = int(data.get('sequence', 0))
+        except Exception:
+            json_seq = 0
+
+        with self._transaction(conn):
+            # Otro equipo pudo migrar mientras se leía el JSON
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrado'").fetchone():
+                return
+            numbers = {r[0] for r in conn.execute('SELECT number FROM vales')}
+            pdfs = {r[0] for r in conn.execute("SELECT pdf FROM vales WHERE pdf <> ''")}
+            self._set_sequence(conn, max(self._sequence(conn), json_seq, max(numbers, default=0)))
+            pending = []
+            for e in vales:
+                pdf = os.path.basename(str(e.get('pdf', '') or ''))
+                if pdf and pdf in pdfs:
+                    continue
+                try:
+                    number = int(e.get('number'))
+                except Exception:
+                    number = None
+                try:
+                    items_count = int(e.get('items_count', 0) or 0)
+                except Exception:
+                    items_count = 0
+                entry = {
+                    'number': number,
+                    'status': str(e.get('status') or 'Pendiente'),
+                    'created_at': str(e.get('created_at') or ''),
+                    'pdf': pdf,
+                    'json': os.path.basename(str(e.get('json', '') or '')),
+                    'items_count': items_count,
+                }
+                if pdf:
+                    pdfs.add(pdf)
+                if number is None or number in numbers:
+                    # Número repetido en el JSON (dos equipos reservaron el mismo): uno nuevo
+                    pending.append(entry)
+                    continue
+                numbers.add(number)
+                self._insert(conn, entry)
+            self._set_sequence(conn, max(self._sequence(conn), max(numbers, default=0)))
+            for entry in pending:
+                entry['number'] = self._bump_sequence(conn)
+                self._insert(conn, entry)
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrado', ?)",
+                (_now_iso(),),
+            )
 
     # ---------------- API pública ----------------
     def next_number(self) -> int:
-        n = int(self.data.get('sequence', 0)) + 1
-        self.data['sequence'] = n
-        self._save()
-        return n
+        with self._write() as conn:
+            return self._bump_sequence(conn)
 
     def register_with_number(self, number: int, pdf_filename: str, json_filename: Optional[str], items_count: int) -> Dict[str, Any]:
         """Registra un vale usando un numero ya reservado.
 
-        Asegura que la secuencia no quede por debajo del numero asignado.
+        Asegura que la secuencia no quede por debajo del numero asignado. Si el
+        PDF ya fue indexado (p. ej. por un reindex de otro equipo), se corrige
+        esa fila con el número reservado.
         """
-        try:
-            cur_seq = int(self.data.get('sequence', 0))
-        except Exception:
-            cur_seq = 0
-        if number > cur_seq:
-            self.data['sequence'] = number
         entry = {
             'number': int(number),
             'status': 'Pendiente',
-            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'created_at': _now_iso(),
             'pdf': os.path.basename(pdf_filename),
             'json': os.path.basename(json_filename) if json_filename else '',
             'items_count': int(items_count),
         }
-        self.data['vales'].append(entry)
-        self._save()
+        with self._write() as conn:
+            if entry['number'] > self._sequence(conn):
+                self._set_sequence(conn, entry['number'])
+            row = None
+            if entry['pdf']:
+                row = conn.execute('SELECT rowid FROM vales WHERE pdf = ?', (entry['pdf'],)).fetchone()
+            if row is None:
+                self._insert(conn, entry)
+            else:
+                conn.execute(
+                    'UPDATE vales SET number = ?, json = ?, items_count = ? WHERE rowid = ?',
+                    (entry['number'], entry['json'], entry['items_count'], row['rowid']),
+                )
         return entry
 
     # reserved: alta de vale sin preasignar número (API externa)
     def register_voucher(self, pdf_filename: str, json_filename: Optional[str], items_count: int) -> Dict[str, Any]:
-        number = self.next_number()
-        entry = {
-            'number': number,
-            'status': 'Pendiente',
-            'created_at': datetime.now().isoformat(timespec='seconds'),
-            'pdf': os.path.basename(pdf_filename),
-            'json': os.path.basename(json_filename) if json_filename else '',
-            'items_count': int(items_count),
-        }
-        self.data['vales'].append(entry)
-        self._save()
+        with self._write() as conn:
+            entry = {
+                'number': self._bump_sequence(conn),
+                'status': 'Pendiente',
+                'created_at': _now_iso(),
+                'pdf': os.path.basename(pdf_filename),
+                'json': os.path.basename(json_filename) if json_filename else '',
+                'items_count': int(items_count),
+            }
+            self._insert(conn, entry)
         return entry
 
     def list(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
-        items: List[Dict[str, Any]] = list(self.data.get('vales', []))
+        # ordenar por fecha desc (a igual fecha, en orden de alta)
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM vales"
+        params: tuple = ()
         if status:
-            items = [x for x in items if x.get('status') == status]
-        # ordenar por fecha desc
-        def _key(e: Dict[str, Any]):
-            return e.get('created_at', '')
-        items.sort(key=_key, reverse=True)
-        return items
+            sql += ' WHERE status = ?'
+            params = (status,)
+        sql += ' ORDER BY created_at DESC, rowid ASC'
+        with self._connect() as conn:
+            return [self._entry(r) for r in conn.execute(sql, params)]
 
     def update_status(self, numbers: List[int], new_status: str) -> int:
-        count = 0
-        for e in self.data.get('vales', []):
-            if int(e.get('number', -1)) in numbers:
-                e['status'] = new_status
-                count += 1
-        if count:
-            self._save()
-        return count
+        nums = [int(n) for n in numbers]
+        if not nums:
+            return 0
+        with self._write() as conn:
+            cur = conn.execute(
+                f"UPDATE vales SET status = ? WHERE number IN ({', '.join('?' for _ in nums)})",
+                (new_status, *nums),
+            )
+            return cur.rowcount
 
     def find_by_number(self, number: int) -> Optional[Dict[str, Any]]:
-        for e in self.data.get('vales', []):
-            if int(e.get('number', -1)) == number:
-                return e
-        return None
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM vales WHERE number = ?", (int(number),)
+            ).fetchone()
+        return self._entry(row) if row is not None else None
 
     # ---------------- Importación de vales antiguos ----------------
     def _has_pdf(self, pdf_name: str) -> bool:
         pdf_base = os.path.basename(pdf_name)
-        for e in self.data.get('vales', []):
-            if os.path.basename(e.get('pdf', '')) == pdf_base:
-                return True
-        return False
+        with self._connect() as conn:
+            return conn.execute('SELECT 1 FROM vales WHERE pdf = ?', (pdf_base,)).fetchone() is not None
 
     def reindex(self) -> Dict[str, int]:
         """Escanea la carpeta de historial y agrega al índice los PDFs que no estén
-        registrados. Asigna números correlativos y estado Pendiente.
+        registrados. Asigna números correlativos y estado Pendiente, todo en una
+        sola transacción.
 
         Devuelve {'added': n, 'skipped': m}
         """
-        added = 0
-        skipped = 0
         try:
             files = [f for f in os.listdir(self.history_dir) if f.lower().endswith('.pdf')]
         except Exception:
@@ -157,9 +303,12 @@ class ValeRegistry:
             except Exception:
                 return 0.0
         files.sort(key=_mtime)
+
+        with self._connect() as conn:
+            known = {r[0] for r in conn.execute("SELECT pdf FROM vales WHERE pdf <> ''")}
+        nuevos = []
         for f in files:
-            if self._has_pdf(f):
-                skipped += 1
+            if f in known:
                 continue
             base, _ = os.path.splitext(f)
             jpath = os.path.join(self.history_dir, base + '.json')
@@ -178,18 +327,29 @@ class ValeRegistry:
                 try:
                     created_iso = datetime.fromtimestamp(_mtime(f)).isoformat(timespec='seconds')
                 except Exception:
-                    created_iso = datetime.now().isoformat(timespec='seconds')
-            number = self.next_number()
-            entry = {
-                'number': number,
+                    created_iso = _now_iso()
+            nuevos.append({
+                'number': 0,
                 'status': 'Pendiente',
                 'created_at': created_iso,
                 'pdf': f,
                 'json': (os.path.basename(base + '.json') if os.path.exists(jpath) else ''),
                 'items_count': items_count,
-            }
-            self.data['vales'].append(entry)
-            added += 1
-        if added:
-            self._save()
-        return {'added': added, 'skipped': skipped}
+            })
+
+        added = 0
+        if nuevos:
+            with self._write() as conn:
+                # Releer dentro del bloqueo: otro equipo pudo registrar alguno
+                known = {r[0] for r in conn.execute("SELECT pdf FROM vales WHERE pdf <> ''")}
+                nuevos = [e for e in nuevos if e['pdf'] not in known]
+                if nuevos:
+                    first = self._bump_sequence(conn, len(nuevos))
+                    for offset, entry in enumerate(nuevos):
+                        entry['number'] = first + offset
+                    conn.executemany(
+                        f"INSERT INTO vales ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' for _ in _COLUMNS)})",
+                        [tuple(e[c] for c in _COLUMNS) for e in nuevos],
+                    )
+                added = len(nuevos)
+        return {'added': added, 'skipped': len(files) - added}
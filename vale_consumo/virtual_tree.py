@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+VirtualTreeview: tabla ttk.Treeview virtualizada sobre una vista de DataFrame.
+
+En vez de borrar e insertar todas las filas, solo se insertan las filas
+visibles más un margen arriba y abajo. El scroll nativo del Treeview (rueda,
+teclado, see) se mueve dentro de ese bloque; al acercarse a un borde se
+re-pagina el bloque alrededor de la posición actual. La barra vertical
+representa el DataFrame completo.
+
+Los iid de los ítems son la posición de la fila en la vista (str(pos)), y la
+selección, el foco y las casillas marcadas se guardan como posiciones en
+estructuras propias, así sobreviven a la re-paginación.
+
+Copia de app/gui/virtual_tree.py: la app de vales se empaqueta por separado
+y no puede importar el paquete app. Mantener ambas versiones sincronizadas.
+"""
+
+from __future__ import annotations
+
+from tkinter import ttk
+from typing import Sequence
+
+import pandas as pd
+
+CHECK_ON = "☑"
+CHECK_OFF = "☐"
+
+_SHIFT_MASK = 0x0001
+_CONTROL_MASK = 0x0004
+
+
+def visible_window(offset: int, page: int, margin: int, total: int) -> tuple[int, int, int]:
+    """
+    Ajusta `offset` (primera fila visible) a [0, total - page] y devuelve
+    (offset, start, end): el rango [start, end) de filas a insertar.
+    """
+    page = max(1, page)
+    offset = max(0, min(offset, total - page))
+    start = max(0, offset - margin)
+    end = min(total, offset + page + margin)
+    return offset, start, end
+
+
+class VirtualTreeview(ttk.Frame):
+    def __init__(
+        self,
+        master,
+        columns: Sequence[str],
+        *,
+        height: int = 20,
+        margin: int = 60,
+        check_column: str | None = None,
+        stripe_tags: tuple[str, str] = ("even", "odd"),
+        xscroll: bool = True,
+        **tree_kwargs,
+    ):
+        super().__init__(master)
+        self.check_column = check_column
+        self.stripe_tags = stripe_tags
+        self.margin = max(1, int(margin))
+
+        tree_columns = ([check_column] if check_column else []) + list(columns)
+        self.tree = ttk.Treeview(self, columns=tree_columns, show="headings", height=height, **tree_kwargs)
+        self.vsb = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.tree.configure(yscrollcommand=self._on_tree_yscroll)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.vsb.grid(row=0, column=1, sticky="ns")
+        if xscroll:
+            self.hsb = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
+            self.tree.configure(xscrollcommand=self.hsb.set)
+            self.hsb.grid(row=1, column=0, sticky="ew")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self._frame = pd.DataFrame()
+        self._value_columns = list(columns)
+        self._offset = 0
+        self._page = max(1, int(height))
+        self._start = 0
+        self._end = 0
+        self._repage_pending = False
+
+        # Estado fuera del Treeview, en posiciones de la vista
+        self.selected: set[int] = set()
+        self.checked: set[int] = set()
+        self._focus: int | None = None
+
+        # Bindtag propio delante de los del Treeview: los bind() que haga la
+        # vista sobre self.tree no reemplazan estos.
+        tag = f"VirtualTreeview{id(self)}"
+        self.tree.bindtags((tag,) + self.tree.bindtags())
+        self.tree.bind_class(tag, "<<TreeviewSelect>>", self._sync_selection)
+        self.tree.bind_class(tag, "<Button-1>", self._on_click)
+        for key in ("<Up>", "<Down>"):
+            self.tree.bind_class(tag, key, self._on_nav_key)
+
+    # ------------------------------ Datos -------------------------------
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        return self._frame
+
+    def __len__(self) -> int:
+        return len(self._frame)
+
+    def set_frame(self, df: pd.DataFrame | None, columns: Sequence[str] | None = None, keep_position: bool = False):
+        """
+        Muestra `df` (no se copia). La selección y el foco se limpian, igual
+        que al reconstruir un Treeview; las casillas marcadas las maneja el
+        dueño de la tabla.
+        """
+        self._frame = df if df is not None else pd.DataFrame()
+        if columns is not None:
+            self._value_columns = list(columns)
+        self.selected = set()
+        self._focus = None
+        offset = self._offset if keep_position else 0
+        self._render(offset)
+
+    def label_at(self, pos: int):
+        """Etiqueta del índice del DataFrame para una posición de la vista."""
+        return self._frame.index[pos]
+
+    def selected_positions(self) -> list[int]:
+        return sorted(p for p in self.selected if 0 <= p < len(self._frame))
+
+    def selected_labels(self) -> list:
+        return [self.label_at(p) for p in self.selected_positions()]
+
+    def focus_position(self) -> int | None:
+        if self._focus is not None and 0 <= self._focus < len(self._frame):
+            return self._focus
+        return None
+
+    def toggle_checked(self, pos: int):
+        if pos in self.checked:
+            self.checked.discard(pos)
+        else:
+            self.checked.add(pos)
+        self.refresh_row(pos)
+
+    def refresh(self):
+        """Vuelve a pintar el bloque actual sin mover el scroll."""
+        self._render(self._offset)
+
+    def refresh_row(self, pos: int):
+        if self._start <= pos < self._end:
+            values = next(self._row_values(pos, pos + 1))
+            self.tree.item(str(pos), values=values)
+
+    def see(self, pos: int):
+        if not 0 <= pos < len(self._frame):
+            return
+        if not self._start <= pos < self._end:
+            self._render(max(0, pos - self._page // 2))
+        self.tree.see(str(pos))
+
+    # ----------------------------- Render -------------------------------
+
+    def _row_values(self, start: int, end: int):
+        block = self._frame.iloc[start:end]
+        columns = [c for c in self._value_columns if c in block.columns]
+        if len(columns) != len(self._value_columns):
+            block = block.reindex(columns=self._value_columns, fill_value="")
+        else:
+            block = block[columns]
+        rows = block.itertuples(index=False, name=None)
+        if not self.check_column:
+            return rows
+        checked = self.checked
+        return (
+            (CHECK_ON if pos in checked else CHECK_OFF, *row)
+            for pos, row in zip(range(start, end), rows)
+        )
+
+    def _render(self, offset: int):
+        total = len(self._frame)
+        offset, start, end = visible_window(offset, self._page, self.margin, total)
+        tree = self.tree
+        tree.delete(*tree.get_children())
+        self._offset, self._start, self._end = offset, start, end
+        if not total:
+            self.vsb.set(0.0, 1.0)
+            return
+
+        even, odd = self.stripe_tags
+        for pos, values in zip(range(start, end), self._row_values(start, end)):
+            tree.insert("", "end", iid=str(pos), values=values, tags=(even if pos % 2 == 0 else odd,))
+
+        visible_selected = [str(p) for p in self.selected if start <= p < end]
+        if visible_selected:
+            tree.selection_set(visible_selected)
+        if self._focus is not None and start <= self._focus < end:
+            tree.focus(str(self._focus))
+        tree.yview_moveto((offset - start) / (end - start))
+
+    def _on_tree_yscroll(self, first, last):
+        count = self._end - self._start
+        total = len(self._frame)
+        if not count or not total:
+            self.vsb.set(0.0, 1.0)
+            return
+        top = self._start + int(round(float(first) * count))
+        bottom = self._start + int(round(float(last) * count))
+        self._offset = top
+        self._page = max(1, bottom - top)
+        self.vsb.set(top / total, bottom / total)
+
+        threshold = self.margin // 2
+        near_top = self._start > 0 and top - self._start < threshold
+        near_bottom = self._end < total and self._end - bottom < threshold
+        if (near_top or near_bottom) and not self._repage_pending:
+            self._repage_pending = True
+            self.after_idle(self._repage)
+
+    def _repage(self):
+        self._repage_pending = False
+        self._render(self._offset)
+
+    def yview(self, *args):
+        """Comando de la barra vertical, en filas del DataFrame completo."""
+        total = len(self._frame)
+        if not total or not args:
+            return
+        if args[0] == "moveto":
+            offset = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            step = int(args[1])
+            offset = self._offset + (step * self._page if args[2] == "pages" else step)
+        else:
+            return
+        offset, _start, _end = visible_window(offset, self._page, self.margin, total)
+        if self._start <= offset and offset + self._page <= self._end:
+            self.tree.yview_moveto((offset - self._start) / (self._end - self._start))
+        else:
+            self._render(offset)
+
+    # ---------------------------- Eventos -------------------------------
+
+    def _sync_selection(self, _event=None):
+        start, end = self._start, self._end
+        current = {int(iid) for iid in self.tree.selection()}
+        self.selected = {p for p in self.selected if not start <= p < end} | current
+        focus = self.tree.focus()
+        if focus:
+            self._focus = int(focus)
+
+    def _drop_hidden_selection(self, event):
+        # Clic o flecha sin modificadores: la selección fuera del bloque
+        # también debe soltarse, como en un Treeview normal.
+        if not event.state & (_SHIFT_MASK | _CONTROL_MASK):
+            self.selected = {p for p in self.selected if self._start <= p < self._end}
+
+    def _on_click(self, event):
+        row_id = self.tree.identify_row(event.y)
+        if not row_id:
+            return None
+        if (
+            self.check_column
+            and self.tree.identify("region", event.x, event.y) == "cell"
+            and self.tree.identify_column(event.x) == "#1"
+        ):
+            self.toggle_checked(int(row_id))
+            self.event_generate("<<CheckToggled>>")
+            return "break"
+        self._drop_hidden_selection(event)
+        return None
+
+    def _on_nav_key(self, event):
+        self._drop_hidden_selection(event)
+        return None